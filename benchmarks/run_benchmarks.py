@@ -0,0 +1,305 @@
+"""Benchmark the data, model and rendering hot paths, and store the results as JSON.
+
+The kernels call the data collection code of the figure scripts (lib/ro_stats.py, see the
+docstrings) and run offline on the measurement data in this repository."""
+from typing import Any, Callable, Dict, List, Tuple
+import argparse
+import atexit
+import csv
+from glob import glob
+import json
+import os
+from os import getcwd, makedirs
+from os.path import join, getsize, isfile
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+sys.path.append(getcwd())
+sys.path.append(join(getcwd(), 'math_model'))
+from lib import graph_maker as g_m # pylint: disable=wrong-import-position
+from lib import ro_stats as r_s # pylint: disable=wrong-import-position
+
+RESULTS_FOLDER = join('benchmarks', 'results')
+
+SF2_FOLDER = join('measurements', 'no_placement_sf2')
+S7_FOLDER = join('measurements', 'lp_variable_gp_s7')
+
+MAX_NB_CSC = 2**15
+H_VS_CS_CSCS = (20, 60, 150)
+H_VS_CS_NB_SAMPLES = 100
+# The W_T distribution takes quadratic time in its points, 1000 by default:
+H_VS_CS_NB_WT_POINTS = 200
+
+
+class Benchmark:
+    """A benchmark: the setup generates the input, the timed function returns the number of
+    processed items."""
+
+    def __init__(self, name: str, func: Callable[[Any], int], setup: Callable[[], Any],
+                 repeat: int, unit: str):
+        self.name = name
+        self.func = func
+        self.setup = setup
+        self.repeat = repeat
+        self.unit = unit
+
+    def run(self) -> Dict[str, Any]:
+        """Run the setup once and the timed function repeatedly."""
+        data = self.setup()
+        times: List[float] = []
+        nb_items = 0
+        for _ in range(self.repeat):
+            start_time = time.perf_counter()
+            nb_items = self.func(data)
+            times.append(time.perf_counter() - start_time)
+        return {'min_s': min(times), 'median_s': statistics.median(times),
+                'mean_s': statistics.mean(times),
+                'stdev_s': statistics.stdev(times) if len(times) > 1 else 0.0,
+                'repeat': self.repeat, 'items': nb_items, 'unit': self.unit,
+                'items_per_s': nb_items / min(times) if min(times) > 0 else 0.0}
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(setup: Callable[[], Any], repeat: int=5, unit: str='items') \
+    -> Callable[[Callable[[Any], int]], Callable[[Any], int]]:
+    """Register the decorated function as benchmark, named after the function."""
+    def register(func: Callable[[Any], int]) -> Callable[[Any], int]:
+        BENCHMARKS.append(Benchmark(func.__name__, func, setup, repeat, unit))
+        return func
+    return register
+
+
+@benchmark(setup=lambda: None, repeat=5, unit='imports')
+def import_graph_maker(_: None) -> int:
+    """The start-up of a data-only figure script: the interpreter and the graph maker import.
+    The import alone should stay within its 150 ms budget (see lib/readme.md)."""
+    subprocess.run([sys.executable, '-c', 'from lib import graph_maker'], check=True)
+    return 1
+
+
+def _largest_sf2_files(nb_files: int=4) -> List[str]:
+    file_names = glob(join(SF2_FOLDER, '*', '*.csv'))
+    return sorted(file_names, key=getsize, reverse=True)[:nb_files]
+
+
+def _read_cscs(file_name: str) -> List[float]:
+    cs: List[float] = []
+    with open(file_name, encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+        next(csv_reader)
+        for row in csv_reader:
+            cs.append(float(row[4]))
+    return [c for c in cs if c > 0]
+
+
+def _read_s7_delays(ro_type: str, x_loc: int, y_loc: int, stages: int) -> List[float]:
+    file_name = join(S7_FOLDER, ro_type, f'all_configs_{ro_type}_x{x_loc}y{y_loc}_'
+                     f'stages{stages}.csv')
+    d_s: List[float] = []
+    with open(file_name, encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+        next(csv_reader)
+        for row in csv_reader:
+            d_s.append(float(row[1]))
+    return d_s
+
+
+def _read_s7_periods() -> Tuple[List[int], List[float]]:
+    file_name = join(S7_FOLDER, 'intralut0', 'all_configs_intralut0_x0y0_stages4.csv')
+    pers_read: Tuple[List[int], List[float]] = ([], [])
+    with open(file_name, encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file, delimiter=',')
+        next(csv_reader)
+        for row in csv_reader:
+            pers_read[0].append(int(row[0]))
+            pers_read[1].append(float(row[1]) * 1e-9)
+    return pers_read
+
+
+@benchmark(setup=_largest_sf2_files, repeat=3, unit='rows')
+def parse_sf2_csv(file_names: List[str]) -> int:
+    """The CSV parsing of csc_sf2_no_placement.py, on the largest SmartFusion 2 files."""
+    return sum(len(_read_cscs(file_name)) for file_name in file_names)
+
+
+@benchmark(setup=_read_s7_periods, repeat=3, unit='rows')
+def conf_averaging(pers_read: Tuple[List[int], List[float]]) -> int:
+    """The averaging over identical confs of the ranres figure scripts."""
+    r_s.average_confs(*pers_read)
+    return len(pers_read[0])
+
+
+@benchmark(setup=_read_s7_periods, repeat=5, unit='periods')
+def ranres_stats(pers_read: Tuple[List[int], List[float]]) -> int:
+    """The range and resolution of the ranres figure scripts."""
+    _, pers = pers_read
+    r_s.period_range(pers)
+    r_s.period_resolution(sorted(pers))
+    return len(pers)
+
+
+def _setup_lfsr_pairs() -> Tuple[List[float], List[float]]:
+    return (_read_s7_delays('intralut0', 0, 0, 3),
+            _read_s7_delays('intralut0_s', 0, 1, 3))
+
+
+@benchmark(setup=_setup_lfsr_pairs, repeat=1, unit='pairs')
+def lfsr_pairs(d_s: Tuple[List[float], List[float]]) -> int:
+    """The LFSR-sampled RO pairs of csc_s7_placement_sweep_lutvar0.py."""
+    r_s.lfsr_cscs(*d_s, MAX_NB_CSC)
+    return MAX_NB_CSC
+
+
+def _setup_full_product() -> Tuple[List[float], List[float]]:
+    return (_read_s7_delays('muxnetwork', 0, 0, 3),
+            _read_s7_delays('muxnetwork_s', 0, 1, 3))
+
+
+@benchmark(setup=_setup_full_product, repeat=20, unit='pairs')
+def full_product_c(d_s: Tuple[List[float], List[float]]) -> int:
+    """The C values of all RO pairs of csc_s7_placement_sweep_gatevar.py."""
+    r_s.product_cscs(*d_s)
+    return len(d_s[0]) * len(d_s[1])
+
+
+@benchmark(setup=lambda: _read_cscs(_largest_sf2_files(1)[0]), repeat=3, unit='C values')
+def violin_stats(cs: List[float]) -> int:
+    """The violin plot summary that the C value figure scripts store."""
+    g_m.GraphMaker.violin_stats(cs)
+    return len(cs)
+
+
+def _setup_h_vs_cs() -> Tuple[float, float]:
+    import generate_h_vs_csc as g_h # type: ignore # pylint: disable=import-outside-toplevel
+    return g_h.JIT_STRENGTH, g_h.RO_PER
+
+
+@benchmark(setup=_setup_h_vs_cs, repeat=3,
+           unit=f'C values ({H_VS_CS_NB_SAMPLES} samples, {H_VS_CS_NB_WT_POINTS} W_T points)')
+def h_vs_cs(model_params: Tuple[float, float]) -> int:
+    """The stochastic model at a few C values, with reduced numbers of simulated samples and of
+    points of the W_T distribution."""
+    import generate_h_vs_csc as g_h # type: ignore # pylint: disable=import-outside-toplevel
+    jit_strength, ro_per = model_params
+    random.seed(0)
+    np.random.seed(0)
+    for csc in H_VS_CS_CSCS:
+        g_h.h_vs_cs(ro_per / csc, np.sqrt(jit_strength * ro_per), ro_per,
+                    nb_samples=H_VS_CS_NB_SAMPLES, nb_wt_points=H_VS_CS_NB_WT_POINTS)
+    return len(H_VS_CS_CSCS)
+
+
+def _setup_render() -> Tuple[str, List[List[float]]]:
+    folder_name = tempfile.mkdtemp()
+    atexit.register(shutil.rmtree, folder_name, True)
+    makedirs(join(folder_name, 'svg'))
+    return folder_name, [g_m.GraphMaker.violin_stats(_read_cscs(file_name))
+                         for file_name in _largest_sf2_files()]
+
+
+@benchmark(setup=_setup_render, repeat=3, unit='figures')
+def render_violin_figure(render_data: Tuple[str, List[List[float]]]) -> int:
+    """The violin figure of csc_sf2_no_placement.py, rendered from the stored summaries."""
+    folder_name, cscs = render_data
+    graph_maker = g_m.GraphMaker('benchmark.svg', figure_size=(1, 1), folder_name=folder_name,
+                                 figure_height_scale=0.75)
+    graph_maker.create_grid(size=(1, 1), marg_left=0.11, marg_top=0.85, marg_bot=0.2)
+    ax = graph_maker.create_ax(x_slice=0, y_slice=0, title='Obtainable $C$ values',
+                               x_label='RO topology', y_label='$C$', x_unit='-', y_unit='-',
+                               y_scale='log10', x_scale='fix', y_grid=True,
+                               fixed_locs_x=[1, 2, 3, 4],
+                               fixed_labels_x=['GateVar', 'WireVar', 'LUTVar0', 'LUTVar3'],
+                               x_lim=(0.5, 4.5), y_lim=(3e-2, 5e4))
+    for pos_i, cs in enumerate(cscs):
+        graph_maker.violin(ax=ax, data=cs, color=0, position=pos_i + 1,
+                           show_box=True, marker='dot', hist=False,
+                           marker_color=1, median_color=1, stats=True)
+    graph_maker.write_svg()
+    g_m.plt.close('all')
+    return 1
+
+
+def _git(*git_args: str) -> str:
+    try:
+        return subprocess.run(['git', *git_args], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def environment() -> Dict[str, Any]:
+    """The commit and the machine the benchmarks run on."""
+    commit = _git('rev-parse', '--short', 'HEAD') or 'unknown'
+    if _git('status', '--porcelain', '--untracked-files=no'):
+        commit += '-dirty'
+    return {'commit': commit, 'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'python': platform.python_version(), 'numpy': np.__version__,
+            'platform': platform.platform(), 'processor': platform.processor(),
+            'cpu_count': os.cpu_count(), 'draft': g_m.GraphMaker.default_draft()}
+
+
+def compare(old_results: Dict[str, Any], new_results: Dict[str, Any],
+            threshold: float) -> bool:
+    """Print the change of the minimum times. Return True if a benchmark slowed down by more
+    than the threshold ratio."""
+    regressed = False
+    print(f'{old_results["environment"]["commit"]} -> {new_results["environment"]["commit"]}')
+    for name, new in new_results['benchmarks'].items():
+        old = old_results['benchmarks'].get(name)
+        if old is None:
+            print(f'{name:<24}{"":>12}{new["min_s"]:>12.4f} s')
+            continue
+        ratio = new['min_s'] / old['min_s'] if old['min_s'] > 0 else float('inf')
+        flag = ''
+        if ratio > 1 + threshold:
+            flag = '  SLOWER'
+            regressed = True
+        elif ratio < 1 / (1 + threshold):
+            flag = '  faster'
+        print(f'{name:<24}{old["min_s"]:>12.4f}{new["min_s"]:>12.4f} s{ratio:>8.2f}x{flag}')
+    return regressed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('-k', help='Only run the benchmarks containing this string',
+                        default='')
+    parser.add_argument('-o', help='Output JSON file (default: results/[commit].json)',
+                        default=None, metavar='FILE')
+    parser.add_argument('--compare', help='Compare against this results JSON file',
+                        default=None, metavar='FILE')
+    parser.add_argument('--threshold', help='Slow-down ratio reported as regression',
+                        type=float, default=0.1)
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {'environment': environment(), 'benchmarks': {}}
+    for bench in BENCHMARKS:
+        if args.k not in bench.name:
+            continue
+        result = bench.run()
+        results['benchmarks'][bench.name] = result
+        print(f'{bench.name:<24}{result["min_s"]:>12.4f} s{result["items_per_s"]:>14.4g} '
+              f'{result["unit"]}/s')
+
+    output_file = args.o
+    if output_file is None:
+        makedirs(RESULTS_FOLDER, exist_ok=True)
+        output_file = join(RESULTS_FOLDER, f'{results["environment"]["commit"]}.json')
+    with open(output_file, 'w', encoding='utf-8') as json_file:
+        json.dump(results, json_file, indent=2)
+    print(f'Results stored at: {output_file}')
+
+    if args.compare is not None:
+        if not isfile(args.compare):
+            sys.exit(f'No results were stored at: {args.compare}')
+        with open(args.compare, 'r', encoding='utf-8') as json_file:
+            if compare(json.load(json_file), results, args.threshold):
+                sys.exit(1)
@@ -1,17 +1,15 @@
 """Generate obtainable C values with fixed placement on Spartan 7 figure."""
-import argparse
 import sys
 import csv
-import itertools as it
 from os import getcwd
 from os.path import join, isfile
 from typing import List, Dict
-from pylfsr import LFSR # type: ignore # pylint: disable=import-error
 import numpy as np
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
+from lib import ro_stats as r_s # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'lp_variable_gp_s7')
 
@@ -31,23 +29,12 @@ CSC_THRESH = 59.0
 X_LIM = (0.5, 4.5)
 Y_LIM = (0.8, 1e4)
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 store_data = s_d.StoreData(name='csc_s7_fixed_placement')
 
 cscs: Dict[str, List[float]] = {}
 if args.d:
-    def bi2nu(bi: List[int]) -> int:
-        """Binary to decimal."""
-        result: int = 0
-        for i_, b in enumerate(bi):
-            result += b * 2**(i_)
-        return result
-
     # Parse CSV files:
     for ro_type in RO_TYPES:
         file_name_0 = join(DATA_FOLDER, (f'{ro_type}/all_configs_{ro_type}'
@@ -82,32 +69,12 @@ if args.d:
             if args.v:
                 print(f'File: {file_name_1} is empty!')
             continue
-        cscs_read: List[float] = []
-        if len(d_0s) * len(d_1s) > MAX_NB_CSC:
-            nb_db_0 = int(np.log2(len(d_0s)))
-            nb_db_1 = int(np.log2(len(d_1s)))
-            if (nb_db_0 + nb_db_1 != 40) & (nb_db_0 + nb_db_1 != 30):
-                if args.v:
-                    print(f'{ro_type}, # bits is not 40 or 30: {nb_db_0 + nb_db_1}')
-                continue
-            if nb_db_0 + nb_db_1 == 40:
-                fpoly: List[int] = [40, 37, 36, 35]
-            else:
-                fpoly = [30, 29, 26, 24]
-            L = LFSR(fpoly=fpoly, initstate=[0] * (nb_db_0 + nb_db_1 - 1) + [1], # type: ignore
-                     verbose=False)
-            for i in range(MAX_NB_CSC):
-                d0 = d_0s[bi2nu(L.state[0:nb_db_0])] # type: ignore
-                d1 = d_1s[bi2nu(L.state[nb_db_0:nb_db_0 + nb_db_1])] # type: ignore
-                if d0 == d1:
-                    continue
-                cscs_read.append(abs(d0 / (d1 - d0)))
-                L.next() # type: ignore
-        else:
-            for d0, d1 in it.product(d_0s, d_1s):
-                if d0 == d1:
-                    continue
-                cscs_read.append(abs(d0 / (d1 - d0)))
+        try:
+            cscs_read = r_s.pair_cscs(d_0s, d_1s, MAX_NB_CSC)
+        except ValueError as error:
+            if args.v:
+                print(f'{ro_type}, {error}')
+            continue
         if not cscs_read:
             if args.v:
                 print(f'{ro_type}: CSCs is empty!')
@@ -123,6 +90,9 @@ if args.d:
         for ro_type, cs in cscs.items():
             print(f'{ro_type}: mean CSC = {np.mean(cs)}, var CSC = {np.var(cs)}')
 
+    # Only store the violin plot summary of the C values:
+    cscs = {ro_type: g_m.GraphMaker.violin_stats(cs) for ro_type, cs in cscs.items()}
+
     data_to_write: List[List[float]] = []
     for ro_type in RO_TYPES:
         if ro_type in cscs:
@@ -146,8 +116,10 @@ else:
         cscs[ro_type] = d
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     for i, (ro_type, cs) in enumerate(cscs.items()):
-        plt.boxplot(cs, positions=[i]) # type: ignore
+        box_stats = g_m.GraphMaker.unpack_violin_stats(cs)[1]
+        plt.gca().bxp([box_stats], positions=[i]) # type: ignore
     plt.gca().set_yscale('log') # type: ignore
     plt.show() # type: ignore
 
@@ -173,7 +145,7 @@ graph_maker.fill_between_y(ax=ax, xs=list(X_LIM), y0s=[CSC_THRESH] * 2,
 for pos_i, (cs, ro_name) in enumerate(zip(cscs.values(), RO_NAMES)):
     graph_maker.violin(ax=ax, data=cs, color=0, position=pos_i + 1,
                        show_box=True, marker='dot', hist=False,
-                       marker_color=1, median_color=1)
+                       marker_color=1, median_color=1, stats=True)
 
 # Generate SVG:
 graph_maker.write_svg()
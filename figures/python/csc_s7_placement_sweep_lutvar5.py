@@ -1,17 +1,15 @@
 """Generate calculated C values using the LUTVar5 topology at 25 different locations figure."""
-import argparse
 import sys
 import csv
 import itertools as it
 from os import getcwd
 from os.path import join, isfile
 from typing import List, Dict, Tuple
-from pylfsr import LFSR # type: ignore # pylint: disable=import-error
-import numpy as np
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
+from lib import ro_stats as r_s # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'lp_variable_gp_s7')
 
@@ -30,23 +28,12 @@ CSC_THRESH = 59.0
 X_LIM = (0.5, 25.5)
 Y_LIM = (0.7, 1.5e4)
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 store_data = s_d.StoreData(name='csc_s7_placement_sweep_lutvar5')
 
 cscs: Dict[Tuple[int, int], List[float]] = {}
 if args.d:
-    def bi2nu(bi: List[int]) -> int:
-        """Binary to decimal."""
-        result: int = 0
-        for i_, b in enumerate(bi):
-            result += b * 2**(i_)
-        return result
-
     # Parse CSV files:
     for x_loc, (y_loc, y_loc_s) in it.product(X_LOCS, zip(Y_LOCS, Y_LOCS_S)):
         file_name = join(DATA_FOLDER, RO_TYPE,
@@ -83,32 +70,12 @@ if args.d:
             if args.v:
                 print(f'File: {file_name_s} is empty!')
             continue
-        cscs_read: List[float] = []
-        if len(d_0s) * len(d_1s) > MAX_NB_CSC:
-            nb_db_0 = int(np.log2(len(d_0s)))
-            nb_db_1 = int(np.log2(len(d_1s)))
-            if (nb_db_0 + nb_db_1 != 40) & (nb_db_0 + nb_db_1 != 30):
-                if args.v:
-                    print(f'({x_loc}, {y_loc}), # bits is not 40 or 30: {nb_db_0 + nb_db_1}')
-                continue
-            if nb_db_0 + nb_db_1 == 40:
-                fpoly: List[int] = [40, 37, 36, 35]
-            else:
-                fpoly = [30, 29, 26, 24]
-            L = LFSR(fpoly=fpoly, initstate=[0] * (nb_db_0 + nb_db_1 - 1) + [1], # type: ignore
-                     verbose=False)
-            for i in range(MAX_NB_CSC):
-                d0 = d_0s[bi2nu(L.state[0:nb_db_0])] # type: ignore
-                d1 = d_1s[bi2nu(L.state[nb_db_0:nb_db_0 + nb_db_1])] # type: ignore
-                if d0 == d1:
-                    continue
-                cscs_read.append(abs(d0 / (d1 - d0)))
-                L.next() # type: ignore
-        else:
-            for d0, d1 in it.product(d_0s, d_1s):
-                if d0 == d1:
-                    continue
-                cscs_read.append(abs(d0 / (d1 - d0)))
+        try:
+            cscs_read = r_s.pair_cscs(d_0s, d_1s, MAX_NB_CSC)
+        except ValueError as error:
+            if args.v:
+                print(f'({x_loc}, {y_loc}), {error}')
+            continue
         if not cscs_read:
             if args.v:
                 print(f'({x_loc}, {y_loc}): CSCs is empty!')
@@ -119,6 +86,9 @@ if args.d:
                   f'# dropped: {len(d_0s) * len(d_1s) - len(cscs_read)}')
         cscs[(x_loc, y_loc)] = cscs_read
 
+    # Only store the violin plot summary of the C values:
+    cscs = {loc: g_m.GraphMaker.violin_stats(cs) for loc, cs in cscs.items()}
+
     data_to_write: List[List[float]] = []
     for x_loc, y_loc in it.product(X_LOCS, Y_LOCS):
         if (x_loc, y_loc) in cscs:
@@ -142,8 +112,10 @@ else:
         cscs[(x_loc, y_loc)] = d
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     for i, ((x_loc, y_loc), cs) in enumerate(cscs.items()):
-        plt.boxplot(cs, positions=[i]) # type: ignore
+        box_stats = g_m.GraphMaker.unpack_violin_stats(cs)[1]
+        plt.gca().bxp([box_stats], positions=[i]) # type: ignore
     plt.gca().set_yscale('log') # type: ignore
     plt.show() # type: ignore
 
@@ -174,7 +146,8 @@ graph_maker.fill_between_y(ax=ax, xs=list(X_LIM), y0s=[CSC_THRESH] * 2,
 for pos_i, ((x_loc, y_loc), cs) in enumerate(cscs.items()):
     graph_maker.violin(ax=ax, data=cs, color=0, position=pos_i + 1,
                        show_box=True, marker='dot', hist=False,
-                       marker_color=1, median_color=1)
+                       marker_color=1, median_color=1, stats=True,
+                       rasterized=True)
 
 # Generate SVG:
 graph_maker.write_svg()
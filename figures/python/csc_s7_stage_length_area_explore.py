@@ -1,6 +1,5 @@
 """Generate obtained C values for different number of RO stages and omitted GP and LP constraints,
 using Area Explore figure for Spartan 7."""
-import argparse
 import sys
 import csv
 import itertools as it
@@ -8,10 +7,10 @@ from os import getcwd
 from os.path import join, isfile
 from typing import List, Dict
 import numpy as np
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'no_placement_area_explore_s7')
 
@@ -25,11 +24,7 @@ CSC_THRESH = 59.0
 X_LIM = (0.5, (len(RO_TYPES) + 1) * len(STAGE_LENGTHS) - 0.5)
 Y_LIM = (4e-2, 2e5)
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 store_data = s_d.StoreData(name='csc_s7_stage_length_area_explore')
 
@@ -70,6 +65,11 @@ if args.d:
                 print(f'{ro_type}, {stage_length} stages: mean CSC = {np.mean(cs)}, '
                       f'var CSC = {np.var(cs)}')
 
+    # Only store the violin plot summary of the C values:
+    cscs = {ro_type: {stage_length: g_m.GraphMaker.violin_stats(cs)
+                      for stage_length, cs in cscs_ro_type.items()}
+            for ro_type, cscs_ro_type in cscs.items()}
+
     data_to_write: List[List[float]] = []
     for ro_type in RO_TYPES:
         if ro_type in cscs:
@@ -99,8 +99,10 @@ else:
         cscs[ro_type][stage_length] = d
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     for i, (stage_length, ro_type) in enumerate(it.product(STAGE_LENGTHS, RO_TYPES)):
-        plt.boxplot(cscs[ro_type][stage_length], positions=[i]) # type: ignore
+        box_stats = g_m.GraphMaker.unpack_violin_stats(cscs[ro_type][stage_length])[1]
+        plt.gca().bxp([box_stats], positions=[i]) # type: ignore
     plt.gca().set_yscale('log') # type: ignore
     plt.show() # type: ignore
 
@@ -134,7 +136,7 @@ for pos_i, (stage_length, ro_type) in zip(x_label_locs, it.product(STAGE_LENGTHS
     graph_maker.violin(ax=ax, data=cscs[ro_type][stage_length], color=0,
                        position=int(pos_i),
                        show_box=True, marker='dot', hist=False,
-                       marker_color=1, median_color=1)
+                       marker_color=1, median_color=1, stats=True)
 
 # Generate stages text:
 for stage_length in STAGE_LENGTHS:
@@ -1,15 +1,14 @@
 """Generate obtained C values without specified GP and LP constraints figure for SmartFusion 2."""
-import argparse
 import sys
 import csv
 from os import getcwd
 from os.path import join, isfile
 from typing import List, Dict
 import numpy as np
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'no_placement_sf2')
 
@@ -23,11 +22,7 @@ CSC_THRESH = 100.0
 X_LIM = (0.5, 4.5)
 Y_LIM = (3e-2, 5e4)
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 store_data = s_d.StoreData(name='csc_sf2_no_placement')
 
@@ -64,6 +59,9 @@ if args.d:
         for ro_type, cs in cscs.items():
             print(f'{ro_type}: mean CSC = {np.mean(cs)}, var CSC = {np.var(cs)}')
 
+    # Only store the violin plot summary of the C values:
+    cscs = {ro_type: g_m.GraphMaker.violin_stats(cs) for ro_type, cs in cscs.items()}
+
     data_to_write: List[List[float]] = []
     for ro_type in RO_TYPES:
         if ro_type in cscs:
@@ -87,8 +85,10 @@ else:
         cscs[ro_type] = d
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     for i, (ro_type, cs) in enumerate(cscs.items()):
-        plt.boxplot(cs, positions=[i]) # type: ignore
+        box_stats = g_m.GraphMaker.unpack_violin_stats(cs)[1]
+        plt.gca().bxp([box_stats], positions=[i]) # type: ignore
     plt.gca().set_yscale('log') # type: ignore
     plt.show() # type: ignore
 
@@ -115,7 +115,7 @@ graph_maker.fill_between_y(ax=ax, xs=list(X_LIM), y0s=[CSC_THRESH] * 2,
 for pos_i, (cs, ro_name) in enumerate(zip(cscs.values(), RO_NAMES)):
     graph_maker.violin(ax=ax, data=cs, color=0, position=pos_i + 1,
                        show_box=True, marker='dot', hist=False,
-                       marker_color=1, median_color=1)
+                       marker_color=1, median_color=1, stats=True)
 
 # Generate SVG:
 graph_maker.write_svg()
@@ -1,15 +1,14 @@
 """Generate estimated min-entropy and HTP versus delta and C figure for SmartFusion 2."""
-import argparse
 import sys
 import csv
 from os import getcwd
 from os.path import join
 from typing import List
 import numpy as np
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
 
 JIT_STRENGTH = 1.6e-15
 RO_PER = 6.25e-9
@@ -21,11 +20,7 @@ NB_SAMPLES = CSC_MM[1] - CSC_MM[0]
 EXP_FOLDER = 'math_model/results/'
 RAW_DATA_FOLDER = EXP_FOLDER
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Collect data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 hs: List[float] = []
 cscs: List[float] = []
@@ -63,6 +58,7 @@ else:
     cscs, ds, hs, htps = tuple(data)
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     plt.plot(cscs, hs) # type: ignore
     plt.show() # type: ignore
     plt.plot(cscs, htps) # type: ignore
@@ -1,11 +1,13 @@
 """Generate intra LUT range on Spartan 7 figure."""
-import argparse
 import sys
 import csv
 from typing import List
+from os import getcwd
 from os.path import join
 import numpy as np
 import drawSvg as draw # type: ignore # pylint: disable=import-error
+sys.path.append(getcwd())
+from lib import script_args as s_a # pylint: disable=wrong-import-position
 
 RO_TYPES = (0, 1, 2, 3, 4, 5)
 STAGES = (1, 2, 3, 4)
@@ -19,11 +21,7 @@ BOX_X = (25, 25 + len(STAGES) * (len(RO_TYPES) * 12 + 10))
 
 MEAS_FOLDER = 'measurements/lp_variable_gp_s7'
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Collect data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 if args.d:
     if args.q:
@@ -1,15 +1,14 @@
 """Generate controller latency for variable upper bound figure for Spartan 7."""
-import argparse
 import sys
 import csv
 import itertools as it
 from os import getcwd
 from os.path import join, isfile
 from typing import List, Dict, Tuple, cast
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'no_placement_matched_control_s7')
 
@@ -22,11 +21,7 @@ MARKERS: List[str] = ['circle', 'cross', 'square', 'tri_up']
 
 Y_LIM = (1e-4, 1e-1)
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 store_data = s_d.StoreData(name='max_counts_s7_no_placement')
 
@@ -90,6 +85,7 @@ else:
         lats[ro_type][stage_length] = (ms_d, ls_d)
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     for marker, (ro_type, stage_length) in zip(MARKERS, it.product(RO_TYPES, STAGES_LENGTHS)):
         plt.plot(lats[ro_type][stage_length][0], lats[ro_type][stage_length][1], 'o') # type: ignore
     plt.gca().set_yscale('log') # type: ignore
@@ -1,7 +1,6 @@
 """Generate the measured range and resolution for all RO designs for number
 stages ranging from 1 to 4, on a congested FPGA, without placement constraints
 figure for Spartan 7."""
-import argparse
 import sys
 from typing import List, Tuple, Dict, Optional
 import csv
@@ -13,6 +12,8 @@ sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import time_logger as tl # pylint: disable=wrong-import-position
 from lib import store_data as sd # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
+from lib import ro_stats as r_s # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'no_placement_s7')
 DATA_FOLDER_CON = join('measurements', 'no_placement_congestion_s7')
@@ -25,12 +26,7 @@ TEXT_OFSETS: List[Tuple[float, float]] = [(1e-2, -7.5e-13), (4e-4, -4e-15),
                                           (1e-1, -8.1e-11), (-3e-2, -3e-11)]
 STAGES: List[int] = list(range(1, 5))
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-l', help='Time-log process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__, time_log=True)
 
 store_data = sd.StoreData(name='ranres_s7_no_placement_congest')
 
@@ -88,39 +84,13 @@ if args.d:
                 logger.iterate()
             continue
         confs, pers = periods[ro_type][stages]
-        confs_tmp: List[int] = []
-        pers_tmp: List[float] = []
-        nbs_tmp: List[int] = []
-        for conf, per in zip(confs, pers):
-            if conf in confs_tmp:
-                conf_index = confs_tmp.index(conf)
-                pers_tmp[conf_index] = (pers_tmp[conf_index] * nbs_tmp[conf_index] + per) \
-                    / (nbs_tmp[conf_index] + 1)
-                nbs_tmp[conf_index] += 1
-            else:
-                confs_tmp.append(conf)
-                pers_tmp.append(per)
-                nbs_tmp.append(1)
-        periods[ro_type][stages] = (confs_tmp, pers_tmp)
+        periods[ro_type][stages] = r_s.average_confs(confs, pers)
         if args.v & args.l:
             logger.iterate()
     if args.v & args.l:
         logger.clear()
     for ro_type, (confs, pers) in periods_con.items():
-        confs_tmp = []
-        pers_tmp = []
-        nbs_tmp = []
-        for conf, per in zip(confs, pers):
-            if conf in confs_tmp:
-                conf_index = confs_tmp.index(conf)
-                pers_tmp[conf_index] = (pers_tmp[conf_index] * nbs_tmp[conf_index] + per) \
-                    / (nbs_tmp[conf_index] + 1)
-                nbs_tmp[conf_index] += 1
-            else:
-                confs_tmp.append(conf)
-                pers_tmp.append(per)
-                nbs_tmp.append(1)
-        periods_con[ro_type] = (confs_tmp, pers_tmp)
+        periods_con[ro_type] = r_s.average_confs(confs, pers)
 
     # Calculate ranges:
     for ro_type, stages in it.product(RO_TYPES, STAGES):
@@ -129,12 +99,10 @@ if args.d:
         if ro_type not in ranges:
             ranges[ro_type] = {}
         _, pers = periods[ro_type][stages]
-        ran: float = (np.quantile(pers, 0.75) # type: ignore
-                      - np.quantile(pers, 0.25)) / np.median(pers) # type: ignore
+        ran: float = r_s.period_range(pers)
         ranges[ro_type][stages] = ran
     for ro_type, (_, pers) in periods_con.items():
-        ranges_con[ro_type] = (np.quantile(pers, 0.75) # type: ignore
-                               - np.quantile(pers, 0.25)) / np.median(pers) # type: ignore
+        ranges_con[ro_type] = r_s.period_range(pers)
 
     # Generate sorted periods:
     sorted_periods: Dict[str, Dict[int, List[float]]] = {}
@@ -156,11 +124,9 @@ if args.d:
         if ro_type not in resolutions:
             resolutions[ro_type] = {}
         pers = sorted_periods[ro_type][stages]
-        diffs: List[float] = [p1 - p0 for p0, p1 in zip(pers, pers[1:]) if p1 != p0]
-        resolutions[ro_type][stages] = np.median(diffs) # type: ignore
+        resolutions[ro_type][stages] = r_s.period_resolution(pers)
     for ro_type, sorted_pers in sorted_periods_con.items():
-        diffs = [p1 - p0 for p0, p1 in zip(sorted_pers, sorted_pers[1:]) if p1 != p0]
-        resolutions_con[ro_type] = np.median(diffs) # type: ignore
+        resolutions_con[ro_type] = r_s.period_resolution(sorted_pers)
 
     # Print out stats:
     if args.v:
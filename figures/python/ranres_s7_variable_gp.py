@@ -1,5 +1,4 @@
 """Plot the ranres point cloud for all 25 locations, for 1-4 number of stages."""
-import argparse
 import sys
 from typing import List, Tuple, Dict, Optional
 import csv
@@ -12,6 +11,8 @@ sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
 from lib import store_data as s_d # pylint: disable=wrong-import-position
 from lib import time_logger as t_l # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
+from lib import ro_stats as r_s # pylint: disable=wrong-import-position
 
 RO_NAMES: List[str] = ['LUTVar0', 'LUTVar5', 'WireVar', 'GateVar']
 RO_TYPES: List[str] = ['intralut0', 'intralut5', 'wireonly', 'muxnetwork']
@@ -25,12 +26,7 @@ STAGES: List[int] = list(range(1, 5))
 
 DATA_FOLDER = join('measurements', 'lp_variable_gp_s7')
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-l', help='Time-log process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__, time_log=True)
 
 store_data = s_d.StoreData(name='ranres_s7_variable_gp')
 
@@ -74,20 +70,7 @@ if args.d:
         if (x_loc, y_loc) not in periods[ro_type][stages]:
             continue
         confs, pers = periods[ro_type][stages][(x_loc, y_loc)]
-        confs_tmp: List[int] = []
-        pers_tmp: List[float] = []
-        nbs_tmp: List[int] = []
-        for conf, per in zip(confs, pers):
-            if conf in confs_tmp:
-                conf_index = confs_tmp.index(conf)
-                pers_tmp[conf_index] = (pers_tmp[conf_index] * nbs_tmp[conf_index] + per) \
-                    / (nbs_tmp[conf_index] + 1)
-                nbs_tmp[conf_index] += 1
-            else:
-                confs_tmp.append(conf)
-                pers_tmp.append(per)
-                nbs_tmp.append(1)
-        periods[ro_type][stages][(x_loc, y_loc)] = (confs_tmp, pers_tmp)
+        periods[ro_type][stages][(x_loc, y_loc)] = r_s.average_confs(confs, pers)
         if args.v & args.l:
             logger.iterate()
     if args.v & args.l:
@@ -102,8 +85,7 @@ if args.d:
         if stages not in ranges[ro_type]:
             ranges[ro_type][stages] = {}
         _, pers = periods[ro_type][stages][(x_loc, y_loc)]
-        ran: float = (np.quantile(pers, 0.75) # type: ignore
-                      - np.quantile(pers, 0.25)) / np.median(pers) # type: ignore
+        ran: float = r_s.period_range(pers)
         ranges[ro_type][stages][(x_loc, y_loc)] = ran
 
     # Generate sorted periods:
@@ -127,8 +109,7 @@ if args.d:
         if stages not in resolutions[ro_type]:
             resolutions[ro_type][stages] = {}
         pers = sorted_periods[ro_type][stages][(x_loc, y_loc)]
-        diffs: List[float] = [p1 - p0 for p0, p1 in zip(pers, pers[1:]) if p1 != p0]
-        resolutions[ro_type][stages][(x_loc, y_loc)] = np.median(diffs) # type: ignore
+        resolutions[ro_type][stages][(x_loc, y_loc)] = r_s.period_resolution(pers)
 
     # Print out stats:
     if args.v:
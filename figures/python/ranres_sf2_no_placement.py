@@ -1,15 +1,14 @@
 """Generate the measured range and resolution for all RO designs for number
 stages ranging from 1 to 4, without placement constraints figure for SmartFusion 2."""
-import argparse
 import sys
 from typing import List, Tuple
 import csv
 from os import getcwd
 from os.path import join
-import numpy as np
-import matplotlib.pyplot as plt
 sys.path.append(getcwd())
 from lib import graph_maker as g_m # pylint: disable=wrong-import-position
+from lib import script_args as s_a # pylint: disable=wrong-import-position
+from lib import ro_stats as r_s # pylint: disable=wrong-import-position
 
 DATA_FOLDER = join('measurements', 'no_placement_sf2')
 
@@ -19,11 +18,7 @@ STAGE_MARKERS: List[str] = ['circle', 'tri_down', 'square', 'diamond']
 TEXT_OFSETS: List[Tuple[float, float]] = [(1e-2, -1.5e-12), (2e-3, 0),
                                           (1e-1, 2e-10), (0, -3e-11)]
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', help='Print process', action='store_true')
-parser.add_argument('-d', help='Store generated data', action='store_true')
-parser.add_argument('-q', help='Quit after data collect', action='store_true')
-args = parser.parse_args()
+args = s_a.parse_args(__doc__)
 
 if args.d:
     if args.v:
@@ -73,27 +68,13 @@ for stages in range(1, 5):
 
 for ro_type, pers_ro_type in enumerate(periods):
     for nb_stages, (confs, pers) in enumerate(pers_ro_type):
-        confs_tmp: List[int] = []
-        pers_tmp: List[float] = []
-        nbs_tmp: List[int] = []
-        for conf, per in zip(confs, pers):
-            if conf in confs_tmp:
-                conf_index = confs_tmp.index(conf)
-                pers_tmp[conf_index] = (pers_tmp[conf_index] * nbs_tmp[conf_index] + per) \
-                    / (nbs_tmp[conf_index] + 1)
-                nbs_tmp[conf_index] += 1
-            else:
-                confs_tmp.append(conf)
-                pers_tmp.append(per)
-                nbs_tmp.append(1)
-        periods[ro_type][nb_stages] = (confs_tmp, pers_tmp)
+        periods[ro_type][nb_stages] = r_s.average_confs(confs, pers)
 
 ranges: List[List[float]] = []
 for ro_type, pers_ro_type in enumerate(periods):
     ranges.append([])
     for nb_stages, (confs, pers) in enumerate(pers_ro_type):
-        ranges[ro_type].append((np.quantile(pers, 0.75) # type: ignore
-                                - np.quantile(pers, 0.25)) / np.median(pers)) # type: ignore
+        ranges[ro_type].append(r_s.period_range(pers))
 
 sorted_periods: List[List[List[float]]] = []
 for ro_type, pers_ro_type in enumerate(periods):
@@ -105,10 +86,10 @@ resolutions: List[List[float]] = []
 for ro_type, pers_ro_type_sorted in enumerate(sorted_periods):
     resolutions.append([])
     for nb_stages_sorted, pers in enumerate(pers_ro_type_sorted):
-        diffs: List[float] = [p1 - p0 for p0, p1 in zip(pers, pers[1:]) if p1 != p0]
-        resolutions[ro_type].append(np.median(diffs)) # type: ignore
+        resolutions[ro_type].append(r_s.period_resolution(pers))
 
 if args.v:
+    import matplotlib.pyplot as plt # type: ignore # pylint: disable=import-outside-toplevel
     print('Plotting sorted period lengths versus quantiles.')
     for pers_ro_type_sorted in sorted_periods:
         for pers_nb_stages_sorted in pers_ro_type_sorted:
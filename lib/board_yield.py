@@ -0,0 +1,201 @@
+"""Monte-Carlo estimate of the production yield of a topology from the global placement sweep
+(measurements/lp_variable_gp_s7), which holds the mean delay of every configuration of an
+oscillator at 25 FPGA locations.
+
+A virtual board places RO0 and RO1 at random locations of the sweep. Its configuration pairs
+(sel0, sel1) have C = d0 / |d1 - d0|, and a pair is a candidate if C is within the window
+[CSCntThreshL, CSCntThreshH) of the matching controller and a count arrives before the lock
+time-out. The candidates of every location pair are counted exactly over all configuration
+pairs, by searching the bounds of the window in the sorted delays of RO0.
+
+The matching latency follows the controller model of matching_model.py for the mean C of each
+pair, without the count noise: a pair takes a window of 2^NBSamplesLog counts or, when its count
+time exceeds the lock time-out, the time-out, and a candidate matches on its first visit. The
+controller visits the pairs in pseudo-random order (as the LFSR sweep of the placement sweep
+figures), so a board visits a beta-distributed number of other pairs before its first
+candidate, whose times are summed from the mean and standard deviation of a sample of pairs:
+
+```
+ro0s = b_y.read_placements('measurements/lp_variable_gp_s7', 'muxnetwork', 3)
+ro1s = b_y.read_placements('measurements/lp_variable_gp_s7', 'muxnetwork_s', 3)
+result = b_y.simulate(b_y.PairStats(ro0s, ro1s, m_m.ControllerParams()), 10**6, seed=0)
+print(result.yield_ratio, result.mean_candidates, result.mean_latency)
+```
+"""
+from typing import Optional, List, Tuple
+import collections
+import csv
+import glob
+import os
+import re
+import numpy as np
+from lib import matching_model as m_m
+
+# Configuration pairs per location pair sampled for the visit times:
+NB_TIME_SAMPLES = 1 << 12
+
+
+class Placements:
+    """The delays [s] of the configurations of an oscillator, shape (locations, configurations),
+    and the (x, y) locations."""
+
+    def __init__(self, locations: List[Tuple[int, int]], delays: np.ndarray):
+        self.locations = locations
+        self.delays = delays
+
+    def __len__(self) -> int:
+        return len(self.locations)
+
+
+def read_placements(root: str, topology: str, stages: int) -> Placements:
+    """Read the delays of a topology at all locations of the sweep. Locations that do not have
+    the most common number of configurations, e.g., empty files, are skipped."""
+    file_names = sorted(glob.glob(os.path.join(root, topology,
+                                               f'all_configs_{topology}_x*y*_stages{stages}.csv')))
+    tables = {}
+    for file_name in file_names:
+        location = re.search(r'_x(\d+)y(\d+)_stages', os.path.basename(file_name))
+        assert location is not None
+        with open(file_name, encoding='utf-8') as csv_file:
+            csv_reader = csv.reader(csv_file, delimiter=',')
+            next(csv_reader)
+            tables[(int(location.group(1)), int(location.group(2)))] = \
+                np.array([float(row[1]) for row in csv_reader]) * 1e-9
+    if not tables:
+        raise ValueError(f'No {topology} files with {stages} stages in {root}.')
+    nb_configs = collections.Counter(len(d) for d in tables.values()).most_common(1)[0][0]
+    locations = [loc for loc, d in tables.items() if len(d) == nb_configs and nb_configs > 0]
+    return Placements(locations, np.array([tables[loc] for loc in locations]))
+
+
+def _window_bounds(d1s: np.ndarray, params: m_m.ControllerParams) -> Tuple[np.ndarray, ...]:
+    """The RO0 delays of the candidates of RO1 delays d1: C = d0 / |d1 - d0| within [L, H),
+    where H is lowered to the C of the lock time-out. For d0 < d1, C increases with d0 and the
+    candidates are within [d1 L / (L + 1), d1 H / (H + 1)), for d0 > d1, C decreases towards
+    one and they are within (d1 H / (H - 1), d1 L / (L - 1)]. Counting and sampling both use
+    these bounds, as measured delays are quantized and often fall on them."""
+    shift = params.csc_cnt_length - params.nb_check_bits
+    low = float(params.csc_thresh_l << shift)
+    highs = np.minimum(params.csc_thresh_h << shift, (params.lock_time - params.handshake_clks
+                                                      * params.clk_period) / (2 * d1s))
+    highs = np.maximum(highs, low)
+    return d1s * low / (low + 1), d1s * highs / (highs + 1), d1s * highs / (highs - 1), \
+        d1s * low / (low - 1)
+
+
+def _visit_times(d0s: np.ndarray, d1s: np.ndarray,
+                 params: m_m.ControllerParams) -> Tuple[np.ndarray, np.ndarray]:
+    """The visit times [s] of the configuration pairs and whether they are candidates."""
+    with np.errstate(divide='ignore'):
+        cscs = d0s / np.abs(d1s - d0s)
+    count_times = 2 * cscs * d1s + params.handshake_clks * params.clk_period
+    low_0s, high_0s, low_1s, high_1s = _window_bounds(d1s, params)
+    candidates = ((d0s >= low_0s) & (d0s < high_0s)) | ((d0s > low_1s) & (d0s <= high_1s))
+    return np.where(count_times < params.lock_time, params.nb_window_samples * count_times,
+                    params.lock_time), candidates
+
+
+class PairStats:
+    """Per location pair (RO0 location, RO1 location): the number of candidates and of all
+    configuration pairs, and the mean and standard deviation of the visit time [s] of the other
+    pairs and the mean visit time [s] of the candidates. Pairs of the same location of the same
+    placements are excluded by simulate."""
+
+    def __init__(self, ro0s: Placements, ro1s: Placements, params: m_m.ControllerParams,
+                 seed: Optional[int]=None):
+        self.same_placements = ro0s is ro1s
+        self.nb_pairs = ro0s.delays.shape[1] * ro1s.delays.shape[1]
+        self.nb_candidates = self._count_candidates(ro0s, ro1s, params)
+        rng = np.random.default_rng(seed)
+        if self.nb_pairs <= NB_TIME_SAMPLES:
+            sel0s, sel1s = np.divmod(np.arange(self.nb_pairs), ro1s.delays.shape[1])
+        else:
+            sel0s = rng.integers(ro0s.delays.shape[1], size=NB_TIME_SAMPLES)
+            sel1s = rng.integers(ro1s.delays.shape[1], size=NB_TIME_SAMPLES)
+        times, candidates = _visit_times(ro0s.delays[:, None, sel0s], ro1s.delays[None, :, sel1s],
+                                         params)
+        others = ~candidates
+        nb_others = np.maximum(np.sum(others, axis=-1), 1)
+        self.other_means = np.sum(times * others, axis=-1) / nb_others
+        self.other_sds = np.sqrt(np.maximum(np.sum(times**2 * others, axis=-1) / nb_others
+                                            - self.other_means**2, 0))
+        # Without sampled candidates, a candidate takes a full window at the window center:
+        shift = params.csc_cnt_length - params.nb_check_bits
+        center = (params.csc_thresh_l + params.csc_thresh_h) / 2 * (1 << shift)
+        default_times = params.nb_window_samples * (2 * center * np.mean(ro1s.delays, axis=1)
+                                                    + params.handshake_clks * params.clk_period)
+        nb_sampled = np.sum(candidates, axis=-1)
+        with np.errstate(invalid='ignore'):
+            self.candidate_means = np.where(nb_sampled > 0, np.sum(times * candidates, axis=-1)
+                                            / nb_sampled, default_times[None, :])
+
+    @staticmethod
+    def _count_candidates(ro0s: Placements, ro1s: Placements,
+                          params: m_m.ControllerParams) -> np.ndarray:
+        """Count the candidates of every location pair in the sorted RO0 delays."""
+        low_0s, high_0s, low_1s, high_1s = _window_bounds(ro1s.delays, params)
+        counts = np.zeros((len(ro0s), len(ro1s)), dtype=np.int64)
+        for loc0, d0s in enumerate(ro0s.delays):
+            d0s = np.sort(d0s)
+            below = np.searchsorted(d0s, high_0s, 'left') - np.searchsorted(d0s, low_0s, 'left')
+            above = np.searchsorted(d0s, high_1s, 'right') - np.searchsorted(d0s, low_1s, 'right')
+            counts[loc0] = np.sum(below + above, axis=-1)
+        return counts
+
+
+class YieldResult:
+    """The RO0 and RO1 location, number of candidates and matching latency [s] of every board.
+    Boards without candidates never match and have an infinite latency."""
+
+    def __init__(self, loc0s: np.ndarray, loc1s: np.ndarray, nb_candidates: np.ndarray,
+                 latencies: np.ndarray):
+        self.loc0s = loc0s
+        self.loc1s = loc1s
+        self.nb_candidates = nb_candidates
+        self.latencies = latencies
+
+    @property
+    def yield_ratio(self) -> float:
+        """The ratio of boards with at least one candidate."""
+        return float(np.mean(self.nb_candidates > 0))
+
+    @property
+    def mean_candidates(self) -> float:
+        """The expected number of candidates of a board."""
+        return float(np.mean(self.nb_candidates))
+
+    @property
+    def mean_latency(self) -> float:
+        """The expected latency [s] of the boards that match."""
+        matched = self.latencies[np.isfinite(self.latencies)]
+        return float(np.mean(matched)) if len(matched) > 0 else float('inf')
+
+    def quantiles(self, qs: Tuple[float, ...]=(0.1, 0.5, 0.9)) -> np.ndarray:
+        """The latency quantiles over all boards; boards without candidates count as
+        infinite."""
+        return np.quantile(self.latencies, qs, method='nearest')
+
+
+def simulate(stats: PairStats, nb_boards: int=100000,
+             seed: Optional[int]=None) -> YieldResult:
+    """Draw the locations of the boards and the pairs visited before their first candidate."""
+    rng = np.random.default_rng(seed)
+    nb_locs0, nb_locs1 = stats.nb_candidates.shape
+    loc0s = rng.integers(nb_locs0, size=nb_boards)
+    if stats.same_placements:
+        # Both oscillators cannot share a location:
+        loc1s = (loc0s + 1 + rng.integers(nb_locs1 - 1, size=nb_boards)) % nb_locs1
+    else:
+        loc1s = rng.integers(nb_locs1, size=nb_boards)
+    nb_candidates = stats.nb_candidates[loc0s, loc1s]
+    nb_others = stats.nb_pairs - nb_candidates
+    # The first of K candidates in a random order follows about (N - K) * Beta(1, K) others:
+    matched = nb_candidates > 0
+    firsts = np.zeros(nb_boards)
+    firsts[matched] = rng.beta(1, nb_candidates[matched])
+    nb_visits = np.minimum(np.floor(firsts * (nb_others + 1)), nb_others)
+    wait_times = nb_visits * stats.other_means[loc0s, loc1s] + np.sqrt(nb_visits) \
+        * stats.other_sds[loc0s, loc1s] * rng.standard_normal(nb_boards)
+    latencies = np.where(matched, np.maximum(wait_times, 0)
+                         + stats.candidate_means[loc0s, loc1s], np.inf)
+    return YieldResult(loc0s, loc1s, nb_candidates, latencies)
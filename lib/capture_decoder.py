@@ -0,0 +1,96 @@
+"""Decode logic analyzer captures of the serial link of sendController.v into the sent bytes.
+
+sendController.v gates the system clock onto dataClk for the eight bits of a byte, most
+significant bit first, and changes data on the rising edges of dataClk. sync is high during the
+last bit of every fourth byte, so a frame of 32 bits ends on every sync bit. The decoder samples
+data and sync on the falling edges of dataClk and packs every frame of 32 bits into 4 bytes.
+Frames of another length, e.g., due to missed clock edges, are dropped and counted.
+
+The capture holds one byte per sample with each channel on one bit, as written by most logic
+analyzers (e.g., sigrok's binary output). It is memory-mapped and decoded chunk by chunk:
+
+```
+decoder = c_d.CaptureDecoder('capture.bin', clk_bit=0, data_bit=1, sync_bit=2)
+for data in decoder.chunks():
+    ...
+```
+"""
+from typing import Iterator
+import numpy as np
+from lib import time_logger as t_l
+
+FRAME_BITS = 32
+
+
+class CaptureDecoder:
+    """Decoder of a raw capture of the (dataClk, data, sync) levels."""
+
+    def __init__(self, file_name: str, clk_bit: int=0, data_bit: int=1, sync_bit: int=2,
+                 chunk_size: int=1 << 20, max_frame_bits: int=1 << 16):
+        """Each chunk holds chunk_size samples. Bits without sync for more than max_frame_bits
+        are dropped, e.g., when sync is not connected."""
+        self.samples = np.memmap(file_name, dtype=np.uint8, mode='r')
+        self._clk_mask = np.uint8(1 << clk_bit)
+        self._data_bit = data_bit
+        self._sync_bit = sync_bit
+        self.chunk_size = chunk_size
+        self.max_frame_bits = max_frame_bits
+        # The decoding statistics:
+        self.nb_frames = 0
+        self.nb_frame_errors = 0
+        self.nb_dropped_bits = 0
+        # The bits and syncs that are not decoded yet, from the last sync bit on:
+        self._bits = np.zeros(0, dtype=np.uint8)
+        self._syncs = np.zeros(0, dtype=bool)
+
+    def _edge_levels(self, start: int, stop: int) -> np.ndarray:
+        """The levels on the falling dataClk edges of the samples start .. stop - 1, where
+        the sample before start counts for the first edge."""
+        levels = self.samples[max(start - 1, 0):stop]
+        clks = levels & self._clk_mask
+        return levels[np.flatnonzero(clks[:-1] > clks[1:]) + 1]
+
+    def _frames(self, bits: np.ndarray, syncs: np.ndarray) -> np.ndarray:
+        """Pack the frames that end on the sync bits, return the bytes."""
+        ends = np.flatnonzero(syncs)
+        lengths = np.diff(ends)
+        complete = lengths == FRAME_BITS
+        self.nb_frames += int(np.sum(complete))
+        self.nb_frame_errors += int(np.sum(~complete))
+        self.nb_dropped_bits += int(np.sum(lengths[~complete]))
+        frame_ids = ends[1:][complete, None] - FRAME_BITS + 1 + np.arange(FRAME_BITS)
+        return np.packbits(bits[frame_ids], axis=1).ravel()
+
+    def _decode(self, start: int, stop: int) -> np.ndarray:
+        """Add the bits of the samples start .. stop - 1 and decode the complete frames."""
+        levels = self._edge_levels(start, stop)
+        bits = np.concatenate((self._bits, (levels >> self._data_bit) & 1))
+        syncs = np.concatenate((self._syncs, ((levels >> self._sync_bit) & 1).astype(bool)))
+        sync_ids = np.flatnonzero(syncs)
+        data = np.zeros(0, dtype=np.uint8)
+        if len(sync_ids) > 0:
+            # The bits before the first sync have no frame, the next chunk continues from the
+            # last sync:
+            self.nb_dropped_bits += int(sync_ids[0])
+            data = self._frames(bits[sync_ids[0]:], syncs[sync_ids[0]:])
+            bits, syncs = bits[sync_ids[-1]:], syncs[sync_ids[-1]:]
+        if len(bits) > self.max_frame_bits:
+            self.nb_dropped_bits += len(bits)
+            bits, syncs = bits[:0], syncs[:0]
+        self._bits, self._syncs = bits, syncs
+        return data
+
+    def chunks(self) -> Iterator[np.ndarray]:
+        """Generate the decoded bytes, chunk by chunk. Decoding starts on the first sync."""
+        self._bits = np.zeros(0, dtype=np.uint8)
+        self._syncs = np.zeros(0, dtype=bool)
+        for start in range(0, len(self.samples), self.chunk_size):
+            stop = min(start + self.chunk_size, len(self.samples))
+            with t_l.span('decode capture'):
+                data = self._decode(start, stop)
+                t_l.count(stop - start, 'samples')
+                t_l.count(len(data), 'bytes')
+            if len(data) > 0:
+                yield data
+        # The bits after the last sync are an incomplete frame:
+        self.nb_dropped_bits += max(len(self._bits) - 1, 0)
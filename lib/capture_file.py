@@ -0,0 +1,176 @@
+"""A chunked binary file format for long coherent sampler captures.
+
+A capture holds either the 16-bit counts (CSCnt) of sampleToTransmit.v or the transmitted bytes
+of sampleToTransmitPerf.v, each holding 8 / NBLSB counts. The file consists of:
+- the magic `CSCCAP1\\0`, the header length (uint32) and the JSON header: board, topology,
+  stages, RO0Sel, RO1Sel, NBLSB, the sample type and the samples per chunk,
+- the chunks, of a fixed number of samples (except the last one), each zlib compressed if that
+  makes it smaller and raw otherwise,
+- the chunk index: offset, size, number of samples and compression flag of every chunk,
+- the index offset (uint64) and the magic `CSCIDX1\\0`.
+
+All integers are little-endian. The reader memory-maps the file and decodes the chunks lazily:
+
+```
+with c_f.CaptureWriter('capture.csc', c_f.CaptureHeader(board='s7_x0y0', nb_lsbs=16)) as writer:
+    writer.write(counts)
+with c_f.CaptureReader('capture.csc') as reader:
+    for chunk in reader.chunks():
+        ...
+    samples = reader.read(10**9, 1000)
+```
+"""
+from typing import Optional, Iterator, Dict, Any, Type
+from types import TracebackType
+import json
+import struct
+import zlib
+import numpy as np
+
+MAGIC = b'CSCCAP1\0'
+INDEX_MAGIC = b'CSCIDX1\0'
+INDEX_TYPE = np.dtype([('offset', '<u8'), ('size', '<u8'), ('nb_samples', '<u8'),
+                       ('compressed', 'u1')])
+# NBLSB of a capture of full counts:
+CNT_WIDTH = 16
+
+
+class CaptureHeader:
+    """The configuration of the captured board. NBLSB is CNT_WIDTH for a capture of full counts
+    and the number of bits per count in each byte otherwise."""
+
+    def __init__(self, board: str='', topology: str='', stages: int=0, ro0_sel: int=0,
+                 ro1_sel: int=0, nb_lsbs: int=CNT_WIDTH, chunk_size: int=1 << 20):
+        self.board = board
+        self.topology = topology
+        self.stages = stages
+        self.ro0_sel = ro0_sel
+        self.ro1_sel = ro1_sel
+        self.nb_lsbs = nb_lsbs
+        self.chunk_size = chunk_size
+
+    @property
+    def dtype(self) -> np.dtype:
+        """The type of the stored samples."""
+        return np.dtype('<u2') if self.nb_lsbs == CNT_WIDTH else np.dtype('u1')
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The header as JSON-serializable dict."""
+        return {'board': self.board, 'topology': self.topology, 'stages': self.stages,
+                'ro0_sel': self.ro0_sel, 'ro1_sel': self.ro1_sel, 'nb_lsbs': self.nb_lsbs,
+                'dtype': self.dtype.str, 'chunk_size': self.chunk_size}
+
+    @classmethod
+    def from_dict(cls, header: Dict[str, Any]) -> 'CaptureHeader':
+        """Parse the header dict of a capture file."""
+        return cls(header['board'], header['topology'], header['stages'], header['ro0_sel'],
+                   header['ro1_sel'], header['nb_lsbs'], header['chunk_size'])
+
+    def __repr__(self) -> str:
+        return ', '.join(f'{key}: {value}' for key, value in self.to_dict().items())
+
+
+class CaptureWriter:
+    """Write a capture file, chunk by chunk. The index is written on close."""
+
+    def __init__(self, file_name: str, header: CaptureHeader, compress_level: int=1):
+        """Compression level 0 stores every chunk raw."""
+        self.header = header
+        self._compress_level = compress_level
+        self._file = open(file_name, 'wb') # pylint: disable=consider-using-with
+        header_bytes = json.dumps(header.to_dict()).encode('utf-8')
+        self._file.write(MAGIC + struct.pack('<I', len(header_bytes)) + header_bytes)
+        self._index = []
+        self._buffer = np.zeros(0, dtype=header.dtype)
+
+    def write(self, samples: np.ndarray) -> None:
+        """Append the samples, writing every full chunk."""
+        samples = np.concatenate((self._buffer, np.asarray(samples).astype(self.header.dtype)))
+        nb_full = len(samples) // self.header.chunk_size * self.header.chunk_size
+        for start in range(0, nb_full, self.header.chunk_size):
+            self._write_chunk(samples[start:start + self.header.chunk_size])
+        self._buffer = samples[nb_full:]
+
+    def _write_chunk(self, samples: np.ndarray) -> None:
+        data = samples.tobytes()
+        compressed = zlib.compress(data, self._compress_level) if self._compress_level > 0 \
+            else data
+        is_compressed = len(compressed) < len(data)
+        payload = compressed if is_compressed else data
+        self._index.append((self._file.tell(), len(payload), len(samples), is_compressed))
+        self._file.write(payload)
+
+    def close(self) -> None:
+        """Write the last chunk and the index."""
+        if self._file.closed:
+            return
+        if len(self._buffer) > 0:
+            self._write_chunk(self._buffer)
+        index_offset = self._file.tell()
+        self._file.write(np.array(self._index, dtype=INDEX_TYPE).tobytes())
+        self._file.write(struct.pack('<Q', index_offset) + INDEX_MAGIC)
+        self._file.close()
+
+    def __enter__(self) -> 'CaptureWriter':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
+
+
+class CaptureReader:
+    """Read a capture file through a memory map."""
+
+    def __init__(self, file_name: str):
+        self._data = np.memmap(file_name, dtype=np.uint8, mode='r')
+        if bytes(self._data[:len(MAGIC)]) != MAGIC \
+                or bytes(self._data[-len(INDEX_MAGIC):]) != INDEX_MAGIC:
+            raise ValueError(f'{file_name} is not a complete capture file.')
+        header_length = struct.unpack('<I', bytes(self._data[len(MAGIC):len(MAGIC) + 4]))[0]
+        header_start = len(MAGIC) + 4
+        self.header = CaptureHeader.from_dict(json.loads(
+            bytes(self._data[header_start:header_start + header_length]).decode('utf-8')))
+        footer_start = len(self._data) - len(INDEX_MAGIC) - 8
+        index_offset = struct.unpack('<Q', bytes(self._data[footer_start:footer_start + 8]))[0]
+        self.index = np.frombuffer(self._data[index_offset:footer_start], dtype=INDEX_TYPE)
+        self.nb_samples = int(np.sum(self.index['nb_samples']))
+
+    def __len__(self) -> int:
+        return self.nb_samples
+
+    def chunk(self, chunk_id: int) -> np.ndarray:
+        """The samples of a chunk. Raw chunks are views on the memory map."""
+        offset, size, _, compressed = self.index[chunk_id]
+        payload = self._data[int(offset):int(offset) + int(size)]
+        if compressed:
+            return np.frombuffer(zlib.decompress(payload), dtype=self.header.dtype)
+        return payload.view(self.header.dtype)
+
+    def chunks(self, start_chunk: int=0) -> Iterator[np.ndarray]:
+        """Generate the samples chunk by chunk."""
+        for chunk_id in range(start_chunk, len(self.index)):
+            yield self.chunk(chunk_id)
+
+    def read(self, start: int, nb_samples: int) -> np.ndarray:
+        """The samples start .. start + nb_samples - 1, as far as the capture holds them."""
+        stop = min(start + nb_samples, self.nb_samples)
+        if start >= stop:
+            return np.zeros(0, dtype=self.header.dtype)
+        chunk_size = self.header.chunk_size
+        first, last = start // chunk_size, (stop - 1) // chunk_size
+        samples = np.concatenate([self.chunk(c) for c in range(first, last + 1)])
+        return samples[start - first * chunk_size:stop - first * chunk_size]
+
+    def close(self) -> None:
+        """Release the memory map."""
+        del self._data
+
+    def __enter__(self) -> 'CaptureReader':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.close()
@@ -0,0 +1,171 @@
+"""Event-driven simulation of the coherent sampler (hardware/verilog_code/*/coherentSampler.v).
+
+The sampling oscillator RO1 samples the oscillator RO0 in a flip-flop, whose output S0 is the
+beat signal. The asynchronous counter counts the RO1 periods of one beat, i.e., between two
+rising edges of S0, and raises the request on the second edge. The acknowledge of the
+controller clears the request and resets the counter, after which counting restarts on the
+next beat edge. The controller therefore gets at most one count per two beats.
+
+Every oscillator period is drawn independently from a normal distribution. Many independent
+oscillator pairs are simulated at once, a block of RO1 periods at a time:
+
+```
+sampler = c_s.CoherentSampler(per0s=3.69e-9, per1s=3.65e-9, jit0s=4e-12, jit1s=4e-12,
+                              nb_pairs=100)
+for counts in sampler.stream(10000):
+    ...
+```
+"""
+from typing import Optional, Iterator, List, Tuple, Union
+import numpy as np
+from lib import time_logger as t_l
+
+ArrayLike = Union[float, np.ndarray]
+
+
+def period_sd(jitter_strength: float, period: float) -> float:
+    """The standard deviation of an oscillator period for the given jitter strength [s],
+    as in math_model/generate_h_vs_csc.py."""
+    return float(np.sqrt(jitter_strength * period))
+
+
+class CoherentSampler:
+    """A batch of independent oscillator pairs driving coherent samplers."""
+
+    def __init__(self, per0s: ArrayLike, per1s: ArrayLike, jit0s: ArrayLike, jit1s: ArrayLike,
+                 nb_pairs: Optional[int]=None, cnt_width: int=16, handshake_time: float=20e-9,
+                 block_size: int=1 << 22, seed: Optional[int]=None):
+        """The mean periods (per0s, per1s) and period standard deviations (jit0s, jit1s) of the
+        sampled and sampling oscillator are given in s, per pair or for all pairs.
+        The handshake time is the time from the request to the end of the acknowledge.
+        Each block simulates about block_size oscillator periods over all pairs."""
+        if nb_pairs is None:
+            nb_pairs = int(np.size(per0s))
+        self.nb_pairs = nb_pairs
+        self.per0s = np.broadcast_to(np.asarray(per0s, dtype=np.float64), (nb_pairs,))
+        self.per1s = np.broadcast_to(np.asarray(per1s, dtype=np.float64), (nb_pairs,))
+        self.jit0s = np.broadcast_to(np.asarray(jit0s, dtype=np.float64), (nb_pairs,))
+        self.jit1s = np.broadcast_to(np.asarray(jit1s, dtype=np.float64), (nb_pairs,))
+        if np.any((self.per0s == self.per1s) & (self.jit0s == 0) & (self.jit1s == 0)):
+            raise ValueError('Oscillators with equal periods and no jitter do not beat.')
+        self.cnt_width = cnt_width
+        self.handshake_time = handshake_time
+        self._block_len = max(block_size // nb_pairs, 64)
+        self._rng = np.random.default_rng(seed)
+        # The RO1 edge count, the S0 value and the last RO0 edge time and period. The times
+        # are relative to the last simulated RO1 edge. S0 starts high, such that the first beat
+        # edge is a full rising edge:
+        self._nb_edges1 = np.zeros(nb_pairs, dtype=np.int64)
+        self._s0s = np.ones(nb_pairs, dtype=bool)
+        self._per0_lasts = self._draw(self.per0s, self.jit0s, 1)[:, 0]
+        self._time0s = -self._rng.random(nb_pairs) * self._per0_lasts
+        # The RO1 edge count on which the counter started (-1 if it waits for a start) and
+        # the time from which it may start:
+        self._starts = np.full(nb_pairs, -1, dtype=np.int64)
+        self._ready_times = np.zeros(nb_pairs)
+        self._buffers: List[List[np.ndarray]] = [[] for _ in range(nb_pairs)]
+        self._nb_buffered = np.zeros(nb_pairs, dtype=np.int64)
+
+    def _draw(self, pers: np.ndarray, jits: np.ndarray, nb_periods: int) -> np.ndarray:
+        periods = pers[:, None] + jits[:, None] * self._rng.standard_normal((len(pers),
+                                                                              nb_periods))
+        return np.maximum(periods, 0)
+
+    @t_l.span('sampler block')
+    def _block(self) -> None:
+        """Simulate the next block of RO1 periods and buffer the completed counts."""
+        nb_pairs, block_len = self.nb_pairs, self._block_len
+        time1s = np.cumsum(self._draw(self.per1s, self.jit1s, block_len), axis=1)
+        # The RO0 rising edges up to the last RO1 edge, starting with the last known one:
+        span = float(np.max(time1s[:, -1] - self._time0s))
+        nb_periods0 = int(np.max(span / self.per0s * 1.01 + 6 * np.sqrt(span / self.per0s)
+                                 * self.jit0s / self.per0s)) + 2
+        per0s = np.concatenate((self._per0_lasts[:, None],
+                                self._draw(self.per0s, self.jit0s, nb_periods0)), axis=1)
+        time0s = self._time0s[:, None] + np.concatenate(
+            (np.zeros((nb_pairs, 1)), np.cumsum(per0s[:, :-1], axis=1)), axis=1)
+        # Locate every RO1 edge within the RO0 periods, with each pair offset in time past the
+        # RO0 and RO1 edges of the previous pairs, which differ for pairs of different periods:
+        ranges = np.maximum(time0s[:, -1] - self._time0s, span)
+        offsets = np.concatenate(([0], np.cumsum(2 * ranges[:-1])))[:, None]
+        edge_ids = np.searchsorted((time0s - self._time0s[:, None] + offsets).ravel(),
+                                   (time1s - self._time0s[:, None] + offsets).ravel(),
+                                   side='right').reshape(nb_pairs, block_len) - 1
+        edge_ids -= np.arange(nb_pairs)[:, None] * time0s.shape[1]
+        rows = np.arange(nb_pairs)[:, None]
+        if np.any(edge_ids < 0) or np.any(time1s[:, -1] >= time0s[rows[:, 0], edge_ids[:, -1]]
+                                          + per0s[rows[:, 0], edge_ids[:, -1]]):
+            raise RuntimeError('RO1 edges outside the simulated RO0 periods of their pair.')
+        # RO0 is high during the first half of its period:
+        s0s = time1s - time0s[rows, edge_ids] < per0s[rows, edge_ids] / 2
+        beats = s0s & ~np.concatenate((self._s0s[:, None], s0s[:, :-1]), axis=1)
+        for pair in range(nb_pairs):
+            beat_ids = np.flatnonzero(beats[pair])
+            counts = self._count(pair, self._nb_edges1[pair] + beat_ids, time1s[pair, beat_ids])
+            if len(counts) > 0:
+                self._buffers[pair].append(counts)
+                self._nb_buffered[pair] += len(counts)
+        # Continue from the last RO1 edge, with the times relative to it:
+        last_ids = edge_ids[:, -1]
+        self._time0s = time0s[rows[:, 0], last_ids] - time1s[:, -1]
+        self._per0_lasts = per0s[rows[:, 0], last_ids]
+        self._ready_times -= time1s[:, -1]
+        self._s0s = s0s[:, -1]
+        self._nb_edges1 += block_len
+        t_l.count(nb_pairs * block_len, 'periods')
+
+    def _count(self, pair: int, beat_edges: np.ndarray, beat_times: np.ndarray) -> np.ndarray:
+        """Follow the counter and handshake of a pair over its beat edges (RO1 edge counts and
+        times) and return the completed counts."""
+        counts: List[int] = []
+        if self._starts[pair] >= 0 and len(beat_edges) > 0:
+            counts.append(int(beat_edges[0] - self._starts[pair]))
+            self._ready_times[pair] = beat_times[0] + self.handshake_time
+            self._starts[pair] = -1
+            beat_edges, beat_times = beat_edges[1:], beat_times[1:]
+        first = int(np.searchsorted(beat_times, self._ready_times[pair], side='right'))
+        if first < len(beat_edges):
+            starts, completes = self._starts_completes(beat_times, first)
+            counts += list(beat_edges[completes] - beat_edges[starts[:len(completes)]])
+            if len(starts) > len(completes):
+                self._starts[pair] = beat_edges[starts[-1]]
+            else:
+                self._ready_times[pair] = beat_times[completes[-1]] + self.handshake_time
+        return np.array(counts, dtype=np.int64) % (1 << self.cnt_width)
+
+    def _starts_completes(self, beat_times: np.ndarray, first: int) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """The beat edges (indices) on which the counter starts and completes, when it may
+        start from the given edge on. The counter can not restart on its completing edge."""
+        nb_beats = len(beat_times)
+        if np.all(np.diff(beat_times[first:]) > self.handshake_time):
+            starts = np.arange(first, nb_beats, 2)
+        else:
+            next_ids = np.maximum(np.arange(nb_beats) + 2, np.searchsorted(
+                beat_times, np.roll(beat_times, -1) + self.handshake_time, side='right'))
+            start_list = [first]
+            while next_ids[start_list[-1]] < nb_beats and start_list[-1] + 1 < nb_beats:
+                start_list.append(int(next_ids[start_list[-1]]))
+            starts = np.array(start_list, dtype=np.int64)
+        completes = starts[starts + 1 < nb_beats] + 1
+        return starts, completes
+
+    def counts(self, nb_counts: int) -> np.ndarray:
+        """The next counts of every pair, shape (nb_pairs, nb_counts)."""
+        while np.min(self._nb_buffered) < nb_counts:
+            self._block()
+        result = np.empty((self.nb_pairs, nb_counts), dtype=np.int64)
+        for pair in range(self.nb_pairs):
+            buffered = np.concatenate(self._buffers[pair])
+            result[pair] = buffered[:nb_counts]
+            self._buffers[pair] = [buffered[nb_counts:]]
+        self._nb_buffered -= nb_counts
+        return result
+
+    def stream(self, chunk_size: int, nb_chunks: Optional[int]=None) -> Iterator[np.ndarray]:
+        """Generate chunks of counts of every pair, shape (nb_pairs, chunk_size), endlessly or
+        for the given number of chunks."""
+        chunk_id = 0
+        while nb_chunks is None or chunk_id < nb_chunks:
+            yield self.counts(chunk_size)
+            chunk_id += 1
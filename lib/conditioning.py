@@ -0,0 +1,408 @@
+"""Software conditioning of the raw bits of the coherent sampler (the bytes of
+sampleToTransmitPerf.v or randShifter.v), with min-entropy accounting.
+
+The stages transform buffers of packed bytes (bytes, bytearray, memoryview or NumPy arrays),
+bits least significant first, into packed bytes, and carry the bits or bytes that do not fill
+a block to the next buffer. The bit stages are vectorized with NumPy, the hash stages call
+hashlib per block:
+- ParityFilter: the parity of every `order` consecutive bits,
+- VonNeumann: the first bit of every unequal pair of bits, dropping the equal pairs,
+- XorFold: the XOR of every `factor` consecutive bytes,
+- Sha256: the SHA-256 digest of every block of input bytes (a vetted conditioning function of
+  SP 800-90B, section 3.1.5.1.1),
+- HmacDrbg: an HMAC_DRBG with SHA-256 (SP 800-90A, section 10.1.2), reseeded with every block
+  of input bytes and generating a block of output bytes after it.
+
+Every stage maps the min-entropy per input bit to the min-entropy per output bit: the parity
+and XOR stages by the piling-up lemma, the von Neumann stage to one, and the hash stages by the
+output entropy of a vetted conditioning function (SP 800-90B, section 3.1.5.1.2); the bit and
+XOR stages assume independent input bits. A Pipeline chains the stages and accounts the entropy
+of its output:
+
+```
+pipeline = c_d.Pipeline([c_d.ParityFilter(2), c_d.Sha256(64)], h_in=0.8)
+for data in chunks:
+    output_file.write(pipeline.process(data))
+print(pipeline.report())
+```
+"""
+from typing import List, Union
+import abc
+import hashlib
+import math
+import numpy as np
+from lib import time_logger as t_l
+
+Buffer = Union[bytes, bytearray, memoryview, np.ndarray]
+
+# Output bits of SHA-256, which are also its narrowest internal width:
+DIGEST_BITS = 256
+# Block size of SHA-256, to which HMAC pads the key:
+HMAC_BLOCK_BYTES = 64
+_INNER_PAD = bytes(b ^ 0x36 for b in range(256))
+_OUTER_PAD = bytes(b ^ 0x5c for b in range(256))
+
+
+def _as_bytes(data: Buffer) -> np.ndarray:
+    """The buffer as flat uint8 array, without copying it."""
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def parity_min_entropy(h_in: float, nb_bits: int) -> float:
+    """The min-entropy per bit of the parity of nb_bits independent bits with the min-entropy
+    h_in: the bias from one half, 2^(nb_bits - 1) * bias_in^nb_bits."""
+    bias = 2.0**-h_in - 0.5
+    return -math.log2(0.5 + 2.0**(nb_bits - 1) * bias**nb_bits)
+
+
+def vetted_output_entropy(nb_in_bits: int, nb_out_bits: int, width: int, h_in: float) -> float:
+    """The min-entropy [bit] of the output of a vetted conditioning function with the narrowest
+    internal width, for inputs of nb_in_bits holding h_in bits (SP 800-90B, 3.1.5.1.2). The
+    terms are scaled by 2^-nb_in_bits to keep them in floating point range."""
+    p_high = 2.0**-h_in
+    nb_bits = min(nb_out_bits, width)
+    p_low_scaled = (1 - p_high) / (1 - 2.0**-nb_in_bits)
+    psi = p_low_scaled * 2.0**-nb_bits + p_high
+    omega = p_low_scaled * (2.0**-nb_bits + math.sqrt(2 * nb_bits * math.log(2))
+                            * 2.0**(-(nb_in_bits + nb_bits) / 2))
+    return -math.log2(max(psi, omega))
+
+
+class _BitStage(abc.ABC):
+    """A stage that transforms unpacked bits: carries the input bits of an incomplete group
+    and the output bits of an incomplete byte."""
+
+    name = ''
+
+    def __init__(self) -> None:
+        self._in_bits = np.zeros(0, dtype=np.uint8)
+        self._out_bits = np.zeros(0, dtype=np.uint8)
+
+    @abc.abstractmethod
+    def _transform(self, bits: np.ndarray) -> np.ndarray:
+        """The output bits of whole groups of input bits."""
+
+    @abc.abstractmethod
+    def _group(self) -> int:
+        """The number of input bits transformed together."""
+
+    def process(self, data: Buffer) -> np.ndarray:
+        """The packed output bytes of the buffer."""
+        bits = np.concatenate((self._in_bits, np.unpackbits(_as_bytes(data), bitorder='little')))
+        nb_used = len(bits) // self._group() * self._group()
+        self._in_bits = bits[nb_used:]
+        out_bits = np.concatenate((self._out_bits, self._transform(bits[:nb_used])))
+        nb_packed = len(out_bits) // 8 * 8
+        self._out_bits = out_bits[nb_packed:]
+        return np.packbits(out_bits[:nb_packed], bitorder='little')
+
+
+def _compact_table(order: int) -> np.ndarray:
+    """The bits at the multiples of order of every byte value, packed into 8 / order bits."""
+    values = np.arange(256)
+    return sum(((values >> (i * order)) & 1) << i for i in range(8 // order)).astype(np.uint8)
+
+
+class ParityFilter(_BitStage):
+    """The parity of every order consecutive bits. Orders that divide 8 fold the bytes onto
+    themselves instead of unpacking them."""
+
+    name = 'parity'
+
+    def __init__(self, order: int):
+        super().__init__()
+        self.order = order
+        self._in_bytes = np.zeros(0, dtype=np.uint8)
+        self._table = _compact_table(order) if 8 % order == 0 else None
+
+    def _group(self) -> int:
+        return self.order
+
+    def process(self, data: Buffer) -> np.ndarray:
+        """The packed output bytes of the buffer."""
+        if self._table is None:
+            return super().process(data)
+        # Every block of order bytes holds the 8 parities of an output byte:
+        data = np.concatenate((self._in_bytes, _as_bytes(data)))
+        nb_used = len(data) // self.order * self.order
+        self._in_bytes = data[nb_used:].copy()
+        folded = data[:nb_used]
+        shift = 1
+        while shift < self.order:
+            folded = folded ^ (folded >> shift)
+            shift *= 2
+        parities = self._table[folded]
+        output = parities[0::self.order].copy()
+        for offset in range(1, self.order):
+            output |= parities[offset::self.order] << (offset * 8 // self.order)
+        return output
+
+    def _transform(self, bits: np.ndarray) -> np.ndarray:
+        parities = bits[0::self.order].copy()
+        for offset in range(1, self.order):
+            parities ^= bits[offset::self.order]
+        return parities
+
+    def rate(self, h_in: float) -> float: # pylint: disable=unused-argument
+        """The output bits per input bit."""
+        return 1 / self.order
+
+    def min_entropy(self, h_in: float) -> float:
+        """The min-entropy per output bit, for the min-entropy per input bit."""
+        return parity_min_entropy(h_in, self.order)
+
+
+class VonNeumann(_BitStage):
+    """The first bit of every unequal pair of bits. Every 2 bytes hold 8 whole pairs, so tables
+    of their output bits and number of output bits replace the unpacking into bits: the output
+    bits of every 2 bytes are shifted to their position and added into the packed output."""
+
+    name = 'von neumann'
+
+    def __init__(self) -> None:
+        super().__init__()
+        values = np.arange(256, dtype=np.uint8)[:, None]
+        outputs = [self._transform(bits)
+                   for bits in np.unpackbits(values, axis=1, bitorder='little')]
+        table = np.array([np.packbits(o, bitorder='little')[0] if len(o) > 0 else 0
+                          for o in outputs], dtype=np.uint32)
+        lengths = np.array([len(o) for o in outputs], dtype=np.uint32)
+        firsts, seconds = np.arange(1 << 16) & 0xff, np.arange(1 << 16) >> 8
+        self._table = table[firsts] | table[seconds] << lengths[firsts]
+        self._lengths = (lengths[firsts] + lengths[seconds]).astype(np.uint8)
+
+    def _group(self) -> int:
+        return 2
+
+    def process(self, data: Buffer) -> np.ndarray:
+        """The packed output bytes of the buffer."""
+        data = _as_bytes(data)
+        # A zero byte holds equal pairs only, so it pads an odd byte without output bits:
+        if len(data) % 2 == 1:
+            data = np.append(data, np.uint8(0))
+        pairs = data.view('<u2')
+        lengths = self._lengths[pairs]
+        # The output bit position of every 2 bytes, after the carried output bits:
+        positions = np.cumsum(lengths, dtype=np.int64) - lengths + len(self._out_bits)
+        nb_bits = int(positions[-1] + lengths[-1]) if len(pairs) > 0 else len(self._out_bits)
+        # The at most 8 output bits of 2 bytes span at most 2 output bytes, and do not overlap
+        # those of other bytes:
+        shifted = self._table[pairs] << (positions & 7).astype(np.uint32)
+        output = np.zeros(nb_bits // 8 + 2, dtype=np.uint8)
+        carried = np.packbits(self._out_bits, bitorder='little')
+        output[:len(carried)] = carried
+        np.add.at(output, positions >> 3, shifted.astype(np.uint8))
+        np.add.at(output, (positions >> 3) + 1, (shifted >> 8).astype(np.uint8))
+        self._out_bits = np.unpackbits(output[nb_bits // 8:nb_bits // 8 + 1],
+                                       bitorder='little')[:nb_bits % 8]
+        return output[:nb_bits // 8]
+
+    def _transform(self, bits: np.ndarray) -> np.ndarray:
+        firsts = bits[0::2].copy()
+        return np.compress(firsts != bits[1::2], firsts)
+
+    def rate(self, h_in: float) -> float:
+        """The expected output bits per input bit of independent bits, p (1 - p)."""
+        p_max = 2.0**-h_in
+        return p_max * (1 - p_max)
+
+    def min_entropy(self, h_in: float) -> float: # pylint: disable=unused-argument
+        """The min-entropy per output bit: one for independent input bits."""
+        return 1.0
+
+
+class _BlockStage(abc.ABC):
+    """A stage that transforms blocks of block_bytes input bytes: carries an incomplete
+    block."""
+
+    name = ''
+
+    def __init__(self, block_bytes: int):
+        self.block_bytes = block_bytes
+        self._in_bytes = np.zeros(0, dtype=np.uint8)
+
+    @abc.abstractmethod
+    def _transform(self, blocks: np.ndarray) -> np.ndarray:
+        """The output bytes of whole blocks of input bytes."""
+
+    def process(self, data: Buffer) -> np.ndarray:
+        """The output bytes of the buffer."""
+        data = _as_bytes(data)
+        if len(self._in_bytes) > 0:
+            data = np.concatenate((self._in_bytes, data))
+        nb_used = len(data) // self.block_bytes * self.block_bytes
+        self._in_bytes = data[nb_used:].copy()
+        return self._transform(data[:nb_used])
+
+
+class XorFold(_BlockStage):
+    """The XOR of every factor consecutive bytes."""
+
+    name = 'xor fold'
+
+    def __init__(self, factor: int):
+        super().__init__(factor)
+
+    def _transform(self, blocks: np.ndarray) -> np.ndarray:
+        folded = blocks[0::self.block_bytes].copy()
+        for offset in range(1, self.block_bytes):
+            folded ^= blocks[offset::self.block_bytes]
+        return folded
+
+    def rate(self, h_in: float) -> float: # pylint: disable=unused-argument
+        """The output bits per input bit."""
+        return 1 / self.block_bytes
+
+    def min_entropy(self, h_in: float) -> float:
+        """The min-entropy per output bit, for the min-entropy per input bit."""
+        return parity_min_entropy(h_in, self.block_bytes)
+
+
+class Sha256(_BlockStage):
+    """The SHA-256 digest of every block of block_bytes input bytes."""
+
+    name = 'sha256'
+
+    def __init__(self, block_bytes: int=64):
+        super().__init__(block_bytes)
+
+    def _transform(self, blocks: np.ndarray) -> np.ndarray:
+        view = memoryview(blocks)
+        digests = b''.join(hashlib.sha256(view[start:start + self.block_bytes]).digest()
+                           for start in range(0, len(blocks), self.block_bytes))
+        return np.frombuffer(digests, dtype=np.uint8)
+
+    def rate(self, h_in: float) -> float: # pylint: disable=unused-argument
+        """The output bits per input bit."""
+        return DIGEST_BITS / (8 * self.block_bytes)
+
+    def min_entropy(self, h_in: float) -> float:
+        """The min-entropy per output bit, for the min-entropy per input bit."""
+        nb_in_bits = 8 * self.block_bytes
+        return vetted_output_entropy(nb_in_bits, DIGEST_BITS, DIGEST_BITS,
+                                     h_in * nb_in_bits) / DIGEST_BITS
+
+
+class HmacDrbg(_BlockStage):
+    """An HMAC_DRBG with SHA-256 and without prediction resistance requests, instantiated with
+    the first block of block_bytes input bytes and reseeded with every further block, each
+    followed by the generation of output_bytes. The output min-entropy is that of HMAC as a
+    vetted conditioning function of the seed, capped at the security strength of 256 bits per
+    generate call."""
+
+    name = 'hmac drbg'
+
+    def __init__(self, block_bytes: int=64, output_bytes: int=32):
+        super().__init__(block_bytes)
+        self.output_bytes = output_bytes
+        self._set_key(bytes(DIGEST_BITS // 8))
+        self._value = b'\x01' * (DIGEST_BITS // 8)
+
+    def _set_key(self, key: bytes) -> None:
+        """Hash the padded key once for all HMACs with it (RFC 2104), which is several times
+        faster than hmac.digest with the key."""
+        key = key.ljust(HMAC_BLOCK_BYTES, b'\x00')
+        self._inner = hashlib.sha256(key.translate(_INNER_PAD))
+        self._outer = hashlib.sha256(key.translate(_OUTER_PAD))
+
+    def _hmac(self, message: bytes) -> bytes:
+        """HMAC-SHA-256 of the message with the current key."""
+        inner, outer = self._inner.copy(), self._outer.copy()
+        inner.update(message)
+        outer.update(inner.digest())
+        return outer.digest()
+
+    def _update(self, provided: bytes) -> None:
+        """The HMAC_DRBG update function (10.1.2.2)."""
+        self._set_key(self._hmac(self._value + b'\x00' + provided))
+        self._value = self._hmac(self._value)
+        if provided:
+            self._set_key(self._hmac(self._value + b'\x01' + provided))
+            self._value = self._hmac(self._value)
+
+    def _generate(self) -> bytes:
+        """The HMAC_DRBG generate function (10.1.2.5), without additional input."""
+        output = []
+        for _ in range(-(-self.output_bytes // (DIGEST_BITS // 8))):
+            self._value = self._hmac(self._value)
+            output.append(self._value)
+        self._update(b'')
+        return b''.join(output)[:self.output_bytes]
+
+    def _transform(self, blocks: np.ndarray) -> np.ndarray:
+        view = memoryview(blocks)
+        output = []
+        for start in range(0, len(blocks), self.block_bytes):
+            # Instantiation and reseeding both update the state with the seed:
+            self._update(bytes(view[start:start + self.block_bytes]))
+            output.append(self._generate())
+        return np.frombuffer(b''.join(output), dtype=np.uint8)
+
+    def rate(self, h_in: float) -> float: # pylint: disable=unused-argument
+        """The output bits per input bit."""
+        return self.output_bytes / self.block_bytes
+
+    def min_entropy(self, h_in: float) -> float:
+        """The min-entropy per output bit, for the min-entropy per input bit."""
+        nb_in_bits, nb_out_bits = 8 * self.block_bytes, 8 * self.output_bytes
+        return vetted_output_entropy(nb_in_bits, nb_out_bits, DIGEST_BITS,
+                                     h_in * nb_in_bits) / nb_out_bits
+
+
+Stage = Union[ParityFilter, VonNeumann, XorFold, Sha256, HmacDrbg]
+
+
+def stage_from_spec(spec: str) -> Stage:
+    """The stage of a specification: parity:<order>, vn, xor:<factor>, sha256[:<block bytes>]
+    or drbg[:<block bytes>[:<output bytes>]]."""
+    name, *params = spec.split(':')
+    values = [int(p) for p in params]
+    if name == 'parity' and len(values) == 1:
+        return ParityFilter(*values)
+    if name == 'vn' and not values:
+        return VonNeumann()
+    if name == 'xor' and len(values) == 1:
+        return XorFold(*values)
+    if name == 'sha256' and len(values) <= 1:
+        return Sha256(*values)
+    if name == 'drbg' and len(values) <= 2:
+        return HmacDrbg(*values)
+    raise ValueError(f'Unknown conditioning stage {spec}.')
+
+
+class Pipeline:
+    """Chained conditioning stages for input bits with the min-entropy h_in, which count the
+    bytes into and out of every stage and time them as spans of the time logger."""
+
+    def __init__(self, stages: List[Stage], h_in: float):
+        self.stages = stages
+        self.min_entropies = [h_in]
+        for stage in stages:
+            self.min_entropies.append(stage.min_entropy(self.min_entropies[-1]))
+        self.nb_bytes = [0] * (len(stages) + 1)
+
+    def process(self, data: Buffer) -> np.ndarray:
+        """The conditioned bytes of the buffer."""
+        data = _as_bytes(data)
+        self.nb_bytes[0] += len(data)
+        for stage_id, stage in enumerate(self.stages):
+            with t_l.span(stage.name):
+                t_l.count(len(data) / 1e6, 'MB')
+                data = stage.process(data)
+            self.nb_bytes[stage_id + 1] += len(data)
+        return data
+
+    @property
+    def output_entropy(self) -> float:
+        """The min-entropy [bit] of all output bytes so far."""
+        return 8 * self.nb_bytes[-1] * self.min_entropies[-1]
+
+    def report(self) -> str:
+        """The bytes, the min-entropy per bit and the total min-entropy after every stage."""
+        lines = [f'{"stage":<16}{"bytes":>14}{"minH/bit":>12}{"minH [bit]":>16}{"rate":>10}']
+        names = ['input'] + [s.name for s in self.stages]
+        for name, nb_bytes, min_h in zip(names, self.nb_bytes, self.min_entropies):
+            rate = nb_bytes / self.nb_bytes[0] if self.nb_bytes[0] > 0 else 0
+            lines.append(f'{name:<16}{nb_bytes:>14d}{min_h:>12.6f}{8 * nb_bytes * min_h:>16.6g}'
+                         f'{rate:>10.4g}')
+        return '\n'.join(lines)
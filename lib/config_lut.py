@@ -0,0 +1,88 @@
+"""Per-device configuration lookup tables for the matching controller.
+
+The good configurations of a board and placement are stable, so instead of sweeping ROSel from
+zero after every reset, the controller can first probe a short table of the configurations that
+matched during the characterization of the board. This module ranks the configurations of an
+all_configs measurement on their predicted match probability, stores the ranked ROSel words as a
+memh file or Verilog ROM and simulates the latency of a controller that probes the table before
+falling back to the linear sweep.
+
+The ROSel word of matchingController.v selects one of 4 elements per stage with 2 bits, so only
+topologies whose selections fit into 2 * ROLength bits per RO have a table; the intralut
+measurements, with more elements per stage, do not.
+"""
+from typing import List
+import numpy as np
+from scipy.stats import binom # type: ignore
+from lib import matching_model as m_m
+
+
+def match_probabilities(table: m_m.ConfigTable, params: m_m.ControllerParams) -> np.ndarray:
+    """The probability that a full window on each configuration matches: no lock time-out and
+    at least samplesMin good counts."""
+    stats = m_m.ConfigStats(table, params)
+    p_windows = binom.sf(params.samples_min - 1, params.nb_window_samples - 1, stats.p_goods)
+    return p_windows * (1 - stats.q_locks)**params.nb_window_samples
+
+
+def rank(table: m_m.ConfigTable, params: m_m.ControllerParams, nb_entries: int=16,
+         p_min: float=0.5) -> np.ndarray:
+    """The indices of at most nb_entries configurations that match with at least probability
+    p_min, from the most likely match on, with the shortest window first on ties."""
+    p_matches = match_probabilities(table, params)
+    window_times = m_m.ConfigStats(table, params).sample_means * params.nb_window_samples
+    order = np.lexsort((window_times, -np.round(p_matches, 3)))
+    return order[p_matches[order] >= p_min][:nb_entries]
+
+
+def rosels(table: m_m.ConfigTable, configs: np.ndarray, ro_length: int=3) -> List[int]:
+    """The ROSel words {RO1Sel, RO0Sel} of the configurations. Raises a ValueError if the
+    selections do not fit into 2 bits per stage."""
+    sel_width = 2 * ro_length
+    if np.any(table.sel0s[configs] >> sel_width) or np.any(table.sel1s[configs] >> sel_width):
+        raise ValueError(f'Configuration selections exceed {sel_width} bits.')
+    return [int(table.sel1s[c]) << sel_width | int(table.sel0s[c]) for c in configs]
+
+
+def write_memh(file_name: str, words: List[int], ro_length: int=3) -> None:
+    """Store the ROSel words as a memh file, for $readmemh."""
+    nb_digits = -(-4 * ro_length // 4)
+    with open(file_name, 'w', encoding='utf-8') as memh_file:
+        for word in words:
+            memh_file.write(f'{word:0{nb_digits}x}\n')
+
+
+def write_rom(file_name: str, words: List[int], ro_length: int=3,
+              module_name: str='configROM') -> None:
+    """Store the ROSel words as a Verilog ROM module, with an asynchronous read port."""
+    width = 4 * ro_length
+    addr_width = max(int(np.ceil(np.log2(len(words)))), 1)
+    lines = ['`timescale 1ns / 1ps', '',
+             '// Ranked ROSel words {RO1Sel, RO0Sel} of the board, generated by lib/config_lut.py.',
+             '',
+             f'module {module_name} #(',
+             _param_line('ROLength', f'{ro_length},', 'Configurable ring oscillator length.'),
+             _param_line('NBEntries', f'{len(words)},', 'Number of table entries.'),
+             _param_line('AddrWidth', f'{addr_width}', 'Table address width.'),
+             '    )(',
+             '        input       [AddrWidth-1:0]     addr,                                   '
+             '// Table address.',
+             '        output      [ROLength*4-1:0]    ROSel                                   '
+             '// ROSel word at the address.',
+             '    );', '',
+             '    reg [ROLength*4-1:0] rom [0:NBEntries-1];', '',
+             '    initial begin']
+    lines += [f"        rom[{i}] = {width}'h{word:0{-(-width // 4)}x};"
+              for i, word in enumerate(words)]
+    lines += ['    end', '', '    assign ROSel = rom[addr];', '', 'endmodule', '']
+    with open(file_name, 'w', encoding='utf-8') as rom_file:
+        rom_file.write('\n'.join(lines))
+
+
+def _param_line(name: str, value: str, comment: str) -> str:
+    return f'        parameter{" " * 23}{name:<16}= {value:<21}// {comment}'
+
+
+def lut_order(table: m_m.ConfigTable, configs: np.ndarray) -> np.ndarray:
+    """The probe order of a controller that tries the table entries before the linear sweep."""
+    return np.concatenate((configs, np.arange(len(table)))).astype(np.int64)
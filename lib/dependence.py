@@ -0,0 +1,167 @@
+"""Dependence analysis of coherent sampler output: autocorrelation, lag mutual information and
+power spectral density of count or symbol streams.
+
+The math model treats the counts as independent. The analyses check this on streams too long
+for memory: each one processes the stream chunk by chunk, keeping only the samples of the
+previous chunk its lags or segments reach back to, and accumulates sums that are reduced to
+the result at the end:
+- Autocorrelation: the lagged products up to max_lag, by FFT cross-correlation of every chunk
+  with itself and the end of the previous one, O(n log n),
+- LagMutualInformation: the joint histograms of the NBLSB-bit symbols at the given lags, with
+  the p-values of the independence test (the G-test, 2 N ln(2) I is chi-squared distributed),
+- SpectralDensity: Welch's average of the periodograms of Hann-windowed, half-overlapping
+  segments, in cycles per sample.
+
+```
+acf, mi = d_p.Autocorrelation(1024), d_p.LagMutualInformation(range(1, 17), nb_bits=1)
+for counts in chunks:
+    acf.process(counts)
+    mi.process(e_n.symbols_from_counts(counts, 1))
+print(acf.autocorrelations()[1:10], mi.mutual_informations(), mi.p_values())
+```
+"""
+from typing import Iterable, Tuple
+import numpy as np
+from scipy import fft as sp_fft # type: ignore
+from scipy.stats import chi2 # type: ignore
+
+# Segments per FFT batch of the spectral density:
+SEGMENT_BATCH = 256
+
+
+class Autocorrelation:
+    """The autocovariance and autocorrelation of a stream up to max_lag, normalized by the
+    number of samples (the biased, positive semi-definite estimate)."""
+
+    def __init__(self, max_lag: int):
+        self.max_lag = max_lag
+        self.nb_samples = 0
+        # The samples are offset by the mean of the first chunk, against cancellation:
+        self._offset = 0.0
+        self._sums = np.zeros(max_lag + 1)
+        self._total = 0.0
+        self._head = np.zeros(0)
+        self._tail = np.zeros(0)
+
+    def process(self, chunk: np.ndarray) -> None:
+        """Add the lagged products that end in the chunk."""
+        samples = np.asarray(chunk, dtype=float).ravel()
+        if len(samples) == 0:
+            return
+        if self.nb_samples == 0:
+            self._offset = float(np.mean(samples))
+        samples = samples - self._offset
+        reach = np.concatenate((self._tail, samples))
+        # Zero padding by max_lag keeps the lags before the stream start out of the result:
+        size = sp_fft.next_fast_len(len(reach) + self.max_lag + 1, real=True)
+        products = sp_fft.irfft(sp_fft.rfft(reach, size) * np.conj(sp_fft.rfft(samples, size)),
+                                size)
+        self._sums += products[(len(self._tail) - np.arange(self.max_lag + 1)) % size]
+        self._total += float(np.sum(samples))
+        if len(self._head) < self.max_lag:
+            self._head = np.concatenate((self._head, samples[:self.max_lag - len(self._head)]))
+        self._tail = reach[max(len(reach) - self.max_lag, 0):]
+        self.nb_samples += len(samples)
+
+    def autocovariances(self) -> np.ndarray:
+        """The autocovariance at the lags 0 .. max_lag (NaN beyond the stream length)."""
+        lags = np.arange(self.max_lag + 1)
+        nb_pairs = self.nb_samples - lags
+        mean = self._total / max(self.nb_samples, 1)
+        # The sums of the first and last nb_pairs samples:
+        head_sums = np.concatenate(([0], np.cumsum(self._head)))
+        tail_sums = np.concatenate(([0], np.cumsum(self._tail[::-1])))
+        nb_known = min(len(head_sums), len(tail_sums), self.max_lag + 1)
+        firsts, lasts = np.full(self.max_lag + 1, self._total), np.full(self.max_lag + 1,
+                                                                      self._total)
+        firsts[:nb_known] -= tail_sums[:nb_known]
+        lasts[:nb_known] -= head_sums[:nb_known]
+        covariances = (self._sums - mean * (firsts + lasts) + nb_pairs * mean**2) \
+            / max(self.nb_samples, 1)
+        return np.where(nb_pairs > 0, covariances, np.nan)
+
+    def autocorrelations(self) -> np.ndarray:
+        """The autocorrelation at the lags 0 .. max_lag."""
+        covariances = self.autocovariances()
+        return covariances / covariances[0]
+
+    def bound(self, z_score: float=4.0) -> float:
+        """The magnitude that the autocorrelation of an independent stream exceeds with the
+        probability of a normal z_score, at each lag."""
+        return z_score / np.sqrt(max(self.nb_samples, 1))
+
+
+class LagMutualInformation:
+    """The mutual information [bit] between the NBLSB-bit symbols at the given lags."""
+
+    def __init__(self, lags: Iterable[int], nb_bits: int=1):
+        self.lags = np.array(sorted(lags), dtype=np.int64)
+        self.nb_symbols = 1 << nb_bits
+        self.counts = np.zeros((len(self.lags), self.nb_symbols * self.nb_symbols),
+                               dtype=np.int64)
+        self._tail = np.zeros(0, dtype=np.int64)
+
+    def process(self, symbols: np.ndarray) -> None:
+        """Add the symbol pairs that end in the chunk."""
+        symbols = np.asarray(symbols).ravel().astype(np.int64)
+        reach = np.concatenate((self._tail, symbols))
+        start = len(self._tail)
+        for lag_id, lag in enumerate(self.lags):
+            first = min(max(start, lag), len(reach))
+            pairs = reach[first - lag:len(reach) - lag] * self.nb_symbols + reach[first:]
+            self.counts[lag_id] += np.bincount(pairs, minlength=self.counts.shape[1])
+        self._tail = reach[max(len(reach) - int(self.lags[-1]), 0):]
+
+    def mutual_informations(self) -> np.ndarray:
+        """The plug-in estimate per lag."""
+        joints = self.counts.reshape(-1, self.nb_symbols, self.nb_symbols).astype(float)
+        joints /= np.maximum(np.sum(joints, axis=(1, 2), keepdims=True), 1)
+        products = np.sum(joints, axis=2, keepdims=True) * np.sum(joints, axis=1, keepdims=True)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            terms = np.where(joints > 0, joints * np.log2(joints / products), 0)
+        return np.sum(terms, axis=(1, 2))
+
+    def biases(self) -> np.ndarray:
+        """The expected plug-in estimate of independent symbols, (M - 1)^2 / (2 N ln(2))."""
+        nb_pairs = np.maximum(np.sum(self.counts, axis=1), 1)
+        return (self.nb_symbols - 1)**2 / (2 * nb_pairs * np.log(2))
+
+    def p_values(self) -> np.ndarray:
+        """The probability of an independent stream to reach the estimate, per lag."""
+        nb_pairs = np.sum(self.counts, axis=1)
+        return chi2.sf(2 * nb_pairs * np.log(2) * self.mutual_informations(),
+                       (self.nb_symbols - 1)**2)
+
+
+class SpectralDensity:
+    """The one-sided power spectral density of a stream [unit^2 per cycle per sample], by
+    Welch's method with segments of segment_length samples."""
+
+    def __init__(self, segment_length: int=1 << 12):
+        self.segment_length = segment_length
+        self.step = segment_length // 2
+        self.nb_segments = 0
+        # The periodic Hann window:
+        self._window = np.hanning(segment_length + 1)[:-1]
+        self._powers = np.zeros(segment_length // 2 + 1)
+        self._buffer = np.zeros(0)
+
+    def process(self, chunk: np.ndarray) -> None:
+        """Add the periodograms of the segments that end in the chunk."""
+        reach = np.concatenate((self._buffer, np.asarray(chunk, dtype=float).ravel()))
+        nb_segments = max((len(reach) - self.segment_length) // self.step + 1, 0)
+        for start in range(0, nb_segments, SEGMENT_BATCH):
+            stop = min(start + SEGMENT_BATCH, nb_segments)
+            segments = np.lib.stride_tricks.sliding_window_view(
+                reach[start * self.step:(stop - 1) * self.step + self.segment_length],
+                self.segment_length)[::self.step]
+            segments = (segments - np.mean(segments, axis=1, keepdims=True)) * self._window
+            self._powers += np.sum(np.abs(sp_fft.rfft(segments, axis=1))**2, axis=0)
+        self.nb_segments += nb_segments
+        self._buffer = reach[nb_segments * self.step:]
+
+    def density(self) -> Tuple[np.ndarray, np.ndarray]:
+        """The frequencies [cycles per sample] and the density at them."""
+        densities = self._powers / (max(self.nb_segments, 1) * np.sum(self._window**2))
+        densities[1:(self.segment_length + 1) // 2] *= 2
+        return sp_fft.rfftfreq(self.segment_length), densities
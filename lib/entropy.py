@@ -0,0 +1,553 @@
+"""Min-entropy estimators of NIST SP 800-90B (section 6.3) for non-IID sample streams.
+
+The estimators work on integer symbols, e.g., the NBLSB least significant bits of the coherent
+sampler counts, as extracted by sampleToTransmitPerf.v. All of them are vectorized with NumPy:
+the sequential parts of the specification, i.e., the collision walk and the predictor
+scoreboards, are rewritten as scans. The whole stream is held in memory: assess takes about
+10 to 30 s and 400 MB on 10^6 bits, and grows linearly, such that 10^8 bits take about 20 to
+50 minutes and 12 GB, mostly in the lag, MultiMMC and LZ78Y predictors.
+
+```
+symbols = e_n.symbols_from_bytes(np.fromfile('capture.bin', dtype=np.uint8), nb_lsbs=2)
+estimates = e_n.assess(symbols, nb_bits=2)
+print(estimates['min'])
+```
+
+Choices where the specification leaves room: a predictor with tied counts predicts the largest
+symbol (MultiMMC, LZ78Y) and a MultiMMC entry is a (context, symbol) pair.
+"""
+from typing import Optional, Callable, Dict, Iterator, Tuple
+import numpy as np
+from lib import time_logger as t_l
+
+Z_ALPHA = 2.576
+# The cutoff of the most common t-tuple, for the t-tuple and LRS estimates:
+TUPLE_CUTOFF = 35
+
+
+def symbols_from_counts(counts: np.ndarray, nb_lsbs: int) -> np.ndarray:
+    """The NBLSB least significant bits of every coherent sampler count."""
+    return (np.asarray(counts) & ((1 << nb_lsbs) - 1)).astype(np.uint8)
+
+
+def symbols_from_bytes(data: np.ndarray, nb_lsbs: int) -> np.ndarray:
+    """Unpack transmitted bytes into symbols of NBLSB bits, in sampling order: sampleToTransmit
+    fills each byte from its least significant bits on."""
+    shifts = np.arange(0, 8, nb_lsbs, dtype=np.uint8)
+    return ((np.asarray(data, dtype=np.uint8)[:, None] >> shifts) & ((1 << nb_lsbs) - 1)) \
+        .astype(np.uint8).ravel()
+
+
+def bytes_from_symbols(symbols: np.ndarray, nb_lsbs: int) -> np.ndarray:
+    """Pack symbols of NBLSB bits into bytes as sampleToTransmit, the inverse of
+    symbols_from_bytes. The symbols that do not fill a byte are dropped."""
+    per_byte = 8 // nb_lsbs
+    symbols = np.asarray(symbols, dtype=np.uint8)
+    symbols = symbols[:len(symbols) // per_byte * per_byte].reshape(-1, per_byte)
+    packed = symbols[:, 0].copy()
+    for position in range(1, per_byte):
+        packed |= symbols[:, position] << (position * nb_lsbs)
+    return packed
+
+
+def to_bits(symbols: np.ndarray, nb_bits: int) -> np.ndarray:
+    """Expand the symbols into a bit string, most significant bit first."""
+    shifts = np.arange(nb_bits - 1, -1, -1, dtype=np.uint8)
+    return ((np.asarray(symbols)[:, None] >> shifts) & 1).astype(np.uint8).ravel()
+
+
+def _upper_bound(p: float, nb_samples: int) -> float:
+    """The upper bound of the 99 % confidence interval of a proportion."""
+    return min(1.0, p + Z_ALPHA * np.sqrt(p * (1 - p) / (nb_samples - 1)))
+
+
+def _bisect(func: Callable[[float], float], target: float, low: float, high: float,
+            nb_iterations: int=60) -> float:
+    """Solve func(p) = target for a decreasing function on [low, high]."""
+    for _ in range(nb_iterations):
+        mid = (low + high) / 2
+        if func(mid) > target:
+            low = mid
+        else:
+            high = mid
+    return (low + high) / 2
+
+
+def _scan(transitions: np.ndarray, initial: int) -> np.ndarray:
+    """Run a finite automaton: transitions[i, s] is the state after step i from state s.
+    Return the state before every step. The steps are composed per block, such that the Python
+    loops only run over the block length and the number of blocks."""
+    nb_steps, nb_states = transitions.shape
+    block = max(int(np.sqrt(nb_steps)), 1)
+    nb_blocks = -(-nb_steps // block)
+    identity = np.tile(np.arange(nb_states, dtype=transitions.dtype),
+                       (nb_blocks * block - nb_steps, 1))
+    steps = np.concatenate((transitions, identity)).reshape(nb_blocks, block, nb_states)
+    rows = np.arange(nb_blocks)[:, None]
+    composed = np.tile(np.arange(nb_states, dtype=transitions.dtype), (nb_blocks, 1))
+    for step in range(block):
+        composed = steps[rows, step, composed]
+    starts = np.empty(nb_blocks, dtype=transitions.dtype)
+    state = initial
+    for block_id in range(nb_blocks):
+        starts[block_id] = state
+        state = composed[block_id, state]
+    states = np.empty((nb_blocks, block), dtype=transitions.dtype)
+    state_array = starts
+    for step in range(block):
+        states[:, step] = state_array
+        state_array = steps[rows[:, 0], step, state_array]
+    return states.ravel()[:nb_steps]
+
+
+@t_l.span('most common value')
+def most_common_value(symbols: np.ndarray) -> float:
+    """The most common value estimate (6.3.1)."""
+    p_max = np.max(np.bincount(symbols)) / len(symbols)
+    return float(-np.log2(_upper_bound(p_max, len(symbols))))
+
+
+@t_l.span('collision')
+def collision(bits: np.ndarray) -> float:
+    """The collision estimate (6.3.2), for bits. A collision window is two bits long if they
+    are equal and three bits long otherwise."""
+    nb_bits = len(bits)
+    equals = bits[:-1] == bits[1:]
+    # State: the number of bits to the next window start.
+    transitions = np.empty((nb_bits - 1, 3), dtype=np.int8)
+    transitions[:, 0] = np.where(equals, 1, 2)
+    transitions[:, 1] = 0
+    transitions[:, 2] = 1
+    starts = np.flatnonzero(_scan(transitions, 0) == 0)
+    lengths = np.where(equals[starts], 2, 3)
+    lengths = lengths[starts + lengths <= nb_bits]
+    mean = np.mean(lengths)
+    mean_bound = mean - Z_ALPHA * np.std(lengths, ddof=1) / np.sqrt(len(lengths))
+
+    def expected_length(p: float) -> float:
+        q = 1 - p
+        z = 1 / q
+        f_q = 2 * (1 + z + z**2 / 2) / z**3
+        return p / q**2 * (1 + (1 / p - 1 / q) / 2) * f_q - p / q * (1 / p - 1 / q) / 2
+    if mean_bound >= expected_length(0.5):
+        return 1.0
+    p = _bisect(expected_length, mean_bound, 0.5, 1 - 1e-12)
+    return float(-np.log2(p))
+
+
+@t_l.span('markov')
+def markov(bits: np.ndarray) -> float:
+    """The Markov estimate (6.3.3), for bits: the most likely 128-bit sequence."""
+    p_1 = np.mean(bits)
+    p_0 = 1 - p_1
+    pairs = np.bincount(bits[:-1] * 2 + bits[1:], minlength=4).astype(np.float64)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p_00, p_01 = pairs[0] / (pairs[0] + pairs[1]), pairs[1] / (pairs[0] + pairs[1])
+        p_10, p_11 = pairs[2] / (pairs[2] + pairs[3]), pairs[3] / (pairs[2] + pairs[3])
+    probabilities = np.nan_to_num([p_0 * p_00**127, p_0 * p_01**64 * p_10**63,
+                                   p_0 * p_01 * p_11**126, p_1 * p_10 * p_00**126,
+                                   p_1 * p_10**64 * p_01**63, p_1 * p_11**127])
+    return float(min(-np.log2(np.max(probabilities)) / 128, 1))
+
+
+@t_l.span('compression')
+def compression(bits: np.ndarray, block_bits: int=6, nb_init: int=1000) -> float:
+    """The compression estimate (6.3.4), for bits: Maurer's universal statistic on 6-bit
+    blocks."""
+    nb_blocks = len(bits) // block_bits
+    weights = 1 << np.arange(block_bits - 1, -1, -1)
+    blocks = bits[:nb_blocks * block_bits].reshape(nb_blocks, block_bits) @ weights
+    # The distance to the previous occurrence of each block (1-based positions):
+    order = np.argsort(blocks, kind='stable')
+    previous = np.zeros(nb_blocks, dtype=np.int64)
+    same = blocks[order[1:]] == blocks[order[:-1]]
+    previous[order[1:][same]] = order[:-1][same] + 1
+    positions = np.arange(1, nb_blocks + 1)
+    distances = (positions - previous)[nb_init:]
+    nb_tests = len(distances)
+    log_distances = np.log2(distances)
+    mean = np.mean(log_distances)
+    sigma = 0.5907 * np.sqrt(max(np.sum(log_distances**2) / (nb_tests - 1) - mean**2, 0))
+    mean_bound = mean - Z_ALPHA * sigma / np.sqrt(nb_tests)
+    # G(z) with the sums over t and u swapped, u < t counted per u:
+    us = np.arange(1, nb_blocks, dtype=np.float64)
+    u_weights = np.log2(us) * (nb_blocks - np.maximum(us, nb_init))
+    ts = np.arange(nb_init + 1, nb_blocks + 1, dtype=np.float64)
+    t_weights = np.log2(ts)
+
+    def g_func(z: float) -> float:
+        if z <= 0:
+            return 0.0
+        log_q = np.log1p(-z) if z < 1 else -np.inf
+        with np.errstate(invalid='ignore'):
+            u_terms = np.where(us > 1, np.exp((us - 1) * log_q), 1.0)
+            t_terms = np.exp((ts - 1) * log_q)
+        return float((z**2 * np.dot(u_weights, u_terms) + z * np.dot(t_weights, t_terms))
+                     / nb_tests)
+
+    nb_values = 1 << block_bits
+    def expected_value(p: float) -> float:
+        return g_func(p) + (nb_values - 1) * g_func((1 - p) / (nb_values - 1))
+    if mean_bound >= expected_value(1 / nb_values):
+        return 1.0
+    p = _bisect(expected_value, mean_bound, 1 / nb_values, 1 - 1e-12)
+    return float(-np.log2(p) / block_bits)
+
+
+def _tuple_counts(symbols: np.ndarray) -> Iterator[Tuple[int, int, float]]:
+    """For every tuple length t with a repeated t-tuple: t, the count of the most common
+    t-tuple and the number of pairs of equal t-tuples. Only the positions of repeated tuples
+    are extended to the next length."""
+    nb_symbols = int(np.max(symbols)) + 1
+    length = 1
+    # Small tuples are packed and counted directly:
+    keys = symbols.astype(np.int64)
+    while True:
+        counts = np.bincount(keys)
+        yield length, int(np.max(counts)), float(np.sum(counts * (counts - 1) / 2))
+        if int(np.max(counts)) < 2:
+            return
+        if nb_symbols**(length + 1) > 1 << 22:
+            break
+        keys = keys[:-1] * nb_symbols + symbols[length:]
+        length += 1
+    positions = np.flatnonzero(counts[keys] >= 2)
+    ranks = keys[positions]
+    while len(positions) > 0:
+        positions_next = positions < len(symbols) - length
+        positions, ranks = positions[positions_next], ranks[positions_next]
+        length += 1
+        _, ranks, counts = np.unique(ranks * nb_symbols + symbols[positions + length - 1],
+                                     return_inverse=True, return_counts=True)
+        if len(counts) == 0 or int(np.max(counts)) < 2:
+            return
+        yield length, int(np.max(counts)), float(np.sum(counts * (counts - 1.0) / 2))
+        repeated = counts[ranks] >= 2
+        positions, ranks = positions[repeated], ranks[repeated].astype(np.int64)
+
+
+def _tuple_estimates(symbols: np.ndarray) -> Tuple[float, float]:
+    """The t-tuple (6.3.5) and LRS (6.3.6) estimates, which share the tuple counts."""
+    nb_samples = len(symbols)
+    p_tuple, p_lrs = 0.0, 0.0
+    for length, max_count, nb_pairs in _tuple_counts(symbols):
+        if max_count >= TUPLE_CUTOFF:
+            p_tuple = max(p_tuple, (max_count / (nb_samples - length + 1))**(1 / length))
+        else:
+            nb_windows = nb_samples - length + 1
+            p_lrs = max(p_lrs, (nb_pairs / (nb_windows * (nb_windows - 1) / 2))**(1 / length))
+    h_tuple = -np.log2(_upper_bound(p_tuple, nb_samples)) if p_tuple > 0 else np.nan
+    h_lrs = -np.log2(_upper_bound(p_lrs, nb_samples)) if p_lrs > 0 else np.nan
+    return float(h_tuple), float(h_lrs)
+
+
+@t_l.span('t-tuple')
+def t_tuple(symbols: np.ndarray) -> float:
+    """The t-tuple estimate (6.3.5)."""
+    return _tuple_estimates(symbols)[0]
+
+
+@t_l.span('lrs')
+def lrs(symbols: np.ndarray) -> float:
+    """The longest repeated substring estimate (6.3.6), NaN if no tuple length applies."""
+    return _tuple_estimates(symbols)[1]
+
+
+def _p_local(nb_predictions: int, longest_run: int) -> float:
+    """The local prediction probability: the p for which the probability of no run of
+    longest_run + 1 correct predictions is 0.99."""
+    run = longest_run + 1
+
+    def no_run_probability(p: float) -> float:
+        q = 1 - p
+        if q <= 0:
+            return 0.0
+        x = 1.0
+        for _ in range(10):
+            x = 1 + q * p**run * x**(run + 1)
+        numerator = 1 - p * x
+        denominator = (run + 1 - run * x) * q
+        if numerator <= 0 or denominator <= 0:
+            return 0.0
+        return float(np.exp(np.log(numerator) - np.log(denominator)
+                            - (nb_predictions + 1) * np.log(x)))
+    return _bisect(no_run_probability, 0.99, 0, 1)
+
+
+def _predictor_estimate(correct: np.ndarray, nb_symbols: int) -> float:
+    """The min-entropy of a predictor from its correct predictions (6.3.7, steps 4 to 6)."""
+    nb_predictions = len(correct)
+    nb_correct = int(np.sum(correct))
+    if nb_correct == 0:
+        p_global = 1 - 0.01**(1 / nb_predictions)
+    else:
+        p_global = _upper_bound(nb_correct / nb_predictions, nb_predictions)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], correct.astype(np.int8), [0]))))
+    longest_run = int(np.max(edges[1::2] - edges[::2])) if len(edges) > 0 else 0
+    p_local = _p_local(nb_predictions, longest_run)
+    return float(-np.log2(max(p_global, p_local, 1 / nb_symbols)))
+
+
+def _scoreboard(symbols: np.ndarray, subpredictions: Iterator[Tuple[int, np.ndarray]],
+                nb_predictors: int) -> np.ndarray:
+    """Run the scoreboard of a multiple predictor, from the chunks (start, subpredictions) of
+    the predictions of every subpredictor (-1 for none). Return the correct predictions.
+    The winner always has the highest score, and only changes to the highest correct
+    subpredictor that reaches the highest score, which makes it a forward fill."""
+    score_type = np.int32 if len(symbols) < 1 << 31 else np.int64
+    scores = np.zeros(nb_predictors, dtype=score_type)
+    winner = 0
+    corrects = []
+    for start, chunk in subpredictions:
+        actual = symbols[start:start + len(chunk)]
+        hits = chunk == actual[:, None]
+        chunk_scores = scores + np.cumsum(hits, axis=0, dtype=score_type)
+        events = hits & (chunk_scores == np.max(chunk_scores, axis=1)[:, None])
+        event_winners = nb_predictors - 1 - np.argmax(events[:, ::-1], axis=1)
+        has_event = np.any(events, axis=1)
+        last_events = np.maximum.accumulate(np.where(has_event, np.arange(len(chunk)), -1))
+        winners_after = np.where(last_events >= 0, event_winners[np.maximum(last_events, 0)],
+                                 winner)
+        winners = np.concatenate(([winner], winners_after[:-1]))
+        predictions = chunk[np.arange(len(chunk)), winners]
+        corrects.append((predictions == actual) & (predictions >= 0))
+        scores = chunk_scores[-1]
+        winner = int(winners_after[-1])
+    return np.concatenate(corrects)
+
+
+def _chunks(start: int, stop: int, chunk_size: int) -> Iterator[Tuple[int, int]]:
+    for chunk_start in range(start, stop, chunk_size):
+        yield chunk_start, min(chunk_start + chunk_size, stop)
+
+
+@t_l.span('multi mcw')
+def multi_mcw(symbols: np.ndarray, nb_symbols: Optional[int]=None,
+              windows: Tuple[int, ...]=(63, 255, 1023, 4095), chunk_size: int=1 << 20) -> float:
+    """The multi most common in window prediction estimate (6.3.7). Ties in a window go to
+    the most recently observed symbol."""
+    if nb_symbols is None:
+        nb_symbols = int(np.max(symbols)) + 1
+    alphabet = np.unique(symbols)
+    max_window = max(windows)
+
+    def subpredictions() -> Iterator[Tuple[int, np.ndarray]]:
+        for start, stop in _chunks(windows[0], len(symbols), chunk_size):
+            context_start = max(start - max_window, 0)
+            context = symbols[context_start:stop]
+            ids = np.arange(context_start, stop)
+            chunk = np.full((stop - start, len(windows)), -1, dtype=np.int64)
+            best_counts = np.full((stop - start, len(windows)), -1, dtype=np.int64)
+            best_lasts = np.full((stop - start, len(windows)), -1, dtype=np.int64)
+            for symbol in alphabet:
+                is_symbol = context == symbol
+                cumulative = np.concatenate(([0], np.cumsum(is_symbol)))
+                # The last occurrence before each position:
+                lasts = np.concatenate(([-1], np.maximum.accumulate(np.where(is_symbol, ids,
+                                                                             -1))))
+                offsets = np.arange(start, stop) - context_start
+                for window_id, window in enumerate(windows):
+                    valid = np.arange(start, stop) >= window
+                    counts = cumulative[offsets] - cumulative[np.maximum(offsets - window, 0)]
+                    last = lasts[offsets]
+                    better = valid & ((counts > best_counts[:, window_id])
+                                      | ((counts == best_counts[:, window_id])
+                                         & (last > best_lasts[:, window_id])))
+                    chunk[better, window_id] = symbol
+                    best_counts[better, window_id] = counts[better]
+                    best_lasts[better, window_id] = last[better]
+            yield start, chunk
+    correct = _scoreboard(symbols, subpredictions(), len(windows))
+    return _predictor_estimate(correct, nb_symbols)
+
+
+@t_l.span('lag')
+def lag(symbols: np.ndarray, nb_symbols: Optional[int]=None, nb_lags: int=128,
+        chunk_size: int=1 << 16) -> float:
+    """The lag prediction estimate (6.3.8)."""
+    if nb_symbols is None:
+        nb_symbols = int(np.max(symbols)) + 1
+    # Row i of the reversed windows holds the symbols i-1, ..., i-nb_lags (-1 before the start):
+    padded = np.concatenate((np.full(nb_lags, -1), symbols)).astype(
+        np.int16 if np.max(symbols) < 1 << 15 else np.int64)
+    windows = np.lib.stride_tricks.sliding_window_view(padded, nb_lags)[:, ::-1]
+
+    def subpredictions() -> Iterator[Tuple[int, np.ndarray]]:
+        for start, stop in _chunks(1, len(symbols), chunk_size):
+            yield start, windows[start:stop]
+    correct = _scoreboard(symbols, subpredictions(), nb_lags)
+    return _predictor_estimate(correct, nb_symbols)
+
+
+def _contexts(symbols: np.ndarray, max_length: int) -> Iterator[Tuple[int, np.ndarray]]:
+    """For every context length d: the ids of the contexts symbols[i-d:i] of every position i
+    (-1 for i < d). The ids are packed symbols, made dense when they grow too large."""
+    nb_symbols = int(np.max(symbols)) + 1
+    contexts = np.zeros(len(symbols), dtype=np.int64)
+    for length in range(1, max_length + 1):
+        keys = np.full(len(symbols), -1, dtype=np.int64)
+        keys[length:] = contexts[length:] * nb_symbols + symbols[:len(symbols) - length]
+        if int(np.max(keys)) >= 1 << 40:
+            valid = keys >= 0
+            keys[valid] = np.unique(keys[valid], return_inverse=True)[1]
+        contexts = keys
+        yield length, contexts
+
+
+class _Transitions:
+    """The transitions (context, symbol) of one context length, sorted on their context. Every
+    transition is also a prediction point: its prediction counts the earlier transitions from
+    its context."""
+
+    def __init__(self, contexts: np.ndarray, symbols: np.ndarray):
+        # Small contexts get the radix sort of NumPy:
+        if len(contexts) > 0 and np.max(contexts) < 1 << 16:
+            contexts = contexts.astype(np.uint16)
+        self.order = np.argsort(contexts, kind='stable')
+        self.symbols = symbols[self.order]
+        sorted_contexts = contexts[self.order]
+        new_groups = np.concatenate(([True], sorted_contexts[1:] != sorted_contexts[:-1]))
+        self.group_ids = np.cumsum(new_groups) - 1
+        self._group_starts = np.flatnonzero(new_groups)
+
+    def prior_counts(self, symbol: int) -> np.ndarray:
+        """The number of earlier transitions from the same context to the symbol."""
+        cumulative = np.concatenate(([0], np.cumsum(self.symbols == symbol)))
+        return cumulative[:-1] - cumulative[self._group_starts[self.group_ids]]
+
+    def firsts(self, alphabet: np.ndarray) -> np.ndarray:
+        """Whether each transition is the first with its context and symbol."""
+        firsts = np.zeros(len(self.symbols), dtype=bool)
+        for symbol in alphabet:
+            is_symbol = self.symbols == symbol
+            firsts[is_symbol] = self.prior_counts(symbol)[is_symbol] == 0
+        return firsts
+
+    def predictions(self, alphabet: np.ndarray, entries: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """The most frequent earlier symbol after the context of each transition (ties: the
+        largest symbol) and its count, in position order, counting only the transitions whose
+        first occurrence is a dictionary entry. -1 and 0 without entries for the context."""
+        best = np.full(len(self.symbols), -1, dtype=np.int64)
+        best_counts = np.zeros(len(self.symbols), dtype=np.int64)
+        for symbol in alphabet:
+            in_dictionary = np.zeros(self.group_ids[-1] + 1, dtype=bool)
+            in_dictionary[self.group_ids[entries & (self.symbols == symbol)]] = True
+            counts = np.where(in_dictionary[self.group_ids], self.prior_counts(symbol), 0)
+            better = (counts > 0) & (counts >= best_counts)
+            best[better] = symbol
+            best_counts[better] = counts[better]
+        results = np.empty_like(best), np.empty_like(best_counts)
+        results[0][self.order], results[1][self.order] = best, best_counts
+        return results
+
+
+def _insertion_cutoff(orders: np.ndarray, max_entries: int) -> int:
+    """The last insertion order that still gets a dictionary entry."""
+    if len(orders) <= max_entries:
+        return np.iinfo(np.int64).max
+    return int(np.partition(orders, max_entries - 1)[max_entries - 1])
+
+
+@t_l.span('multi mmc')
+def multi_mmc(symbols: np.ndarray, nb_symbols: Optional[int]=None, max_order: int=16,
+              max_entries: int=100000, chunk_size: int=1 << 20) -> float:
+    """The multi Markov model with counting prediction estimate (6.3.9). A dictionary entry is
+    a (context, symbol) pair, every order has its own dictionary."""
+    if nb_symbols is None:
+        nb_symbols = int(np.max(symbols)) + 1
+    alphabet = np.unique(symbols)
+    first_position = 2
+    subpredictions = np.full((len(symbols) - first_position, max_order), -1,
+                             dtype=np.int8 if np.max(symbols) < 1 << 7 else np.int64)
+    for order, contexts in _contexts(symbols, max_order):
+        # The transitions ending at order .. L-1, the dictionary takes the first ones:
+        transitions = _Transitions(contexts[order:], symbols[order:])
+        firsts = transitions.firsts(alphabet)
+        cutoff = _insertion_cutoff(transitions.order[firsts], max_entries)
+        predictions = transitions.predictions(alphabet, firsts & (transitions.order <= cutoff))[0]
+        start = max(order, first_position)
+        subpredictions[start - first_position:, order - 1] = predictions[start - order:]
+
+    def chunks() -> Iterator[Tuple[int, np.ndarray]]:
+        for start, stop in _chunks(0, len(subpredictions), chunk_size):
+            yield start + first_position, subpredictions[start:stop].astype(np.int64)
+    correct = _scoreboard(symbols, chunks(), max_order)
+    return _predictor_estimate(correct, nb_symbols)
+
+
+@t_l.span('lz78y')
+def lz78y(symbols: np.ndarray, nb_symbols: Optional[int]=None, max_length: int=16,
+          max_entries: int=65536) -> float:
+    """The LZ78Y prediction estimate (6.3.10). The dictionary gets the transitions ending at
+    position B on, at each position the longest context first, until it is full. The context
+    with the highest count predicts, ties go to the longest one."""
+    if nb_symbols is None:
+        nb_symbols = int(np.max(symbols)) + 1
+    alphabet = np.unique(symbols)
+
+    def insertion_orders(length: int, transitions: _Transitions) -> np.ndarray:
+        return transitions.order * max_length + max_length - length
+    # The dictionary is shared by all context lengths, find the last insertion it takes:
+    first_orders = []
+    for length, contexts in _contexts(symbols, max_length):
+        transitions = _Transitions(contexts[max_length:], symbols[max_length:])
+        first_orders.append(insertion_orders(length, transitions)[transitions.firsts(alphabet)])
+    cutoff = _insertion_cutoff(np.concatenate(first_orders), max_entries)
+    # Step 3b visits the longest context first and only takes higher counts, so going from the
+    # shortest context up, equal counts take over:
+    predictions = np.full(len(symbols) - max_length, -1, dtype=np.int64)
+    max_counts = np.zeros(len(symbols) - max_length, dtype=np.int64)
+    for length, contexts in _contexts(symbols, max_length):
+        transitions = _Transitions(contexts[max_length:], symbols[max_length:])
+        entries = transitions.firsts(alphabet) & (insertion_orders(length, transitions) <= cutoff)
+        best, counts = transitions.predictions(alphabet, entries)
+        better = (best >= 0) & (counts >= max_counts)
+        predictions[better] = best[better]
+        max_counts[better] = counts[better]
+    correct = predictions[1:] == symbols[max_length + 1:]
+    return _predictor_estimate(correct, nb_symbols)
+
+
+BINARY_ESTIMATORS = ('most common value', 'collision', 'markov', 'compression', 't-tuple',
+                     'lrs', 'multi mcw', 'lag', 'multi mmc', 'lz78y')
+NON_BINARY_ESTIMATORS = ('most common value', 't-tuple', 'lrs', 'multi mcw', 'lag',
+                         'multi mmc', 'lz78y')
+
+
+def estimate(symbols: np.ndarray, nb_symbols: int, names: Tuple[str, ...]) -> Dict[str, float]:
+    """Run the named estimators on the symbols, return the min-entropy per symbol of each."""
+    estimators: Dict[str, Callable[[np.ndarray], float]] = {
+        'most common value': most_common_value, 'collision': collision, 'markov': markov,
+        'compression': compression,
+        'multi mcw': lambda s: multi_mcw(s, nb_symbols), 'lag': lambda s: lag(s, nb_symbols),
+        'multi mmc': lambda s: multi_mmc(s, nb_symbols), 'lz78y': lambda s: lz78y(s, nb_symbols)}
+    results: Dict[str, float] = {}
+    if 't-tuple' in names or 'lrs' in names:
+        with t_l.span('t-tuple and lrs'):
+            results['t-tuple'], results['lrs'] = _tuple_estimates(symbols)
+    for name in names:
+        if name not in results:
+            results[name] = estimators[name](symbols)
+    t_l.count(len(symbols), 'samples')
+    return {name: results[name] for name in names}
+
+
+def assess(symbols: np.ndarray, nb_bits: int=1) -> Dict[str, float]:
+    """The min-entropy per symbol of a stream of nb_bits-bit symbols (3.1.3): bit streams get
+    all estimators, other streams get the non-binary ones and all estimators on their bit
+    string. The result holds every estimate, prefixed by 'bits ' for the bit string, and the
+    final estimate under 'min'. The time and memory grow linearly with the stream, see the
+    module docstring."""
+    symbols = np.asarray(symbols).astype(np.uint8 if nb_bits <= 8 else np.int64)
+    if nb_bits == 1:
+        results = estimate(symbols, 2, BINARY_ESTIMATORS)
+        results['min'] = float(np.nanmin(list(results.values())))
+        return results
+    results = estimate(symbols, 1 << nb_bits, NON_BINARY_ESTIMATORS)
+    h_original = float(np.nanmin(list(results.values())))
+    bit_results = estimate(to_bits(symbols, nb_bits), 2, BINARY_ESTIMATORS)
+    h_bits = float(np.nanmin(list(bit_results.values())))
+    results.update({f'bits {name}': value for name, value in bit_results.items()})
+    results['min'] = min(h_original, nb_bits * h_bits)
+    return results
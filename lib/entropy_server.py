@@ -0,0 +1,282 @@
+"""An asyncio server of conditioned random bytes over a local TCP or Unix socket.
+
+A producer task takes chunks of NBLSB-bit symbols from a source (a capture file or the
+coherent sampler simulation), runs the health tests of health_tests.py on them, packs them into
+bytes as sampleToTransmit and conditions them (conditioning.py) in a worker thread, and fills a
+ring of pooled bytearrays (ByteRing), which bounds the buffered bytes. The server listens once
+the ring holds prefill_bytes, one slot by default, and the producer keeps filling the ring
+while it serves. A health test alarm discards the buffered bytes and stops the output for good;
+the end of the source stops it after the buffered bytes are served.
+
+Clients send requests of a big-endian uint32 number of bytes, at most max_request, and get a
+status byte, a big-endian uint32 length and the bytes. Requests are served in their order of
+arrival, each from consecutive bytes of the ring, so concurrent clients never share bytes. A
+request of zero bytes returns the counters of the server as JSON:
+
+```
+server = e_v.EntropyServer(symbol_chunks, nb_lsbs=1, h_claimed=0.8, stages=[c_d.Sha256()])
+await server.start(port=8642)
+reader, writer = await asyncio.open_connection('127.0.0.1', 8642)
+status, data = await e_v.fetch(reader, writer, 4096)
+```
+"""
+from typing import Optional, Iterator, List, Tuple, Dict, Any, Deque
+import asyncio
+import collections
+import json
+import struct
+import time
+import numpy as np
+from lib import conditioning as c_d
+from lib import entropy as e_n
+from lib import health_tests as h_t
+
+STATUS_OK = 0
+# The health tests alarmed, no further bytes are served:
+STATUS_FAILED = 1
+# The source ended and the buffered bytes are served:
+STATUS_EXHAUSTED = 2
+STATUS_TOO_LARGE = 3
+STATUS_NAMES = {STATUS_OK: 'ok', STATUS_FAILED: 'health test failure',
+                STATUS_EXHAUSTED: 'source exhausted', STATUS_TOO_LARGE: 'request too large'}
+REQUEST = struct.Struct('>I')
+RESPONSE = struct.Struct('>BI')
+# Request latencies kept for the quantiles:
+LATENCY_WINDOW = 1 << 14
+
+
+class ByteRing:
+    """A ring of nb_slots pooled bytearrays of slot_bytes, filled by a producer and drained by
+    the requests. Closing it with a status wakes all waiting requests; a failed ring discards
+    its bytes."""
+
+    def __init__(self, nb_slots: int=64, slot_bytes: int=1 << 16):
+        self.slot_bytes = slot_bytes
+        self.capacity = nb_slots * slot_bytes
+        self.nb_available = 0
+        self.status = STATUS_OK
+        self._slots = [bytearray(slot_bytes) for _ in range(nb_slots)]
+        self._free: Deque[int] = collections.deque(range(nb_slots))
+        # The slot, start and stop of the filled bytes, in order:
+        self._filled: Deque[List[int]] = collections.deque()
+        self._changed = asyncio.Condition()
+        self._get_lock = asyncio.Lock()
+
+    async def put(self, data: np.ndarray) -> None:
+        """Copy the bytes into the last filled slot and free slots, waiting for requests to
+        free them."""
+        view = memoryview(np.ascontiguousarray(data, dtype=np.uint8))
+        while len(view) > 0:
+            async with self._changed:
+                if self._filled and self._filled[-1][2] < self.slot_bytes:
+                    filled = self._filled[-1]
+                else:
+                    await self._changed.wait_for(lambda: self._free or self.status != STATUS_OK)
+                    if self.status != STATUS_OK:
+                        return
+                    filled = [self._free.popleft(), 0, 0]
+                    self._filled.append(filled)
+                slot, _, stop = filled
+                nb_bytes = min(len(view), self.slot_bytes - stop)
+                self._slots[slot][stop:stop + nb_bytes] = view[:nb_bytes]
+                filled[2] += nb_bytes
+                self.nb_available += nb_bytes
+                self._changed.notify_all()
+            view = view[nb_bytes:]
+
+    async def get(self, nb_bytes: int) -> Tuple[int, Optional[bytearray]]:
+        """The status and the next nb_bytes bytes, or the status of a closed ring and None if
+        it does not hold them. The bytes are taken as they arrive, one request at a time, so
+        requests larger than the ring are served too."""
+        data = bytearray(nb_bytes)
+        position = 0
+        async with self._get_lock, self._changed:
+            while position < nb_bytes:
+                await self._changed.wait_for(lambda: self.nb_available > 0
+                                             or self.status != STATUS_OK)
+                if self.status == STATUS_FAILED or self.nb_available == 0:
+                    return self.status, None
+                while position < nb_bytes and self._filled:
+                    filled = self._filled[0]
+                    slot, start, stop = filled
+                    size = min(stop - start, nb_bytes - position)
+                    data[position:position + size] = \
+                        memoryview(self._slots[slot])[start:start + size]
+                    position += size
+                    filled[1] += size
+                    self.nb_available -= size
+                    # The last slot stays filled while it has room:
+                    if filled[1] == stop and (len(self._filled) > 1
+                                              or stop == self.slot_bytes):
+                        self._filled.popleft()
+                        self._free.append(slot)
+                    if size == 0:
+                        break
+                self._changed.notify_all()
+            return STATUS_OK, data
+
+    async def wait_filled(self, nb_bytes: int) -> None:
+        """Wait until the ring holds nb_bytes bytes, at most its capacity, or is closed."""
+        nb_bytes = min(nb_bytes, self.capacity)
+        async with self._changed:
+            await self._changed.wait_for(lambda: self.nb_available >= nb_bytes
+                                         or self.status != STATUS_OK)
+
+    async def close(self, status: int) -> None:
+        """Stop filling the ring; STATUS_FAILED also discards the buffered bytes."""
+        async with self._changed:
+            self.status = status
+            if status == STATUS_FAILED:
+                for slot, _, _ in self._filled:
+                    self._slots[slot][:] = bytes(self.slot_bytes)
+                    self._free.append(slot)
+                self._filled.clear()
+                self.nb_available = 0
+            self._changed.notify_all()
+
+
+class ServerStats:
+    """The counters of the server: requests, bytes served and produced, clients, and the
+    latencies [s] from receiving a request to sending its response, of the last
+    LATENCY_WINDOW requests."""
+
+    def __init__(self) -> None:
+        self.start_time = time.perf_counter()
+        self.nb_requests = 0
+        self.nb_rejected = 0
+        self.nb_served = 0
+        self.nb_produced = 0
+        self.nb_clients = 0
+        self.nb_connections = 0
+        self._latencies = np.zeros(LATENCY_WINDOW)
+
+    def record(self, nb_bytes: int, latency: float) -> None:
+        """Count a served request."""
+        self._latencies[self.nb_requests % LATENCY_WINDOW] = latency
+        self.nb_requests += 1
+        self.nb_served += nb_bytes
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The counters, the throughput [MB/s] since the start and the latency quantiles [s]."""
+        elapsed = time.perf_counter() - self.start_time
+        latencies = self._latencies[:min(self.nb_requests, LATENCY_WINDOW)]
+        quantiles = np.quantile(latencies, (0.5, 0.9, 0.99), method='nearest') \
+            if len(latencies) > 0 else np.zeros(3)
+        return {'elapsed': elapsed, 'requests': self.nb_requests, 'rejected': self.nb_rejected,
+                'bytes served': self.nb_served, 'bytes produced': self.nb_produced,
+                'MB/s served': self.nb_served / elapsed / 1e6,
+                'MB/s produced': self.nb_produced / elapsed / 1e6,
+                'clients': self.nb_clients, 'connections': self.nb_connections,
+                'latency p50': float(quantiles[0]), 'latency p90': float(quantiles[1]),
+                'latency p99': float(quantiles[2]),
+                'latency max': float(np.max(latencies)) if len(latencies) > 0 else 0.0}
+
+
+class EntropyServer:
+    """Serve the conditioned bytes of the symbol chunks of a source, shape (nb_streams,
+    chunk_length) or (chunk_length,), with the claimed min-entropy per NBLSB-bit symbol. The
+    memory is bounded by the ring, max_clients and max_request."""
+
+    def __init__(self, source: Iterator[np.ndarray], nb_lsbs: int, h_claimed: float,
+                 stages: List[c_d.Stage], nb_slots: int=64, slot_bytes: int=1 << 16,
+                 max_request: int=1 << 16, max_clients: int=1024, alpha: float=h_t.ALPHA):
+        self.nb_lsbs = nb_lsbs
+        self.h_claimed = h_claimed
+        self.alpha = alpha
+        self.max_request = max_request
+        self.max_clients = max_clients
+        self.pipeline = c_d.Pipeline(stages, h_claimed / nb_lsbs)
+        self.ring = ByteRing(nb_slots, slot_bytes)
+        self.stats = ServerStats()
+        self.health_tests: Optional[h_t.HealthTests] = None
+        self.alarms: List[h_t.Alarm] = []
+        self.producer: Optional['asyncio.Task[None]'] = None
+        self._source = source
+
+    def _next_output(self) -> Optional[np.ndarray]:
+        """Test and condition the next chunk of the source, in a worker thread. None at the end
+        of the source; an empty output on alarms."""
+        chunk = next(self._source, None)
+        if chunk is None:
+            return None
+        chunk = np.asarray(chunk).reshape(-1, np.shape(chunk)[-1])
+        if self.health_tests is None:
+            self.health_tests = h_t.HealthTests(self.h_claimed, self.nb_lsbs, chunk.shape[0],
+                                                self.alpha)
+        self.alarms += self.health_tests.process(chunk)
+        if self.alarms:
+            return np.zeros(0, dtype=np.uint8)
+        return self.pipeline.process(np.concatenate(
+            [e_n.bytes_from_symbols(symbols, self.nb_lsbs) for symbols in chunk]))
+
+    async def produce(self) -> None:
+        """Fill the ring until the source ends or the health tests alarm."""
+        loop = asyncio.get_running_loop()
+        while True:
+            output = await loop.run_in_executor(None, self._next_output)
+            if output is None:
+                await self.ring.close(STATUS_EXHAUSTED)
+                return
+            if self.alarms:
+                await self.ring.close(STATUS_FAILED)
+                return
+            await self.ring.put(output)
+            self.stats.nb_produced += len(output)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Serve the requests of a client until it disconnects."""
+        self.stats.nb_connections += 1
+        if self.stats.nb_clients >= self.max_clients:
+            self.stats.nb_rejected += 1
+            writer.close()
+            return
+        self.stats.nb_clients += 1
+        try:
+            while True:
+                try:
+                    nb_bytes, = REQUEST.unpack(await reader.readexactly(REQUEST.size))
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    return
+                start = time.perf_counter()
+                if nb_bytes == 0:
+                    payload = json.dumps(self.stats.to_dict()).encode('utf-8')
+                    writer.write(RESPONSE.pack(STATUS_OK, len(payload)) + payload)
+                    await writer.drain()
+                    continue
+                if nb_bytes > self.max_request:
+                    writer.write(RESPONSE.pack(STATUS_TOO_LARGE, 0))
+                    await writer.drain()
+                    continue
+                status, data = await self.ring.get(nb_bytes)
+                if data is None:
+                    writer.write(RESPONSE.pack(status, 0))
+                    await writer.drain()
+                    continue
+                writer.write(RESPONSE.pack(STATUS_OK, nb_bytes))
+                writer.write(data)
+                await writer.drain()
+                self.stats.record(nb_bytes, time.perf_counter() - start)
+        finally:
+            self.stats.nb_clients -= 1
+            writer.close()
+
+    async def start(self, host: str='127.0.0.1', port: int=0, path: Optional[str]=None,
+                    prefill_bytes: Optional[int]=None) -> asyncio.AbstractServer:
+        """Start the producer and listen on the TCP port of the host, or the Unix socket
+        path, once the ring holds prefill_bytes, one slot by default."""
+        self.producer = asyncio.create_task(self.produce())
+        await self.ring.wait_filled(self.ring.slot_bytes if prefill_bytes is None
+                                    else prefill_bytes)
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+async def fetch(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                nb_bytes: int) -> Tuple[int, bytes]:
+    """Request nb_bytes bytes, or the counters as JSON for zero, and return the status and
+    the bytes."""
+    writer.write(REQUEST.pack(nb_bytes))
+    await writer.drain()
+    status, length = RESPONSE.unpack(await reader.readexactly(RESPONSE.size))
+    return status, await reader.readexactly(length)
@@ -0,0 +1,242 @@
+"""A precomputed table of the Gaussian path of the math model (math_model/generate_h_vs_csc.py)
+for fast entropy queries.
+
+The Gaussian path approximates the count R by a normal distribution with the mean C and the
+standard deviation
+
+    std R = sqrt(2 * J * C^3 / T)
+
+for the jitter strength J and period T, and bins it modulo 2^NBLSB. The entropies thus only
+depend on C and std R, instead of on J, T and C, and are periodic in C with the period 2^NBLSB.
+The tables hold the min-entropy and Shannon entropy per bit over the phase of C (C modulo
+2^NBLSB) and the logarithm of std R, and the queries interpolate them bilinearly:
+
+```
+surrogate = e_s.EntropySurrogate.load('math_model/results/entropy_surrogate_lsb1.npz')
+min_hs, hs, mean_rs, std_rs = surrogate.query(4.6e-15, 3.69e-9, np.linspace(1, 200, 1000))
+```
+
+Where the Gaussian reaches within TAIL standard deviations of zero, the model drops the counts
+below one and the periodicity breaks. Above std R = 2^NBLSB, where the bins are otherwise
+uniform within 1e-8, tail tables over (C - 0.5) / std R and 2^NBLSB / std R cover this. The
+remaining queries, below std_min (where the entropy becomes a step function of C) or near zero
+with a small std R, are evaluated exactly. The tables are stored with an estimate of their
+largest interpolation errors in max_errors: the largest errors at the centers of all table
+cells, times ERROR_MARGIN, as the errors peak slightly off the centers. This is about 8e-4 bit
+for NBLSB = 1 with the default resolution; 2e6 random queries err up to 4 % more than the
+centers. Unlike generate_h_vs_csc.py, the Gaussian is summed up to TAIL standard
+deviations instead of up to the largest simulated count, which changes the entropies by less
+than 1e-5 bit.
+"""
+from typing import Tuple
+import numpy as np
+from scipy.special import ndtr # type: ignore
+
+# Standard deviations of the Gaussian summed on either side of the mean:
+TAIL = 8.0
+# Largest number of Gaussian terms evaluated at once:
+MAX_TERMS = 1 << 22
+# Margin on the interpolation errors at the cell centers, for the estimate of the largest ones:
+ERROR_MARGIN = 1.25
+
+
+def std_rs(jit_strengths: np.ndarray, periods: np.ndarray, cscs: np.ndarray) -> np.ndarray:
+    """The standard deviation of R of the Gaussian path."""
+    return np.sqrt(2 * jit_strengths * np.asarray(cscs, dtype=float)**3 / periods)
+
+
+def bin_probabilities(cscs: np.ndarray, stds: np.ndarray, nb_bits: int=1) -> np.ndarray:
+    """The probabilities of the counts 1, 2, ... modulo 2^nb_bits, shape (len(cscs), 2^nb_bits).
+    The number of terms is set by the largest standard deviation, so large batches of mixed
+    standard deviations are better split."""
+    cscs, stds = np.broadcast_arrays(np.asarray(cscs, dtype=float),
+                                     np.asarray(stds, dtype=float))
+    cscs, stds = cscs.ravel(), stds.ravel()
+    nb_bins = 1 << nb_bits
+    if len(cscs) == 0:
+        return np.zeros((0, nb_bins))
+    half = int(np.ceil(TAIL * np.max(stds))) + 1
+    counts = np.floor(cscs).astype(np.int64)[:, None] + np.arange(-half, half + 1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        lows = (counts - 0.5 - cscs[:, None]) / stds[:, None]
+    probabilities = ndtr(lows + 1 / stds[:, None]) - ndtr(lows)
+    probabilities[counts < 1] = 0
+    bin_ids = np.arange(len(cscs))[:, None] * nb_bins + counts % nb_bins
+    return np.bincount(bin_ids.ravel(), probabilities.ravel(),
+                       len(cscs) * nb_bins).reshape(-1, nb_bins)
+
+
+def entropies(probabilities: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """The min-entropy and Shannon entropy per bit of the bin probabilities."""
+    bits = np.log2(probabilities.shape[-1])
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = np.where(probabilities > 0, probabilities * np.log2(probabilities), 0)
+    return -np.log2(np.max(probabilities, axis=-1)) / bits, -np.sum(terms, axis=-1) / bits
+
+
+def gaussian_entropies(cscs: np.ndarray, stds: np.ndarray,
+                       nb_bits: int=1) -> Tuple[np.ndarray, np.ndarray]:
+    """The min-entropy and Shannon entropy per bit of the Gaussian path, exactly. The points are
+    evaluated in batches of similar standard deviation."""
+    cscs, stds = np.broadcast_arrays(np.asarray(cscs, dtype=float),
+                                     np.asarray(stds, dtype=float))
+    shape = cscs.shape
+    cscs, stds = cscs.ravel(), stds.ravel()
+    min_hs, hs = np.zeros(len(cscs)), np.zeros(len(cscs))
+    order = np.argsort(stds)
+    start = 0
+    while start < len(order):
+        terms = 2 * int(np.ceil(TAIL * stds[order[start]])) + 3
+        stop = start + 1
+        while stop < len(order) and (stop - start + 1) \
+                * (2 * int(np.ceil(TAIL * stds[order[stop]])) + 3) <= max(MAX_TERMS, terms):
+            stop += 1
+        ids = order[start:stop]
+        min_hs[ids], hs[ids] = entropies(bin_probabilities(cscs[ids], stds[ids], nb_bits))
+        start = stop
+    return min_hs.reshape(shape), hs.reshape(shape)
+
+
+def _bilinear(table: np.ndarray, u: np.ndarray, v: np.ndarray) -> np.ndarray:
+    """Bilinear interpolation of the table at the fractional row and column indices u and v,
+    clipped to the table."""
+    u = np.clip(u, 0, table.shape[0] - 1)
+    v = np.clip(v, 0, table.shape[1] - 1)
+    rows = np.minimum(u.astype(np.int64), table.shape[0] - 2)
+    columns = np.minimum(v.astype(np.int64), table.shape[1] - 2)
+    u, v = u - rows, v - columns
+    return (table[rows, columns] * (1 - v) + table[rows, columns + 1] * v) * (1 - u) \
+        + (table[rows + 1, columns] * (1 - v) + table[rows + 1, columns + 1] * v) * u
+
+
+class EntropySurrogate:
+    """The tables of the min-entropy and Shannon entropy per bit:
+    - over the phase of C (phase_steps points per count, the first row repeated at the end) and
+      the logarithm of std R from log_std_min to log(2^nb_bits) in steps of log_std_step,
+    - the tail tables, for a Gaussian within TAIL standard deviations of zero and std R above
+      2^nb_bits, over w = 2^nb_bits / std R from 0 to 1 and z = (C - 0.5) / std R from 0 to
+      TAIL. This is smooth in both, because the periodicity in C has vanished there."""
+
+    def __init__(self, min_hs: np.ndarray, hs: np.ndarray, tail_min_hs: np.ndarray,
+                 tail_hs: np.ndarray, nb_bits: int, phase_steps: int, log_std_min: float,
+                 log_std_step: float, max_errors: Tuple[float, float]=(np.nan, np.nan)):
+        self.min_hs = min_hs
+        self.hs = hs
+        self.tail_min_hs = tail_min_hs
+        self.tail_hs = tail_hs
+        self.nb_bits = nb_bits
+        self.phase_steps = phase_steps
+        self.log_std_min = log_std_min
+        self.log_std_step = log_std_step
+        self.max_errors = max_errors
+
+    @property
+    def std_min(self) -> float:
+        """The smallest tabulated std R."""
+        return float(np.exp(self.log_std_min))
+
+    def _offset(self, stds: np.ndarray) -> np.ndarray:
+        """A multiple of 2^nb_bits to add to C to keep the Gaussian clear of zero."""
+        nb_bins = 1 << self.nb_bits
+        return nb_bins * np.ceil((TAIL * stds + 1) / nb_bins)
+
+    @classmethod
+    def build(cls, nb_bits: int=1, phase_steps: int=256, std_min: float=0.05,
+              stds_per_decade: int=64, nb_ws: int=65, nb_zs: int=257) -> 'EntropySurrogate':
+        """Tabulate the Gaussian path and estimate the largest interpolation errors."""
+        nb_bins = 1 << nb_bits
+        phases = np.arange(nb_bins * phase_steps + 1) / phase_steps
+        log_std_min = float(np.log(std_min))
+        nb_stds = int(np.ceil(np.log10(nb_bins / std_min) * stds_per_decade)) + 1
+        log_std_step = (np.log(nb_bins) - log_std_min) / (nb_stds - 1)
+        surrogate = cls(np.zeros((len(phases), nb_stds), dtype=np.float32),
+                        np.zeros((len(phases), nb_stds), dtype=np.float32),
+                        np.zeros((nb_ws, nb_zs), dtype=np.float32),
+                        np.zeros((nb_ws, nb_zs), dtype=np.float32), nb_bits, phase_steps,
+                        log_std_min, log_std_step)
+        for std_id in range(nb_stds):
+            std = np.exp(log_std_min + std_id * log_std_step)
+            surrogate.min_hs[:, std_id], surrogate.hs[:, std_id] = \
+                gaussian_entropies(phases + surrogate._offset(std), std, nb_bits)
+        zs = np.linspace(0, TAIL, nb_zs)
+        # At w = 0, the bins are uniform and hold the mass above 0.5:
+        masses = ndtr(zs)
+        surrogate.tail_min_hs[0] = -np.log2(masses / nb_bins) / nb_bits
+        surrogate.tail_hs[0] = -masses * np.log2(masses / nb_bins) / nb_bits
+        for w_id in range(1, nb_ws):
+            std = nb_bins * (nb_ws - 1) / w_id
+            surrogate.tail_min_hs[w_id], surrogate.tail_hs[w_id] = \
+                gaussian_entropies(0.5 + zs * std, std, nb_bits)
+        min_h_error, h_error = surrogate.errors()
+        surrogate.max_errors = (ERROR_MARGIN * min_h_error, ERROR_MARGIN * h_error)
+        return surrogate
+
+    def errors(self) -> Tuple[float, float]:
+        """The largest absolute errors of the min-entropy and Shannon entropy at the centers of
+        the table cells, around which linear interpolation errs most."""
+        nb_bins = 1 << self.nb_bits
+        nb_phases, nb_stds = self.min_hs.shape
+        phases = (np.arange(nb_phases - 1) + 0.5) / self.phase_steps
+        stds = np.exp(self.log_std_min + (np.arange(nb_stds - 1) + 0.5) * self.log_std_step)
+        cscs, stds = np.meshgrid(phases, stds, indexing='ij')
+        cscs = cscs + self._offset(stds)
+        nb_ws, nb_zs = self.tail_min_hs.shape
+        tail_stds = nb_bins * (nb_ws - 1) / (np.arange(nb_ws - 1) + 0.5)
+        zs = (np.arange(nb_zs - 1) + 0.5) * TAIL / (nb_zs - 1)
+        tail_stds, zs = np.meshgrid(tail_stds, zs, indexing='ij')
+        cscs = np.concatenate((cscs.ravel(), (0.5 + zs * tail_stds).ravel()))
+        stds = np.concatenate((stds.ravel(), tail_stds.ravel()))
+        min_hs, hs = gaussian_entropies(cscs, stds, self.nb_bits)
+        table_min_hs, table_hs = self.query_std(cscs, stds)
+        return float(np.max(np.abs(table_min_hs - min_hs))), float(np.max(np.abs(table_hs - hs)))
+
+    def save(self, file_name: str) -> None:
+        """Store the tables as compressed npz file."""
+        np.savez_compressed(file_name, min_hs=self.min_hs, hs=self.hs,
+                            tail_min_hs=self.tail_min_hs, tail_hs=self.tail_hs,
+                            nb_bits=self.nb_bits, phase_steps=self.phase_steps,
+                            log_std_min=self.log_std_min, log_std_step=self.log_std_step,
+                            max_errors=self.max_errors)
+
+    @classmethod
+    def load(cls, file_name: str) -> 'EntropySurrogate':
+        """Load tables stored by save."""
+        with np.load(file_name) as data:
+            return cls(data['min_hs'], data['hs'], data['tail_min_hs'], data['tail_hs'],
+                       int(data['nb_bits']), int(data['phase_steps']),
+                       float(data['log_std_min']), float(data['log_std_step']),
+                       (float(data['max_errors'][0]), float(data['max_errors'][1])))
+
+    def query_std(self, cscs: np.ndarray, stds: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """The min-entropy and Shannon entropy per bit at the mean C and standard deviation of
+        R. Points outside the tables are evaluated exactly."""
+        cscs, stds = np.broadcast_arrays(np.asarray(cscs, dtype=float),
+                                         np.asarray(stds, dtype=float))
+        shape = cscs.shape
+        cscs, stds = cscs.ravel(), stds.ravel()
+        nb_bins = 1 << self.nb_bits
+        u = np.mod(cscs, nb_bins) * self.phase_steps
+        with np.errstate(divide='ignore'):
+            v = (np.log(stds) - self.log_std_min) / self.log_std_step
+        min_hs, hs = _bilinear(self.min_hs, u, v), _bilinear(self.hs, u, v)
+        near_zero = cscs - 0.5 < TAIL * stds
+        tail = near_zero & (stds >= nb_bins) & (cscs >= 0.5)
+        exact = (stds < self.std_min) | (near_zero & ~tail)
+        if np.any(tail):
+            nb_ws, nb_zs = self.tail_min_hs.shape
+            u = nb_bins / stds[tail] * (nb_ws - 1)
+            v = (cscs[tail] - 0.5) / stds[tail] / TAIL * (nb_zs - 1)
+            min_hs[tail] = _bilinear(self.tail_min_hs, u, v)
+            hs[tail] = _bilinear(self.tail_hs, u, v)
+        if np.any(exact):
+            min_hs[exact], hs[exact] = gaussian_entropies(cscs[exact], stds[exact], self.nb_bits)
+        return min_hs.reshape(shape), hs.reshape(shape)
+
+    def query(self, jit_strengths: np.ndarray, periods: np.ndarray, cscs: np.ndarray) \
+            -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """The min-entropy, Shannon entropy, mean R and std R of the Gaussian path for the
+        jitter strength [s], period [s] and C, as returned by h_vs_cs."""
+        cscs, stds = np.broadcast_arrays(np.asarray(cscs, dtype=float),
+                                         std_rs(jit_strengths, periods, cscs))
+        min_hs, hs = self.query_std(cscs, stds)
+        return min_hs, hs, cscs.copy(), stds.copy()
@@ -3,22 +3,24 @@ from typing import Optional, Tuple, List, cast, Any, Dict, Union
 import json
 import os
 from enum import Enum
-from matplotlib import __version__ as MPL_VERSION # type: ignore # pylint: disable=no-name-in-module
-import matplotlib.pyplot as plt # type: ignore
-import matplotlib.gridspec as grid # type: ignore
-import matplotlib.spines as spi # type: ignore
-import matplotlib.ticker as tic # type: ignore
-import matplotlib.scale as sca # type: ignore
-import matplotlib.colors as mco # type: ignore
-import matplotlib.axes as mla # type: ignore
-import matplotlib.lines as mli # type: ignore
-import matplotlib.axis as mxs # type: ignore
-import matplotlib.transforms as mtr # type: ignore
-import matplotlib.patheffects as mpe # type: ignore
-import matplotlib.markers as mma # type: ignore
-import matplotlib._enums as men # type: ignore
-import cycler # type: ignore
 import numpy as np
+from lib import time_logger as t_l
+
+# The matplotlib modules are imported on the first GraphMaker instantiation, such that scripts
+# which only collect data do not pay the matplotlib start-up time (see GraphMaker.load_matplotlib).
+MPL_VERSION: str = ''
+plt: Any = None
+grid: Any = None
+spi: Any = None
+tic: Any = None
+sca: Any = None
+mco: Any = None
+mli: Any = None
+mpe: Any = None
+mma: Any = None
+cycler: Any = None
+g_s: Any = None
+t_c: Any = None
 
 class GraphMaker:
     """A class containing graph making functionality."""
@@ -27,10 +29,14 @@ class GraphMaker:
     si_prefixes: List[str] = ['q', 'r', 'y', 'z', 'a', 'f', 'p', 'n', r'$\mu$', 'm', '',
                               'k', 'M', 'G', 'T', 'P', 'E', 'Z', 'Y', 'R', 'Q']
 
+    _color_maps: Dict['GraphMaker.ColorMap', Any] = {}
+
     def __init__(self, file_name: str, param_file: Optional[str]=None,
                  figure_size: Tuple[int, int]=(1, 1), folder_name: str='',
                  figure_height_scale: float=1,
-                 verbose: bool=False):
+                 verbose: bool=False, raster_dpi: Optional[float]=None,
+                 draft: Optional[bool]=None):
+        GraphMaker.load_matplotlib()
         self._file_name = file_name
         self._folder_name = folder_name
         self._figure_size = figure_size
@@ -40,6 +46,17 @@ class GraphMaker:
         self._param_file = param_file
         with open(self._param_file, 'r', encoding='utf-8') as f:
             self._graph_params = json.loads(f.read())
+        # Resolution of the artists that are rasterized in the SVG output:
+        if raster_dpi is None:
+            raster_dpi = cast(float, self._graph_params['global']['raster_dpi'])
+        self._raster_dpi = raster_dpi
+        self._rasterized = False
+        # Draft figures render the text with mathtext instead of LaTeX:
+        if draft is None:
+            draft = GraphMaker.default_draft()
+        self._draft = draft
+        if not self._draft:
+            t_c.configure(cast(str, self._graph_params['global']['tex_cache_dir']))
         self._fig_dpi = cast(float, plt.rcParams['figure.dpi'])
         fig_width_inch = int(cast(int, self._graph_params['global']['svg_width']) \
                              / self._fig_dpi) * self._figure_size[0]
@@ -49,7 +66,7 @@ class GraphMaker:
         self._grid: Optional['grid.GridSpec'] = None
         self._axes: List['plt.Axes'] = []
         self._ax_data: List[Tuple[str, str, Optional[str], Optional[str],
-                                  str, str, bool, str, List[mli.Line2D], List[float],
+                                  str, str, bool, str, List['mli.Line2D'], List[float],
                                   Optional[List[float]], Optional[int],
                                   float, Optional[float], Optional[float]]] = []
         gp_graph_colors: List[str] = self._graph_params['data']['cols']
@@ -72,13 +89,56 @@ class GraphMaker:
         '''
         plt.rcParams['font.family'] = 'monospace'
         plt.rcParams['font.monospace'] = ['DejaVu Sans Mono']
-        plt.rcParams['text.usetex'] = True
+        plt.rcParams['text.usetex'] = not self._draft
         # gp_font_family: str = self._graph_params['label']['font_name']
         # plt.rcParams['mathtext.fontset'] = 'custom'
         # plt.rcParams['mathtext.rm'] = gp_font_family
         # plt.rcParams['mathtext.it'] = gp_font_family + ':italic'
         # plt.rcParams['mathtext.bf'] = gp_font_family + ':bold'
 
+    @staticmethod
+    def load_matplotlib() -> None:
+        """Import matplotlib and the graph scales module. Only the first call imports."""
+        # pylint: disable=global-statement,import-outside-toplevel
+        global MPL_VERSION, plt, grid, spi, tic, sca, mco, mli, mpe, mma, cycler, g_s, t_c
+        if plt is not None:
+            return
+        from matplotlib import __version__ as MPL_VERSION # type: ignore # pylint: disable=no-name-in-module
+        import matplotlib.pyplot as plt # type: ignore
+        import matplotlib.gridspec as grid # type: ignore
+        import matplotlib.spines as spi # type: ignore
+        import matplotlib.ticker as tic # type: ignore
+        import matplotlib.scale as sca # type: ignore
+        import matplotlib.colors as mco # type: ignore
+        import matplotlib.lines as mli # type: ignore
+        import matplotlib.patheffects as mpe # type: ignore
+        import matplotlib.markers as mma # type: ignore
+        import cycler # type: ignore
+        from lib import graph_scales as g_s
+        from lib import tex_cache as t_c
+
+    @staticmethod
+    def default_draft() -> bool:
+        """Whether the figures are drafts, set by the GRAPH_MAKER_DRAFT environment variable."""
+        return os.environ.get('GRAPH_MAKER_DRAFT', '') not in ('', '0')
+
+    @property
+    def graph_params(self) -> Dict[str, Any]:
+        """The graph parameters, as loaded from the parameter file."""
+        return cast(Dict[str, Any], self._graph_params)
+
+    @staticmethod
+    def _get_color_map(color_map: 'GraphMaker.ColorMap') -> 'mco.Colormap':
+        """Get the matplotlib color map, only constructing it on first use."""
+        if color_map not in GraphMaker._color_maps:
+            name, colors = color_map.value
+            if colors is None:
+                GraphMaker._color_maps[color_map] = plt.colormaps[name]
+            else:
+                GraphMaker._color_maps[color_map] \
+                    = mco.LinearSegmentedColormap.from_list(name, list(colors))
+        return GraphMaker._color_maps[color_map]
+
     def create_grid(self, size: Tuple[int, int]=(1, 1),
                     x_ratios: Optional[List[float]]=None,
                     y_ratios: Optional[List[float]]=None,
@@ -208,8 +268,8 @@ class GraphMaker:
                     clip_on=False,
                     marker=mma.MarkerStyle(
                         marker='>',
-                        capstyle=men.CapStyle('round'),
-                        joinstyle=men.JoinStyle('round')
+                        capstyle='round',
+                        joinstyle='round'
                     ),
                     markersize=gp_ax_stroke_width_pt * 3,
                     markeredgewidth=gp_ax_stroke_width_pt,
@@ -236,8 +296,8 @@ class GraphMaker:
                     clip_on=False,
                     marker=mma.MarkerStyle(
                         marker='^',
-                        capstyle=men.CapStyle('round'),
-                        joinstyle=men.JoinStyle('round')
+                        capstyle='round',
+                        joinstyle='round'
                     ),
                     markersize=gp_ax_stroke_width_pt * 3,
                     markeredgewidth=gp_ax_stroke_width_pt,
@@ -436,12 +496,17 @@ class GraphMaker:
              line_width: float=1,
              visible: bool=True,
              zorder: Optional[float]=None,
-             edge_alpha: Optional[float]=None) -> None:
-        """Plot the given x and y data."""
+             edge_alpha: Optional[float]=None,
+             rasterized: bool=False) -> None:
+        """Plot the given x and y data. Set rasterized for dense data, to draw the lines and
+        markers as an image in the SVG output."""
         axs = self._axes[ax]
         kwargs = self._build_kwargs_plot(line_style, color, marker, marker_color,
                                          marker_edge_color,
                                          label, alpha, line_width, zorder, edge_alpha)
+        if rasterized:
+            kwargs['rasterized'] = True
+            self._rasterized = True
         l = axs.plot(xs, ys, **kwargs) # type: ignore
         if not visible:
             self._ax_data[ax][8].append(l[0])
@@ -491,8 +556,11 @@ class GraphMaker:
         pos_disp = data_to_disp.transform((x, y)) # type: ignore
         shifted_pos_disp = (pos_disp[0] + x_delta, pos_disp[1] + y_delta)
         pos_data = disp_to_data.transform(shifted_pos_disp) # type: ignore
-        txt = axs.text(x=pos_data[0], y=pos_data[1], # type: ignore
-                       s=(r'\textbf{' f'{s}' '}'), **kwargs)
+        if self._draft:
+            kwargs['fontweight'] = 'bold'
+        else:
+            s = r'\textbf{' f'{s}' '}'
+        txt = axs.text(x=pos_data[0], y=pos_data[1], s=s, **kwargs) # type: ignore
         if color_str is not None:
             txt.set_path_effects([mpe.withStroke(linewidth=kwargs['fontsize'] / 4, # type: ignore
                                                  foreground=color_str)])
@@ -566,9 +634,9 @@ class GraphMaker:
             color_norm.vmax = norm_vmax
         c_map: 'mco.Colormap'
         if color_map is None:
-            c_map = GraphMaker.ColorMap.WHITE_YELLOW_ORANGE_RED.value
+            c_map = GraphMaker._get_color_map(GraphMaker.ColorMap.WHITE_YELLOW_ORANGE_RED)
         else:
-            c_map = cast('mco.Colormap', color_map.value) # type: ignore
+            c_map = GraphMaker._get_color_map(color_map)
         axs = self._axes[ax]
         kwargs = self._build_kwargs_im_show(xs, ys, color_norm, c_map)
         img = axs.imshow(image, **kwargs) # type: ignore
@@ -595,20 +663,20 @@ class GraphMaker:
         if color_norm == GraphMaker.ColorNorm.LOG:
             level_locator = tic.LogLocator(base=10, numticks=nb_bins)
             # tick_format = tic.LogFormatter(base=10, labelOnlyBase=True)
-            tick_format = GraphMaker._LogFormatter('10')
+            tick_format = g_s.LogFormatter('10')
         elif color_norm == GraphMaker.ColorNorm.SYMLOG:
-            level_locator = GraphMaker._SymLogLocator(nb_bins=nb_bins)
+            level_locator = g_s.SymLogLocator(nb_bins=nb_bins)
             # tick_format = tic.LogFormatter(base=10, labelOnlyBase=True)
-            tick_format = GraphMaker._LogFormatter('10')
+            tick_format = g_s.LogFormatter('10')
         else:
             level_locator = tic.MaxNLocator(nbins=nb_bins)
-            tick_format = GraphMaker._LinFormatter(unit='man')
+            tick_format = g_s.LinFormatter(unit='man')
         levels = self._generate_locator_levels(norm_vmin, norm_vmax, level_locator)
         c_map: 'mco.Colormap'
         if color_map is None:
-            c_map = cast('mco.Colormap', GraphMaker.ColorMap.DEFAULT.value) # type: ignore
+            c_map = GraphMaker._get_color_map(GraphMaker.ColorMap.DEFAULT)
         else:
-            c_map = cast('mco.Colormap', color_map.value) # type: ignore
+            c_map = GraphMaker._get_color_map(color_map)
         axs = self._axes[ax]
         norm = mco.BoundaryNorm(levels, ncolors=c_map.N, clip=True) # type: ignore
         cf = axs.contourf(xs, ys, zs, levels=levels, cmap=c_map, norm=norm) # type: ignore
@@ -628,7 +696,7 @@ class GraphMaker:
             'which': 'minor',
             'length': gp_tick_min_len_pt * 3 / 4
         }
-        c_bar_axs: Optional[mla.Axes] = None
+        c_bar_axs: Optional['plt.Axes'] = None
         if isinstance(color_bar, bool):
             if color_bar:
                 self._fig.colorbar(mappable=cf, ax=axs, format=tick_format) # type: ignore
@@ -647,11 +715,14 @@ class GraphMaker:
 
     def scatter(self, ax: int, xs: List[float], ys: List[float], color: Optional[int]=None,
                 marker: Optional[str]=None, alpha: Optional[float]=None,
-                label: Optional[str]=None) -> None:
+                label: Optional[str]=None, rasterized: bool=False) -> None:
         """Scatter plot the given x and y data.+
         Deprecated!"""
         axs = self._axes[ax]
         kwargs = self._build_kwargs_scatter(color, marker, alpha, label)
+        if rasterized:
+            kwargs['rasterized'] = True
+            self._rasterized = True
         axs.scatter(xs, ys, **kwargs) # type: ignore
         self._set_tick_label_font_fam(axs)
 
@@ -661,16 +732,28 @@ class GraphMaker:
                vert: bool=True, width: float=0.5, show_box: bool=True, side: str='both',
                hist: bool=True, marker_color: Optional[Union[str, int]]=None,
                median_color: Optional[Union[str, int]]=None,
-               add_ticks: bool=True) -> None:
-        """Plot the given data in a violin plot."""
+               add_ticks: bool=True, stats: bool=False, rasterized: bool=False) -> None:
+        """Plot the given data in a violin plot. If stats is set, data is a summary generated
+        by GraphMaker.violin_stats instead of the raw data. Set rasterized to draw the violin,
+        box and fliers as an image in the SVG output."""
         axs = self._axes[ax]
         kwargs, color_str, fill_alpha = self._build_kwargs_violin(color, position, vert,
                                                                   width, alpha, side,
                                                                   hist)
-        parts = axs.violinplot(dataset=data, **kwargs) # type: ignore
+        # An empty summary, stored for missing data, draws the empty violin of empty data:
+        if stats and len(data) == 0:
+            stats = False
+        if stats:
+            vp_stats, bxp_stats = GraphMaker.unpack_violin_stats(data)
+            parts = axs.violin(vpstats=[vp_stats], **kwargs) # type: ignore
+        else:
+            parts = axs.violinplot(dataset=data, **kwargs) # type: ignore
         if color_str is not None:
             parts['bodies'][0].set_facecolor(color_str) # type: ignore
         parts['bodies'][0].set_alpha(fill_alpha) # type: ignore
+        if rasterized:
+            parts['bodies'][0].set_rasterized(True) # type: ignore
+            self._rasterized = True
         if show_box:
             # gp_dat_stroke_width: float = self._graph_params['data']['stroke_width'] \
             #     / self._fig_dpi * 72 * self._figure_size[0]
@@ -692,7 +775,20 @@ class GraphMaker:
                                                 marker_color=marker_color,
                                                 median_color=median_color,
                                                 add_ticks=add_ticks)
-            box_parts = axs.boxplot(x=data, **box_kwargs) # type: ignore
+            if stats:
+                box_kwargs['shownotches'] = box_kwargs.pop('notch')
+                box_kwargs.pop('tick_labels', None)
+                box_kwargs.pop('labels', None)
+                if box_kwargs.pop('sym', None) == '':
+                    box_kwargs['showfliers'] = False
+                bxp_stats['label'] = ''
+                box_parts = axs.bxp(bxpstats=[bxp_stats], **box_kwargs) # type: ignore
+            else:
+                box_parts = axs.boxplot(x=data, **box_kwargs) # type: ignore
+            if rasterized:
+                for box_lines in box_parts.values():
+                    for box_line in box_lines:
+                        box_line.set_rasterized(True)
             for capi in box_parts['caps']:
                 cap_xs, cap_ys = capi.get_data()
                 if vert: # For now only support vert
@@ -763,32 +859,118 @@ class GraphMaker:
             if box_parts['fliers']:
                 nb_fliers = len(box_parts['fliers'][0].get_data()[0])
                 if nb_fliers > 100:
-                    data_to_disp = axs.transData
-                    flier_xs: List[float] = []
-                    flier_ys: List[float] = []
-                    disp_xs: List[float] = []
-                    disp_ys: List[float] = []
-                    for xi, yi in zip(*box_parts['fliers'][0].get_data()):
-                        disp_x, disp_y = data_to_disp.transform((xi, yi)) # type: ignore
-                        found_close = False
-                        for other_x, other_y in zip(disp_xs, disp_ys):
-                            if np.sqrt((other_x - disp_x)**2 + (other_y - disp_y)**2) < 0.5:
-                                found_close = True
-                                break
-                        if not found_close:
-                            disp_xs.append(disp_x)
-                            disp_ys.append(disp_y)
-                            flier_xs.append(xi)
-                            flier_ys.append(yi)
+                    # Keep one flier per 0.5 x 0.5 pixel cell, overlapping markers are
+                    # indistinguishable in the figure:
+                    flier_xs, flier_ys = (np.asarray(d, dtype=float) # type: ignore
+                                          for d in box_parts['fliers'][0].get_data())
+                    disp_xys = axs.transData.transform(np.column_stack((flier_xs, # type: ignore
+                                                                        flier_ys)))
+                    _, keep_indices = np.unique(np.floor(disp_xys / 0.5).astype(np.int64),
+                                                axis=0, return_index=True)
+                    keep_indices.sort()
+                    flier_xs = flier_xs[keep_indices]
+                    flier_ys = flier_ys[keep_indices]
                     box_parts['fliers'][0].set_data((flier_xs, flier_ys)) # type: ignore
                     if self._verbose:
                         print(f'Detected large number of fliers: '
                               f'reduced from {nb_fliers} to {len(flier_xs)}.')
         if label is not None:
-            self.fill_between_y(ax, [position], data[0], data[0], where=[False],
+            y_label = data[GraphMaker._VIOLIN_STATS_MED] if stats else data[0]
+            self.fill_between_y(ax, [position], y_label, y_label, where=[False],
                                 color=color, label=label)
         self._set_tick_label_font_fam(axs)
 
+    # Indices in the list generated by GraphMaker.violin_stats:
+    _VIOLIN_STATS_N = 0
+    _VIOLIN_STATS_MEAN = 1
+    _VIOLIN_STATS_MED = 2
+    _VIOLIN_STATS_Q1 = 3
+    _VIOLIN_STATS_Q3 = 4
+    _VIOLIN_STATS_CILO = 5
+    _VIOLIN_STATS_CIHI = 6
+    _VIOLIN_STATS_WHISLO = 7
+    _VIOLIN_STATS_WHISHI = 8
+    _VIOLIN_STATS_MIN = 9
+    _VIOLIN_STATS_MAX = 10
+    _VIOLIN_STATS_NB_POINTS = 11
+    _VIOLIN_STATS_KDE = 12
+
+    @staticmethod
+    def violin_stats(data: List[float], nb_points: int=100, max_nb_fliers: int=1000,
+                     nb_bins: int=4096) -> List[float]:
+        """Summarize the data for GraphMaker.violin with the stats argument set, such that only
+        the summary has to be stored. The summary contains the box plot statistics (identical to
+        matplotlib's boxplot with notches), a Gaussian KDE with Scott's bandwidth evaluated at
+        nb_points evenly spaced points (computed on a histogram of nb_bins bins) and the fliers,
+        rounded to three significant digits and reduced to at most max_nb_fliers.
+        Only NumPy is used, as data-only runs should not import matplotlib."""
+        if len(data) == 0:
+            return []
+        xs = np.sort(np.asarray(data, dtype=float))
+        nb_data = len(xs)
+        q1, med, q3 = (float(q) for q in np.percentile(xs, [25, 50, 75]))
+        iqr = q3 - q1
+        notch_delta = 1.57 * iqr / np.sqrt(nb_data)
+        whis_hi = xs[xs <= q3 + 1.5 * iqr]
+        whishi = q3 if (len(whis_hi) == 0) or (whis_hi[-1] < q3) else float(whis_hi[-1])
+        whis_lo = xs[xs >= q1 - 1.5 * iqr]
+        whislo = q1 if (len(whis_lo) == 0) or (whis_lo[0] > q1) else float(whis_lo[0])
+        # Gaussian KDE, evaluated on the histogram bin centers instead of on every data point:
+        x_min, x_max = float(xs[0]), float(xs[-1])
+        coords = np.linspace(x_min, x_max, nb_points)
+        kde_var = float(np.var(xs, ddof=1)) * nb_data**(-0.4) if nb_data > 1 else 0.0
+        if kde_var > 0:
+            counts, edges = np.histogram(xs, bins=nb_bins, range=(x_min, x_max))
+            centers = (edges[:-1] + edges[1:]) / 2
+            kde = np.exp(-0.5 * (coords[:, None] - centers[None, :])**2 / kde_var) @ counts \
+                / (nb_data * np.sqrt(2 * np.pi * kde_var))
+        else:
+            kde = np.zeros(nb_points)
+        # Fliers closer than three significant digits are indistinguishable in the figure:
+        fliers = xs[(xs < whislo) | (xs > whishi)]
+        if len(fliers) > 0:
+            with np.errstate(divide='ignore'):
+                mags = 10**(np.floor(np.log10(np.abs(fliers))) - 2)
+            mags[~np.isfinite(mags) | (mags == 0)] = 1
+            fliers = np.unique(np.round(fliers / mags) * mags)
+            if len(fliers) > max_nb_fliers:
+                fliers = fliers[np.linspace(0, len(fliers) - 1, max_nb_fliers).astype(int)]
+        return [float(nb_data), float(np.mean(xs)), med, q1, q3,
+                med - notch_delta, med + notch_delta, whislo, whishi, x_min, x_max,
+                float(nb_points), *kde.tolist(), *fliers.tolist()]
+
+    @staticmethod
+    def unpack_violin_stats(stats: List[float]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Convert a summary generated by GraphMaker.violin_stats to the statistics dictionaries
+        of matplotlib's violin and bxp methods."""
+        nb_points = int(stats[GraphMaker._VIOLIN_STATS_NB_POINTS])
+        kde_end = GraphMaker._VIOLIN_STATS_KDE + nb_points
+        vp_stats: Dict[str, Any] = {
+            'coords': np.linspace(stats[GraphMaker._VIOLIN_STATS_MIN],
+                                  stats[GraphMaker._VIOLIN_STATS_MAX], nb_points),
+            'vals': np.asarray(stats[GraphMaker._VIOLIN_STATS_KDE:kde_end]),
+            'mean': stats[GraphMaker._VIOLIN_STATS_MEAN],
+            'median': stats[GraphMaker._VIOLIN_STATS_MED],
+            'min': stats[GraphMaker._VIOLIN_STATS_MIN],
+            'max': stats[GraphMaker._VIOLIN_STATS_MAX],
+            'quantiles': np.array([])
+        }
+        q1 = stats[GraphMaker._VIOLIN_STATS_Q1]
+        q3 = stats[GraphMaker._VIOLIN_STATS_Q3]
+        bxp_stats: Dict[str, Any] = {
+            'mean': stats[GraphMaker._VIOLIN_STATS_MEAN],
+            'med': stats[GraphMaker._VIOLIN_STATS_MED],
+            'q1': q1,
+            'q3': q3,
+            'iqr': q3 - q1,
+            'cilo': stats[GraphMaker._VIOLIN_STATS_CILO],
+            'cihi': stats[GraphMaker._VIOLIN_STATS_CIHI],
+            'whislo': stats[GraphMaker._VIOLIN_STATS_WHISLO],
+            'whishi': stats[GraphMaker._VIOLIN_STATS_WHISHI],
+            'fliers': np.asarray(stats[kde_end:])
+        }
+        return vp_stats, bxp_stats
+
     def _build_kwargs_box(self, position: float=1, vert: bool=True,
                           width: float=0.5, marker: Optional[str]=None,
                           line_width: float=1,
@@ -1200,299 +1382,26 @@ class GraphMaker:
                             fixed_labels: Optional[List[str]]=None,
                             precision: int=1) -> None:
         axis = ax.xaxis if is_x else ax.yaxis
-        formatter: tic.Formatter
+        formatter: 'tic.Formatter'
         if not show_labels:
             plt.setp(axis.get_ticklabels(), visible=False) # type: ignore
             formatter = tic.NullFormatter()
         elif scale == 'pi':
-            formatter = GraphMaker._PiFormatter()
+            formatter = g_s.PiFormatter()
         elif scale == 'ln':
-            formatter = GraphMaker._LogFormatter('e', unit=unit)
+            formatter = g_s.LogFormatter('e', unit=unit)
         elif scale == 'log10':
-            formatter = GraphMaker._LogFormatter('10', unit=unit)
+            formatter = g_s.LogFormatter('10', unit=unit)
         elif scale == 'log2':
-            formatter = GraphMaker._LogFormatter('2', unit=unit)
+            formatter = g_s.LogFormatter('2', unit=unit)
         elif scale == 'ent':
-            formatter = GraphMaker.EntFormatter(1e-4, unit=unit)
+            formatter = g_s.EntFormatter(1e-4, unit=unit)
         elif (scale == 'fix') & (fixed_labels is not None):
-            formatter = GraphMaker._FixedFormatter(fixed_labels, unit=unit) # type: ignore
+            formatter = g_s.FixedFormatter(fixed_labels, unit=unit) # type: ignore
         else:
-            formatter = GraphMaker._LinFormatter(unit=unit, precision=precision)
+            formatter = g_s.LinFormatter(unit=unit, precision=precision)
         axis.set_major_formatter(formatter) # type: ignore
 
-    class _FixedFormatter(tic.FixedFormatter):
-        """Wrapper for FixedFormatter"""
-
-        def __init__(self, labels: List[str], unit: str='-'):
-            self._unit: str = unit
-            super().__init__(labels)
-
-        def set_locs(self, locs: List[float]) -> None: # type: ignore
-            self._set_label_unit()
-            super().set_locs(locs)
-
-        def _set_label_unit(self) -> None:
-            label_text = cast(str, self.axis.label.get_text()) # type: ignore
-            if label_text:
-                if ']' in label_text:
-                    bracket_index = label_text.rfind(']')
-                    if '$' in label_text:
-                        dollar_index = label_text.rfind('$')
-                        if dollar_index < bracket_index:
-                            if '[' in label_text:
-                                bracket_index = label_text.rfind('[')
-                                label_text = label_text[:bracket_index]
-                    else:
-                        bracket_index = label_text.rfind('[')
-                        label_text = label_text[:bracket_index]
-                label_text = label_text.rstrip(' ')
-                label_text = label_text + f' [{self._unit}]'
-                self.axis.label.set_text(label_text) # type: ignore
-
-    class _LinFormatter(tic.Formatter):
-        """Format tick values for the linear scale."""
-
-        def __init__(self, offset: float=0, order_mag: int=0, unit: str='-',
-                     precision: int=1):
-            self._offset = offset
-            self._order_mag = order_mag
-            self._unit = unit
-            self._prec = precision
-
-        @property
-        def si_index(self) -> int:
-            """The SI prefix index, connected with this formatter's order of magnitude."""
-            return int(self._order_mag / 3) + 10
-
-        def __call__(self, x: float, pos: Optional[int]=None) -> str:
-            return self.format_data(x)
-
-        def format_data(self, value: float) -> str:
-            shifted_value = (value - self._offset) / 10**self._order_mag
-            return f'{shifted_value:.{self._prec}f}'.rstrip('0').rstrip('.')
-
-        def set_locs(self, locs: List[int]) -> None: # type: ignore
-            self.locs = locs # type: ignore
-            if len(self.locs) > 0:
-                self._compute_offset()
-
-        def _compute_offset(self) -> None:
-            locs = self.locs
-            v_min, v_max = sorted(self.axis.get_view_interval()) # type: ignore
-            locs = [loc for loc in locs if (v_min <= loc) & (loc <= v_max)]
-            if not locs:
-                self._offset = 0
-                self._order_mag = 0
-            else:
-                l_min, l_max = min(locs), max(locs)
-                s_min, s_max = np.sign(l_min), np.sign(l_max)
-                l_min, l_max = sorted((abs(l_min), abs(l_max)))
-                if s_min != s_max:
-                    self._offset = 0
-                elif s_min == 0:
-                    self._offset = 0
-                else:
-                    l_mid = (l_min + l_max) / 2
-                    pow_10 = int(np.floor(np.log10(l_mid))) # type: ignore
-                    pow_10_mult = float(np.floor(l_mid / (10**pow_10) * 1000) / 1000) # type: ignore
-                    l_min_sca = l_min / (10**pow_10)
-                    l_max_sca = l_max / (10**pow_10)
-                    if l_max_sca - l_min_sca < 0.5:
-                        self._offset = s_min * 10**pow_10 * pow_10_mult
-                l_max_shifted = l_max - s_min * self._offset
-                if l_max_shifted != 0:
-                    self._order_mag = int(np.floor((np.log10(l_max_shifted) + 1) / 3)) * 3
-                    if self._offset != 0:
-                        l_min_shifted = l_min - s_min * self._offset
-                    else:
-                        l_min_shifted = -l_min
-                    if l_max_shifted / (10**self._order_mag) \
-                        - l_min_shifted / (10**self._order_mag) < 1:
-                        self._order_mag -= 3
-                else:
-                    self._order_mag = 0
-            label_text = cast(str, self.axis.label.get_text()) # type: ignore
-            if label_text:
-                if ']' in label_text:
-                    bracket_index = label_text.rfind(']')
-                    if '$' in label_text:
-                        dollar_index = label_text.rfind('$')
-                        if dollar_index < bracket_index:
-                            if '[' in label_text:
-                                bracket_index = label_text.rfind('[')
-                                label_text = label_text[:bracket_index]
-                    else:
-                        bracket_index = label_text.rfind('[')
-                        label_text = label_text[:bracket_index]
-                label_text = label_text.rstrip(' ')
-                label_text = label_text + f' [{GraphMaker.si_prefixes[self.si_index]}{self._unit}]'
-                self.axis.label.set_text(label_text) # type: ignore
-
-        def get_offset(self) -> str:
-            """Calculate the offset."""
-            if self._offset == 0:
-                return ''
-            power_10 = int(np.floor(np.log10(abs(self._offset)) / 3))
-            offset_str = f'{self._offset / 10**(power_10 * 3):.1f}'\
-                .rstrip('0').rstrip('.').lstrip('-')
-            sign_str = '+' if self._offset > 0 else '-'
-            return f'{sign_str}{offset_str} {GraphMaker.si_prefixes[power_10 + 10]}{self._unit}'
-
-    class _PiFormatter(tic.Formatter):
-        """Format tick values for the pi scale."""
-
-        def __init__(self, offset: float=0, order_mag: int=0):
-            self._offset = offset
-            self._order_mag = order_mag
-            self._unit = 'rad'
-
-        @property
-        def si_index(self) -> int:
-            """The SI prefix index, connected with this formatter's order of magnitude."""
-            return int(self._order_mag / 3) + 10
-
-        def __call__(self, x: float, pos: Optional[int]=None) -> str:
-            return self.format_data(x)
-
-        def format_data(self, value: float) -> str:
-            shifted_value = (value / np.pi - self._offset) / 10**self._order_mag
-            value_str = f'{shifted_value:.1f}'.rstrip('0').rstrip('.')
-            if value_str.lstrip('-') == '0':
-                return '0'
-            # return f'{value_str}π'
-            pi_str = r'\textpi'
-            # pi_str = r'$\texttt{\pi}$'
-            # pi_str = 'π'
-            return f'{value_str}{pi_str}'
-
-        def set_locs(self, locs: List[float]) -> None: # type: ignore
-            self.locs = locs
-            if len(self.locs) > 0:
-                self._compute_offset()
-
-        def _compute_offset(self) -> None:
-            locs = self.locs
-            v_min, v_max = sorted(self.axis.get_view_interval()) # type: ignore
-            locs = [loc / np.pi for loc in locs if (v_min <= loc) & (loc <= v_max)]
-            if not locs:
-                self._offset = 0
-                self._order_mag = 0
-            else:
-                l_min, l_max = min(locs), max(locs)
-                s_min, s_max = np.sign(l_min), np.sign(l_max)
-                l_min, l_max = sorted((abs(l_min), abs(l_max)))
-                if s_min != s_max:
-                    self._offset = 0
-                elif s_min == 0:
-                    self._offset = 0
-                else:
-                    l_mid = (l_min + l_max) / 2
-                    pow_10 = int(np.floor(np.log10(l_mid))) # type: ignore
-                    pow_10_mult = float(np.floor(l_mid / (10**pow_10) * 1000) / 1000) # type: ignore
-                    l_min_sca = l_min / (10**pow_10)
-                    l_max_sca = l_max / (10**pow_10)
-                    if l_max_sca - l_min_sca < 0.5:
-                        self._offset = s_min * 10**pow_10 * pow_10_mult
-                l_max_shifted = l_max - s_min * self._offset
-                if l_max_shifted != 0:
-                    self._order_mag = int(np.floor((np.log10(l_max_shifted) + 1) / 3)) * 3
-                    if self._offset != 0:
-                        l_min_shifted = l_min - s_min * self._offset
-                    else:
-                        l_min_shifted = -l_min
-                    if l_max_shifted / (10**self._order_mag) \
-                        - l_min_shifted / (10**self._order_mag) < 1:
-                        self._order_mag -= 3
-                else:
-                    self._order_mag = 0
-            label_text = cast(str, self.axis.label.get_text()) # type: ignore
-            if label_text:
-                if ']' in label_text:
-                    bracket_index = label_text.rfind(']')
-                    if '$' in label_text:
-                        dollar_index = label_text.rfind('$')
-                        if dollar_index < bracket_index:
-                            if '[' in label_text:
-                                bracket_index = label_text.rfind('[')
-                                label_text = label_text[:bracket_index]
-                    else:
-                        bracket_index = label_text.rfind('[')
-                        label_text = label_text[:bracket_index]
-                label_text = label_text.rstrip(' ')
-                label_text = label_text + f' [{GraphMaker.si_prefixes[self.si_index]}{self._unit}]'
-                self.axis.label.set_text(label_text) # type: ignore
-
-        def get_offset(self) -> str:
-            """Calculate the offset."""
-            if self._offset == 0:
-                return ''
-            power_10 = int(np.floor(np.log10(abs(self._offset)) / 3))
-            offset_str = f'{self._offset / 10**(power_10 * 3):.3f}'\
-                .rstrip('0').rstrip('.').lstrip('-')
-            sign_str = '+' if self._offset > 0 else '-'
-            # return f'{sign_str}{offset_str}π {GraphMaker.si_prefixes[power_10 + 10]}{self._unit}'
-            pi_str = r'\textpi{}'
-            return (f'{sign_str}{offset_str}{pi_str} '
-                    f'{GraphMaker.si_prefixes[power_10 + 10]}{self._unit}')
-
-    class _LogFormatter(tic.Formatter):
-        """Format tick values for the log scales."""
-
-        def __init__(self, base: str, unit: Optional[str]=None):
-            self._base_str = base
-            if base == 'e':
-                self._base = np.exp(1)
-            else:
-                self._base = float(base)
-            self._unit = unit
-
-        def __call__(self, x: float, pos: Optional[int]=None) -> str:
-            return self.format_data(x)
-
-        def format_data(self, value: float) -> str:
-            if value == 0:
-                return '0'
-            # Perform round before floor, as log might given slightly too low results.
-            exp = int(np.floor(np.round(np.log(abs(value)) # type: ignore
-                                        / np.log(self._base) * 100) / 100))
-            if exp == 0:
-                exp_str = ''
-            else:
-                exp_str = f'{self._base_str}\\textsuperscript{{{exp:d}}}'
-            man = abs(value) / (self._base ** exp)
-            man_str = f'{man:.2f}'
-            if float(man_str) == 1:
-                if not exp_str:
-                    man_str = '1'
-                else:
-                    man_str = ''
-            if value < 0:
-                sign_str = '-'
-            else:
-                sign_str = ''
-            return f'{sign_str}{man_str}{exp_str}'
-
-        def set_locs(self, locs: List[int]) -> None: # type: ignore
-            self.locs = locs # type: ignore
-            if self._unit is None:
-                return
-            label_text = cast(str, self.axis.label.get_text()) # type: ignore
-            if label_text:
-                if ']' in label_text:
-                    bracket_index = label_text.rfind(']')
-                    if '$' in label_text:
-                        dollar_index = label_text.rfind('$')
-                        if dollar_index < bracket_index:
-                            if '[' in label_text:
-                                bracket_index = label_text.rfind('[')
-                                label_text = label_text[:bracket_index]
-                    else:
-                        bracket_index = label_text.rfind('[')
-                        label_text = label_text[:bracket_index]
-                label_text = label_text.rstrip(' ')
-                label_text = label_text + f' [{self._unit}]'
-                self.axis.label.set_text(label_text) # type: ignore
-
     def _set_tick_loc(self, ax: 'plt.Axes', scale: str, show_ticks: bool,
                       max_nb_ticks: Optional[int]=None, is_x: bool=True,
                       fixed_locs: Optional[List[float]]=None) -> None:
@@ -1509,11 +1418,11 @@ class GraphMaker:
         elif scale == 'log2':
             axis.set_major_locator(tic.LogLocator(base=2, numticks=max_nb_ticks))
         elif scale == 'pi':
-            axis.set_major_locator(GraphMaker.MajorPiLocator(max_nb_ticks))
-            axis.set_minor_locator(GraphMaker._MinorPiLocator(max_nb_ticks))
+            axis.set_major_locator(g_s.MajorPiLocator(max_nb_ticks))
+            axis.set_minor_locator(g_s.MinorPiLocator(max_nb_ticks))
         elif scale == 'ent':
-            axis.set_major_locator(GraphMaker.MajorEntLocator(max_nb_ticks, 1e-4))
-            axis.set_minor_locator(GraphMaker.MinorEntLocator(max_nb_ticks, 1e-4))
+            axis.set_major_locator(g_s.MajorEntLocator(max_nb_ticks, 1e-4))
+            axis.set_minor_locator(g_s.MinorEntLocator(max_nb_ticks, 1e-4))
         elif scale == 'int':
             axis.set_major_locator(tic.MultipleLocator(1)) # type: ignore
             axis.set_minor_locator(tic.NullLocator())
@@ -1524,124 +1433,10 @@ class GraphMaker:
             axis.set_major_locator(tic.AutoLocator())
             axis.set_minor_locator(tic.AutoMinorLocator())
 
-    class _MinorPiLocator(tic.Locator):
-        """Generate minor ticks for the pi scale."""
-
-        def __init__(self, max_nb_ticks: int, num_subdivide: Optional[int]=None):
-            self._max_nb_ticks = max_nb_ticks
-            self._num_subdivide = num_subdivide
-
-        def __call__(self) -> List[float]:
-            v_min, v_max = self.axis.get_view_interval() # type: ignore
-            return self.tick_values(v_min, v_max)
-
-        def tick_values(self, vmin: float, vmax: float) -> List[float]:
-            """Calculate the tick locations."""
-            major_loc = GraphMaker.MajorPiLocator(self._max_nb_ticks)
-            major_ticks = major_loc.tick_values(vmin, vmax)
-            if len(major_ticks) < 2:
-                return []
-            major_bin_len = (major_ticks[1] - major_ticks[0]) / np.pi
-            major_bin_len = int(major_bin_len / 10**int(np.log10(major_bin_len)))
-            num_subdivide: int
-            if self._num_subdivide is None:
-                if major_bin_len == 5:
-                    num_subdivide = 5
-                else:
-                    num_subdivide = 4
-            else:
-                num_subdivide = self._num_subdivide
-            bin_len = (major_ticks[1] - major_ticks[0]) / num_subdivide
-            major_ticks.append(major_ticks[-1] + bin_len * num_subdivide)
-            result: List[float] = []
-            for maj_tick in major_ticks:
-                for sub in range(1, num_subdivide):
-                    result.append(maj_tick - sub * bin_len)
-            return result
-
-    class MajorPiLocator(tic.Locator):
-        """Generate ticks at multiples of pi."""
-
-        def __init__(self, max_nb_ticks: int):
-            self._max_nb_ticks = max_nb_ticks
-
-        def __call__(self) -> List[float]:
-            vmin, vmax = self.axis.get_view_interval() # type: ignore
-            return self.tick_values(vmin, vmax)
-
-        def tick_values(self, vmin: float, vmax: float) -> List[float]:
-            """Calculate the tick locations."""
-            if vmax < vmin:
-                vmin, vmax = vmax, vmin
-            range_len = vmax - vmin
-            nb_pis = int(np.ceil(range_len / np.pi))
-            pi_mult = nb_pis / self._max_nb_ticks
-            pow_10 = np.floor(np.log10(pi_mult))
-            sca_mult = pi_mult / (10**pow_10)
-            if sca_mult < 2:
-                pi_mult = 2 * 10**pow_10
-            elif sca_mult < 5:
-                pi_mult = 5 * 10**pow_10
-            else:
-                pi_mult = 10 * 10**pow_10
-            result: List[float] = [np.floor(vmin / np.pi / pi_mult) * np.pi * pi_mult]
-            while result[-1] < vmax:
-                result.append(result[-1] + np.pi * pi_mult)
-            return result
-
-    class _SymLogLocator(tic.Locator):
-        """Generate ticks with a log scale for both positive and negative values."""
-
-        def __init__(self, nb_bins: int=10, base: float=10, lin_thresh_pow: int=-10):
-            self._nb_bins = nb_bins
-            self._base = base
-            self._lin_thresh_pow = lin_thresh_pow
-
-        def set_params(self, **kwargs: Dict[str, Any]) -> None:
-            """
-            Set parameters for this locator.
-            
-            Parameters
-            ----------
-            nb_bins : int, optional
-            base : float, optional
-            lin_thresh_pow : int, optional
-            """
-            if 'nb_bins' in kwargs:
-                self._nb_bins = int(kwargs.pop('nb_bins')) # type: ignore
-            if 'base' in kwargs:
-                self._base = float(kwargs.pop('base')) # type: ignore
-            if 'lin_thresh_pow' in kwargs:
-                self._lin_thresh_pow = int(kwargs.pop('lin_thresh_pow')) # type: ignore
-
-        def __call__(self) -> List[float]:
-            vmin, vmax = self.axis.get_view_interval() # type: ignore
-            return self.tick_values(vmin, vmax)
-
-        def tick_values(self, vmin: float, vmax: float) -> List[float]:
-            if (vmin >= 0) | (vmax <= 0):
-                return []
-            base_start = int(np.ceil(np.log(-vmin) / np.log(self._base)))
-            base_end = int(np.ceil(np.log(vmax) / np.log(self._base)))
-            base_range = base_start + base_end - 2 * self._lin_thresh_pow
-            bin_width = int(np.ceil(base_range / (self._nb_bins - 2)))
-            nb_bins_neg = int(np.ceil((base_start - self._lin_thresh_pow) / bin_width))
-            nb_bins_pos = int(np.ceil((base_end - self._lin_thresh_pow) / bin_width))
-            result: List[float] = []
-            for i in range(nb_bins_neg + 1):
-                result.append(- self._base**(self._lin_thresh_pow + (nb_bins_neg - i) * bin_width))
-            result.append(0)
-            for i in range(nb_bins_pos + 1):
-                result.append(self._base**(self._lin_thresh_pow + i * bin_width))
-            return result
-
-        # def view_limits(self, vmin: float, vmax: float) -> Tuple[float]:
-        #     return super().view_limits(vmin, vmax)
-
     @staticmethod
     def _set_scale(ax: 'plt.Axes', scale: str, is_x: bool=True) -> None:
         axis = ax.xaxis if is_x else ax.yaxis
-        scale_base: sca.ScaleBase
+        scale_base: 'sca.ScaleBase'
         if scale == 'ln':
             scale_base = sca.LogScale(axis, base=np.exp(1), subs=[1.43, 1.86, 2.29]) # type: ignore
         elif scale == 'log10':
@@ -1651,7 +1446,7 @@ class GraphMaker:
         elif scale == 'pi':
             scale_base = sca.LinearScale(axis)
         elif scale == 'ent':
-            scale_base = GraphMaker.EntScale(axis)
+            scale_base = g_s.EntScale(axis)
         elif scale == 'fix':
             scale_base = sca.LinearScale(axis)
         else:
@@ -1661,165 +1456,6 @@ class GraphMaker:
         else:
             ax.set_yscale(scale_base) # type: ignore
 
-    class EntTransform(mtr.Transform):
-        """Entropy transform."""
-
-        input_dims = output_dims = 1
-
-        def __init__(self, min_entropy: float):
-            super().__init__('ent')
-            self._min_entropy = min_entropy
-
-        def transform_non_affine(self, values): # type: ignore
-            values[values < self._min_entropy] = self._min_entropy # type: ignore
-            values[values > 1 - self._min_entropy] = 1 - self._min_entropy # type: ignore
-            with np.errstate(divide="ignore", invalid="ignore"):
-                result = np.log2(values / (1 - values)) # type: ignore
-                return result
-
-        def inverted(self) -> 'mtr.Transform':
-            return GraphMaker.InvEntTransform(self._min_entropy)
-
-    class InvEntTransform(mtr.Transform):
-        """Inverted entropy transform."""
-
-        input_dims = output_dims = 1
-
-        def __init__(self, min_entropy: float):
-            super().__init__()
-            self._min_entropy = min_entropy
-
-        def transform_non_affine(self, values): # type: ignore
-            result = np.power(2, values) / (1 + np.power(2, values))
-            return result
-
-        def inverted(self) -> 'mtr.Transform':
-            return GraphMaker.EntTransform(self._min_entropy)
-
-    class EntScale(sca.ScaleBase):
-        """Entropy log scale at zero and one."""
-
-        name = 'ent'
-        _min_entropy = 1e-4
-
-        def set_default_locators_and_formatters(self, axis: mxs.Axis) -> None:
-            axis.set_major_locator(GraphMaker.MajorEntLocator(11, self._min_entropy))
-            axis.set_minor_locator(GraphMaker.MinorEntLocator(11, self._min_entropy))
-            axis.set_major_formatter(GraphMaker.EntFormatter(self._min_entropy, # type: ignore
-                                                             'bit'))
-
-        def get_transform(self) -> 'mtr.Transform':
-            return GraphMaker.EntTransform(self._min_entropy)
-
-        def limit_range_for_scale(self, vmin: float, vmax: float, minpos: float) \
-            -> Tuple[float, float]:
-            return (max(self._min_entropy, vmin), min(1 - self._min_entropy, vmax))
-
-    class MajorEntLocator(tic.Locator):
-        """Generate ticks for the entropy scale."""
-
-        def __init__(self, max_nb_ticks: int, min_entropy: float):
-            self._max_nb_ticks = max_nb_ticks
-            self._min_entropy = min_entropy
-
-        def __call__(self) -> List[float]:
-            vmin, vmax = self.axis.get_view_interval() # type: ignore
-            return self.tick_values(vmin, vmax)
-
-        def tick_values(self, vmin: float, vmax: float) -> List[float]:
-            """Calculate the tick locations."""
-            result: List[float]
-            if self._max_nb_ticks >= 17:
-                result = [1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 0.2, 0.3, 0.4]
-            elif self._max_nb_ticks >= 11:
-                result = [1e-5, 1e-4, 1e-3, 1e-2, 1e-1]
-            elif self._max_nb_ticks >= 7:
-                result = [1e-5, 1e-1, 0.25]
-            else:
-                result = [self._min_entropy]
-            final_result: List[float] = []
-            for r in result:
-                if r < self._min_entropy:
-                    continue
-                final_result.append(r)
-                final_result.append(1 - r)
-            final_result.append(0.5)
-            result = sorted(final_result)
-            final_result = []
-            for i, r in enumerate(result):
-                if r > vmax:
-                    if i > 0:
-                        if result[i - 1] > vmax:
-                            continue
-                if r < vmin:
-                    if i < len(result) - 1:
-                        if result[i + 1] < vmin:
-                            continue
-                final_result.append(r)
-            return sorted(final_result)
-
-    class MinorEntLocator(tic.Locator):
-        """Generate minor ticks for the entropy scale."""
-
-        def __init__(self, max_nb_ticks: int, min_entropy: float):
-            self._max_nb_ticks = max_nb_ticks
-            self._min_entropy = min_entropy
-
-        def __call__(self) -> List[float]:
-            v_min, v_max = self.axis.get_view_interval() # type: ignore
-            return self.tick_values(v_min, v_max)
-
-        def tick_values(self, vmin: float, vmax: float) -> List[float]:
-            """Calculate the tick locations."""
-            maj_loc = GraphMaker.MajorEntLocator(self._max_nb_ticks, self._min_entropy)
-            maj_locs = maj_loc.tick_values(vmin, vmax)
-            result: List[float] = []
-            for l_start, l_end in zip(maj_locs, maj_locs[1:]):
-                int_width = (l_end - l_start) / 4
-                for i in range(3):
-                    result.append(l_start + int_width * (i + 1))
-            return result
-
-    class EntFormatter(tic.Formatter):
-        """Format tick values for the entropy scales."""
-
-        def __init__(self, max_ent: float, unit: Optional[str]=None):
-            self._max_ent = max_ent
-            self._unit = unit
-
-        def __call__(self, x: float, pos: Optional[int]=None) -> str:
-            return self.format_data(x)
-
-        def format_data(self, value: float) -> str:
-            if abs(value - 0.5) <= 0.4:
-                return f'{value:3.1f}'
-            if value >= 1 - self._max_ent:
-                return '1'
-            if value <= self._max_ent:
-                return '0'
-            return f'{value:f}'.rstrip('0')
-
-        def set_locs(self, locs: List[int]) -> None: # type: ignore
-            self.locs = locs # type: ignore
-            if self._unit is None:
-                return
-            label_text = cast(str, self.axis.label.get_text()) # type: ignore
-            if label_text:
-                if ']' in label_text:
-                    bracket_index = label_text.rfind(']')
-                    if '$' in label_text:
-                        dollar_index = label_text.rfind('$')
-                        if dollar_index < bracket_index:
-                            if '[' in label_text:
-                                bracket_index = label_text.rfind('[')
-                                label_text = label_text[:bracket_index]
-                    else:
-                        bracket_index = label_text.rfind('[')
-                        label_text = label_text[:bracket_index]
-                label_text = label_text.rstrip(' ')
-                label_text = label_text + f' [{self._unit}]'
-                self.axis.label.set_text(label_text) # type: ignore
-
     # @staticmethod
     # def _tick_formatter(value: float, scale: str, factor: int) -> str:
     #     if value == 0:
@@ -1888,10 +1524,15 @@ class GraphMaker:
                 # Set legend frame:
                 leg.get_frame().set(linewidth=gp_frame_width, joinstyle='round') # type: ignore
 
+    @t_l.span('write svg')
     def write_svg(self) -> None:
         """Store this graph."""
         self._set_legend_all_axs()
-        self._fig.savefig(os.path.join(self._folder_name, 'svg', self._file_name)) # type: ignore
+        save_kwargs: Dict[str, Any] = {}
+        if self._rasterized:
+            save_kwargs['dpi'] = self._raster_dpi
+        self._fig.savefig(os.path.join(self._folder_name, 'svg', self._file_name), # type: ignore
+                          **save_kwargs)
 
     class LineStyle(Enum):
         """An enum class holding the supported line styles."""
@@ -1929,9 +1570,6 @@ class GraphMaker:
     class ColorMap(Enum):
         """An enum class holding the supported color maps."""
 
-        BLUE_WHITE_RED = mco.LinearSegmentedColormap.from_list('blue_white_red', # type: ignore
-                                                               ['#3498db', '#ffffff', '#e74c3c'])
-        WHITE_YELLOW_ORANGE_RED \
-            = mco.LinearSegmentedColormap.from_list('wh_ye_or_rd', # type: ignore
-                                                    ['#ffffff', '#f7dc6f', '#e59866', '#e74c3c'])
-        DEFAULT = cast('mco.Colormap', plt.colormaps['YlOrRd']) # type: ignore
+        BLUE_WHITE_RED = ('blue_white_red', ('#3498db', '#ffffff', '#e74c3c'))
+        WHITE_YELLOW_ORANGE_RED = ('wh_ye_or_rd', ('#ffffff', '#f7dc6f', '#e59866', '#e74c3c'))
+        DEFAULT = ('YlOrRd', None)
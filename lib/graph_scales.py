@@ -0,0 +1,580 @@
+"""Tick locators, tick formatters and axis scales used by the graph maker.
+
+This module imports matplotlib and is only loaded when a GraphMaker is instantiated."""
+from typing import Optional, Tuple, List, cast, Any, Dict
+import matplotlib as mpl # type: ignore
+import matplotlib.ticker as tic # type: ignore
+import matplotlib.scale as sca # type: ignore
+import matplotlib.axis as mxs # type: ignore
+import matplotlib.transforms as mtr # type: ignore
+import numpy as np
+from lib import graph_maker as g_m
+
+
+def _pi_str() -> str:
+    """The pi symbol, in LaTeX or, for draft figures, in mathtext."""
+    return r'\textpi{}' if mpl.rcParams['text.usetex'] else r'$\pi$'
+
+
+def _power_str(base: str, exp: int) -> str:
+    """The power of the base, in LaTeX or, for draft figures, in mathtext."""
+    if mpl.rcParams['text.usetex']:
+        return f'{base}\\textsuperscript{{{exp:d}}}'
+    return f'${base}^{{{exp:d}}}$'
+
+
+class FixedFormatter(tic.FixedFormatter):
+    """Wrapper for FixedFormatter"""
+
+    def __init__(self, labels: List[str], unit: str='-'):
+        self._unit: str = unit
+        super().__init__(labels)
+
+    def set_locs(self, locs: List[float]) -> None: # type: ignore
+        self._set_label_unit()
+        super().set_locs(locs)
+
+    def _set_label_unit(self) -> None:
+        label_text = cast(str, self.axis.label.get_text()) # type: ignore
+        if label_text:
+            if ']' in label_text:
+                bracket_index = label_text.rfind(']')
+                if '$' in label_text:
+                    dollar_index = label_text.rfind('$')
+                    if dollar_index < bracket_index:
+                        if '[' in label_text:
+                            bracket_index = label_text.rfind('[')
+                            label_text = label_text[:bracket_index]
+                else:
+                    bracket_index = label_text.rfind('[')
+                    label_text = label_text[:bracket_index]
+            label_text = label_text.rstrip(' ')
+            label_text = label_text + f' [{self._unit}]'
+            self.axis.label.set_text(label_text) # type: ignore
+
+
+class LinFormatter(tic.Formatter):
+    """Format tick values for the linear scale."""
+
+    def __init__(self, offset: float=0, order_mag: int=0, unit: str='-',
+                 precision: int=1):
+        self._offset = offset
+        self._order_mag = order_mag
+        self._unit = unit
+        self._prec = precision
+
+    @property
+    def si_index(self) -> int:
+        """The SI prefix index, connected with this formatter's order of magnitude."""
+        return int(self._order_mag / 3) + 10
+
+    def __call__(self, x: float, pos: Optional[int]=None) -> str:
+        return self.format_data(x)
+
+    def format_data(self, value: float) -> str:
+        shifted_value = (value - self._offset) / 10**self._order_mag
+        return f'{shifted_value:.{self._prec}f}'.rstrip('0').rstrip('.')
+
+    def set_locs(self, locs: List[int]) -> None: # type: ignore
+        self.locs = locs # type: ignore
+        if len(self.locs) > 0:
+            self._compute_offset()
+
+    def _compute_offset(self) -> None:
+        locs = self.locs
+        v_min, v_max = sorted(self.axis.get_view_interval()) # type: ignore
+        locs = [loc for loc in locs if (v_min <= loc) & (loc <= v_max)]
+        if not locs:
+            self._offset = 0
+            self._order_mag = 0
+        else:
+            l_min, l_max = min(locs), max(locs)
+            s_min, s_max = np.sign(l_min), np.sign(l_max)
+            l_min, l_max = sorted((abs(l_min), abs(l_max)))
+            if s_min != s_max:
+                self._offset = 0
+            elif s_min == 0:
+                self._offset = 0
+            else:
+                l_mid = (l_min + l_max) / 2
+                pow_10 = int(np.floor(np.log10(l_mid))) # type: ignore
+                pow_10_mult = float(np.floor(l_mid / (10**pow_10) * 1000) / 1000) # type: ignore
+                l_min_sca = l_min / (10**pow_10)
+                l_max_sca = l_max / (10**pow_10)
+                if l_max_sca - l_min_sca < 0.5:
+                    self._offset = s_min * 10**pow_10 * pow_10_mult
+            l_max_shifted = l_max - s_min * self._offset
+            if l_max_shifted != 0:
+                self._order_mag = int(np.floor((np.log10(l_max_shifted) + 1) / 3)) * 3
+                if self._offset != 0:
+                    l_min_shifted = l_min - s_min * self._offset
+                else:
+                    l_min_shifted = -l_min
+                if l_max_shifted / (10**self._order_mag) \
+                    - l_min_shifted / (10**self._order_mag) < 1:
+                    self._order_mag -= 3
+            else:
+                self._order_mag = 0
+        label_text = cast(str, self.axis.label.get_text()) # type: ignore
+        if label_text:
+            if ']' in label_text:
+                bracket_index = label_text.rfind(']')
+                if '$' in label_text:
+                    dollar_index = label_text.rfind('$')
+                    if dollar_index < bracket_index:
+                        if '[' in label_text:
+                            bracket_index = label_text.rfind('[')
+                            label_text = label_text[:bracket_index]
+                else:
+                    bracket_index = label_text.rfind('[')
+                    label_text = label_text[:bracket_index]
+            label_text = label_text.rstrip(' ')
+            label_text = label_text + f' [{g_m.GraphMaker.si_prefixes[self.si_index]}{self._unit}]'
+            self.axis.label.set_text(label_text) # type: ignore
+
+    def get_offset(self) -> str:
+        """Calculate the offset."""
+        if self._offset == 0:
+            return ''
+        power_10 = int(np.floor(np.log10(abs(self._offset)) / 3))
+        offset_str = f'{self._offset / 10**(power_10 * 3):.1f}'\
+            .rstrip('0').rstrip('.').lstrip('-')
+        sign_str = '+' if self._offset > 0 else '-'
+        return f'{sign_str}{offset_str} {g_m.GraphMaker.si_prefixes[power_10 + 10]}{self._unit}'
+
+
+class PiFormatter(tic.Formatter):
+    """Format tick values for the pi scale."""
+
+    def __init__(self, offset: float=0, order_mag: int=0):
+        self._offset = offset
+        self._order_mag = order_mag
+        self._unit = 'rad'
+
+    @property
+    def si_index(self) -> int:
+        """The SI prefix index, connected with this formatter's order of magnitude."""
+        return int(self._order_mag / 3) + 10
+
+    def __call__(self, x: float, pos: Optional[int]=None) -> str:
+        return self.format_data(x)
+
+    def format_data(self, value: float) -> str:
+        shifted_value = (value / np.pi - self._offset) / 10**self._order_mag
+        value_str = f'{shifted_value:.1f}'.rstrip('0').rstrip('.')
+        if value_str.lstrip('-') == '0':
+            return '0'
+        # return f'{value_str}π'
+        # pi_str = r'$\texttt{\pi}$'
+        # pi_str = 'π'
+        return f'{value_str}{_pi_str()}'
+
+    def set_locs(self, locs: List[float]) -> None: # type: ignore
+        self.locs = locs
+        if len(self.locs) > 0:
+            self._compute_offset()
+
+    def _compute_offset(self) -> None:
+        locs = self.locs
+        v_min, v_max = sorted(self.axis.get_view_interval()) # type: ignore
+        locs = [loc / np.pi for loc in locs if (v_min <= loc) & (loc <= v_max)]
+        if not locs:
+            self._offset = 0
+            self._order_mag = 0
+        else:
+            l_min, l_max = min(locs), max(locs)
+            s_min, s_max = np.sign(l_min), np.sign(l_max)
+            l_min, l_max = sorted((abs(l_min), abs(l_max)))
+            if s_min != s_max:
+                self._offset = 0
+            elif s_min == 0:
+                self._offset = 0
+            else:
+                l_mid = (l_min + l_max) / 2
+                pow_10 = int(np.floor(np.log10(l_mid))) # type: ignore
+                pow_10_mult = float(np.floor(l_mid / (10**pow_10) * 1000) / 1000) # type: ignore
+                l_min_sca = l_min / (10**pow_10)
+                l_max_sca = l_max / (10**pow_10)
+                if l_max_sca - l_min_sca < 0.5:
+                    self._offset = s_min * 10**pow_10 * pow_10_mult
+            l_max_shifted = l_max - s_min * self._offset
+            if l_max_shifted != 0:
+                self._order_mag = int(np.floor((np.log10(l_max_shifted) + 1) / 3)) * 3
+                if self._offset != 0:
+                    l_min_shifted = l_min - s_min * self._offset
+                else:
+                    l_min_shifted = -l_min
+                if l_max_shifted / (10**self._order_mag) \
+                    - l_min_shifted / (10**self._order_mag) < 1:
+                    self._order_mag -= 3
+            else:
+                self._order_mag = 0
+        label_text = cast(str, self.axis.label.get_text()) # type: ignore
+        if label_text:
+            if ']' in label_text:
+                bracket_index = label_text.rfind(']')
+                if '$' in label_text:
+                    dollar_index = label_text.rfind('$')
+                    if dollar_index < bracket_index:
+                        if '[' in label_text:
+                            bracket_index = label_text.rfind('[')
+                            label_text = label_text[:bracket_index]
+                else:
+                    bracket_index = label_text.rfind('[')
+                    label_text = label_text[:bracket_index]
+            label_text = label_text.rstrip(' ')
+            label_text = label_text + f' [{g_m.GraphMaker.si_prefixes[self.si_index]}{self._unit}]'
+            self.axis.label.set_text(label_text) # type: ignore
+
+    def get_offset(self) -> str:
+        """Calculate the offset."""
+        if self._offset == 0:
+            return ''
+        power_10 = int(np.floor(np.log10(abs(self._offset)) / 3))
+        offset_str = f'{self._offset / 10**(power_10 * 3):.3f}'\
+            .rstrip('0').rstrip('.').lstrip('-')
+        sign_str = '+' if self._offset > 0 else '-'
+        # return f'{sign_str}{offset_str}π {g_m.GraphMaker.si_prefixes[power_10 + 10]}{self._unit}'
+        return (f'{sign_str}{offset_str}{_pi_str()} '
+                f'{g_m.GraphMaker.si_prefixes[power_10 + 10]}{self._unit}')
+
+
+class LogFormatter(tic.Formatter):
+    """Format tick values for the log scales."""
+
+    def __init__(self, base: str, unit: Optional[str]=None):
+        self._base_str = base
+        if base == 'e':
+            self._base = np.exp(1)
+        else:
+            self._base = float(base)
+        self._unit = unit
+
+    def __call__(self, x: float, pos: Optional[int]=None) -> str:
+        return self.format_data(x)
+
+    def format_data(self, value: float) -> str:
+        if value == 0:
+            return '0'
+        # Perform round before floor, as log might given slightly too low results.
+        exp = int(np.floor(np.round(np.log(abs(value)) # type: ignore
+                                    / np.log(self._base) * 100) / 100))
+        if exp == 0:
+            exp_str = ''
+        else:
+            exp_str = _power_str(self._base_str, exp)
+        man = abs(value) / (self._base ** exp)
+        man_str = f'{man:.2f}'
+        if float(man_str) == 1:
+            if not exp_str:
+                man_str = '1'
+            else:
+                man_str = ''
+        if value < 0:
+            sign_str = '-'
+        else:
+            sign_str = ''
+        return f'{sign_str}{man_str}{exp_str}'
+
+    def set_locs(self, locs: List[int]) -> None: # type: ignore
+        self.locs = locs # type: ignore
+        if self._unit is None:
+            return
+        label_text = cast(str, self.axis.label.get_text()) # type: ignore
+        if label_text:
+            if ']' in label_text:
+                bracket_index = label_text.rfind(']')
+                if '$' in label_text:
+                    dollar_index = label_text.rfind('$')
+                    if dollar_index < bracket_index:
+                        if '[' in label_text:
+                            bracket_index = label_text.rfind('[')
+                            label_text = label_text[:bracket_index]
+                else:
+                    bracket_index = label_text.rfind('[')
+                    label_text = label_text[:bracket_index]
+            label_text = label_text.rstrip(' ')
+            label_text = label_text + f' [{self._unit}]'
+            self.axis.label.set_text(label_text) # type: ignore
+
+
+class MinorPiLocator(tic.Locator):
+    """Generate minor ticks for the pi scale."""
+
+    def __init__(self, max_nb_ticks: int, num_subdivide: Optional[int]=None):
+        self._max_nb_ticks = max_nb_ticks
+        self._num_subdivide = num_subdivide
+
+    def __call__(self) -> List[float]:
+        v_min, v_max = self.axis.get_view_interval() # type: ignore
+        return self.tick_values(v_min, v_max)
+
+    def tick_values(self, vmin: float, vmax: float) -> List[float]:
+        """Calculate the tick locations."""
+        major_loc = MajorPiLocator(self._max_nb_ticks)
+        major_ticks = major_loc.tick_values(vmin, vmax)
+        if len(major_ticks) < 2:
+            return []
+        major_bin_len = (major_ticks[1] - major_ticks[0]) / np.pi
+        major_bin_len = int(major_bin_len / 10**int(np.log10(major_bin_len)))
+        num_subdivide: int
+        if self._num_subdivide is None:
+            if major_bin_len == 5:
+                num_subdivide = 5
+            else:
+                num_subdivide = 4
+        else:
+            num_subdivide = self._num_subdivide
+        bin_len = (major_ticks[1] - major_ticks[0]) / num_subdivide
+        major_ticks.append(major_ticks[-1] + bin_len * num_subdivide)
+        result: List[float] = []
+        for maj_tick in major_ticks:
+            for sub in range(1, num_subdivide):
+                result.append(maj_tick - sub * bin_len)
+        return result
+
+
+class MajorPiLocator(tic.Locator):
+    """Generate ticks at multiples of pi."""
+
+    def __init__(self, max_nb_ticks: int):
+        self._max_nb_ticks = max_nb_ticks
+
+    def __call__(self) -> List[float]:
+        vmin, vmax = self.axis.get_view_interval() # type: ignore
+        return self.tick_values(vmin, vmax)
+
+    def tick_values(self, vmin: float, vmax: float) -> List[float]:
+        """Calculate the tick locations."""
+        if vmax < vmin:
+            vmin, vmax = vmax, vmin
+        range_len = vmax - vmin
+        nb_pis = int(np.ceil(range_len / np.pi))
+        pi_mult = nb_pis / self._max_nb_ticks
+        pow_10 = np.floor(np.log10(pi_mult))
+        sca_mult = pi_mult / (10**pow_10)
+        if sca_mult < 2:
+            pi_mult = 2 * 10**pow_10
+        elif sca_mult < 5:
+            pi_mult = 5 * 10**pow_10
+        else:
+            pi_mult = 10 * 10**pow_10
+        result: List[float] = [np.floor(vmin / np.pi / pi_mult) * np.pi * pi_mult]
+        while result[-1] < vmax:
+            result.append(result[-1] + np.pi * pi_mult)
+        return result
+
+
+class SymLogLocator(tic.Locator):
+    """Generate ticks with a log scale for both positive and negative values."""
+
+    def __init__(self, nb_bins: int=10, base: float=10, lin_thresh_pow: int=-10):
+        self._nb_bins = nb_bins
+        self._base = base
+        self._lin_thresh_pow = lin_thresh_pow
+
+    def set_params(self, **kwargs: Dict[str, Any]) -> None:
+        """
+        Set parameters for this locator.
+        
+        Parameters
+        ----------
+        nb_bins : int, optional
+        base : float, optional
+        lin_thresh_pow : int, optional
+        """
+        if 'nb_bins' in kwargs:
+            self._nb_bins = int(kwargs.pop('nb_bins')) # type: ignore
+        if 'base' in kwargs:
+            self._base = float(kwargs.pop('base')) # type: ignore
+        if 'lin_thresh_pow' in kwargs:
+            self._lin_thresh_pow = int(kwargs.pop('lin_thresh_pow')) # type: ignore
+
+    def __call__(self) -> List[float]:
+        vmin, vmax = self.axis.get_view_interval() # type: ignore
+        return self.tick_values(vmin, vmax)
+
+    def tick_values(self, vmin: float, vmax: float) -> List[float]:
+        if (vmin >= 0) | (vmax <= 0):
+            return []
+        base_start = int(np.ceil(np.log(-vmin) / np.log(self._base)))
+        base_end = int(np.ceil(np.log(vmax) / np.log(self._base)))
+        base_range = base_start + base_end - 2 * self._lin_thresh_pow
+        bin_width = int(np.ceil(base_range / (self._nb_bins - 2)))
+        nb_bins_neg = int(np.ceil((base_start - self._lin_thresh_pow) / bin_width))
+        nb_bins_pos = int(np.ceil((base_end - self._lin_thresh_pow) / bin_width))
+        result: List[float] = []
+        for i in range(nb_bins_neg + 1):
+            result.append(- self._base**(self._lin_thresh_pow + (nb_bins_neg - i) * bin_width))
+        result.append(0)
+        for i in range(nb_bins_pos + 1):
+            result.append(self._base**(self._lin_thresh_pow + i * bin_width))
+        return result
+
+    # def view_limits(self, vmin: float, vmax: float) -> Tuple[float]:
+    #     return super().view_limits(vmin, vmax)
+
+
+class EntTransform(mtr.Transform):
+    """Entropy transform."""
+
+    input_dims = output_dims = 1
+
+    def __init__(self, min_entropy: float):
+        super().__init__('ent')
+        self._min_entropy = min_entropy
+
+    def transform_non_affine(self, values): # type: ignore
+        values[values < self._min_entropy] = self._min_entropy # type: ignore
+        values[values > 1 - self._min_entropy] = 1 - self._min_entropy # type: ignore
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = np.log2(values / (1 - values)) # type: ignore
+            return result
+
+    def inverted(self) -> 'mtr.Transform':
+        return InvEntTransform(self._min_entropy)
+
+
+class InvEntTransform(mtr.Transform):
+    """Inverted entropy transform."""
+
+    input_dims = output_dims = 1
+
+    def __init__(self, min_entropy: float):
+        super().__init__()
+        self._min_entropy = min_entropy
+
+    def transform_non_affine(self, values): # type: ignore
+        result = np.power(2, values) / (1 + np.power(2, values))
+        return result
+
+    def inverted(self) -> 'mtr.Transform':
+        return EntTransform(self._min_entropy)
+
+
+class EntScale(sca.ScaleBase):
+    """Entropy log scale at zero and one."""
+
+    name = 'ent'
+    _min_entropy = 1e-4
+
+    def set_default_locators_and_formatters(self, axis: mxs.Axis) -> None:
+        axis.set_major_locator(MajorEntLocator(11, self._min_entropy))
+        axis.set_minor_locator(MinorEntLocator(11, self._min_entropy))
+        axis.set_major_formatter(EntFormatter(self._min_entropy, # type: ignore
+                                                         'bit'))
+
+    def get_transform(self) -> 'mtr.Transform':
+        return EntTransform(self._min_entropy)
+
+    def limit_range_for_scale(self, vmin: float, vmax: float, minpos: float) \
+        -> Tuple[float, float]:
+        return (max(self._min_entropy, vmin), min(1 - self._min_entropy, vmax))
+
+
+class MajorEntLocator(tic.Locator):
+    """Generate ticks for the entropy scale."""
+
+    def __init__(self, max_nb_ticks: int, min_entropy: float):
+        self._max_nb_ticks = max_nb_ticks
+        self._min_entropy = min_entropy
+
+    def __call__(self) -> List[float]:
+        vmin, vmax = self.axis.get_view_interval() # type: ignore
+        return self.tick_values(vmin, vmax)
+
+    def tick_values(self, vmin: float, vmax: float) -> List[float]:
+        """Calculate the tick locations."""
+        result: List[float]
+        if self._max_nb_ticks >= 17:
+            result = [1e-5, 1e-4, 1e-3, 1e-2, 1e-1, 0.2, 0.3, 0.4]
+        elif self._max_nb_ticks >= 11:
+            result = [1e-5, 1e-4, 1e-3, 1e-2, 1e-1]
+        elif self._max_nb_ticks >= 7:
+            result = [1e-5, 1e-1, 0.25]
+        else:
+            result = [self._min_entropy]
+        final_result: List[float] = []
+        for r in result:
+            if r < self._min_entropy:
+                continue
+            final_result.append(r)
+            final_result.append(1 - r)
+        final_result.append(0.5)
+        result = sorted(final_result)
+        final_result = []
+        for i, r in enumerate(result):
+            if r > vmax:
+                if i > 0:
+                    if result[i - 1] > vmax:
+                        continue
+            if r < vmin:
+                if i < len(result) - 1:
+                    if result[i + 1] < vmin:
+                        continue
+            final_result.append(r)
+        return sorted(final_result)
+
+
+class MinorEntLocator(tic.Locator):
+    """Generate minor ticks for the entropy scale."""
+
+    def __init__(self, max_nb_ticks: int, min_entropy: float):
+        self._max_nb_ticks = max_nb_ticks
+        self._min_entropy = min_entropy
+
+    def __call__(self) -> List[float]:
+        v_min, v_max = self.axis.get_view_interval() # type: ignore
+        return self.tick_values(v_min, v_max)
+
+    def tick_values(self, vmin: float, vmax: float) -> List[float]:
+        """Calculate the tick locations."""
+        maj_loc = MajorEntLocator(self._max_nb_ticks, self._min_entropy)
+        maj_locs = maj_loc.tick_values(vmin, vmax)
+        result: List[float] = []
+        for l_start, l_end in zip(maj_locs, maj_locs[1:]):
+            int_width = (l_end - l_start) / 4
+            for i in range(3):
+                result.append(l_start + int_width * (i + 1))
+        return result
+
+
+class EntFormatter(tic.Formatter):
+    """Format tick values for the entropy scales."""
+
+    def __init__(self, max_ent: float, unit: Optional[str]=None):
+        self._max_ent = max_ent
+        self._unit = unit
+
+    def __call__(self, x: float, pos: Optional[int]=None) -> str:
+        return self.format_data(x)
+
+    def format_data(self, value: float) -> str:
+        if abs(value - 0.5) <= 0.4:
+            return f'{value:3.1f}'
+        if value >= 1 - self._max_ent:
+            return '1'
+        if value <= self._max_ent:
+            return '0'
+        return f'{value:f}'.rstrip('0')
+
+    def set_locs(self, locs: List[int]) -> None: # type: ignore
+        self.locs = locs # type: ignore
+        if self._unit is None:
+            return
+        label_text = cast(str, self.axis.label.get_text()) # type: ignore
+        if label_text:
+            if ']' in label_text:
+                bracket_index = label_text.rfind(']')
+                if '$' in label_text:
+                    dollar_index = label_text.rfind('$')
+                    if dollar_index < bracket_index:
+                        if '[' in label_text:
+                            bracket_index = label_text.rfind('[')
+                            label_text = label_text[:bracket_index]
+                else:
+                    bracket_index = label_text.rfind('[')
+                    label_text = label_text[:bracket_index]
+            label_text = label_text.rstrip(' ')
+            label_text = label_text + f' [{self._unit}]'
+            self.axis.label.set_text(label_text) # type: ignore
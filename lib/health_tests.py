@@ -0,0 +1,157 @@
+"""Continuous health tests of NIST SP 800-90B (section 4.4) on streams of symbols.
+
+The repetition count test (RCT) alarms on long runs of one symbol, the adaptive proportion test
+(APT) on a window in which its first symbol occurs too often. Both tests process chunks of
+many streams in lockstep, e.g., the NBLSB-bit symbols of the counts of many boards, with a few
+values of state per stream, and are vectorized over each chunk:
+
+```
+tests = h_t.HealthTests(h_claimed=0.8, nb_bits=1, nb_streams=100, on_alarm=print)
+for chunk in chunks:  # shape (100, chunk_length)
+    tests.process(chunk)
+```
+"""
+from typing import Optional, Callable, List
+import numpy as np
+from scipy.stats import binom # type: ignore
+
+ALPHA = 2.0**-20
+
+
+def repetition_cutoff(h_claimed: float, alpha: float=ALPHA) -> int:
+    """The repetition count cutoff for the claimed min-entropy per symbol."""
+    return 1 + int(np.ceil(-np.log2(alpha) / h_claimed))
+
+
+def apt_window(nb_bits: int) -> int:
+    """The adaptive proportion window: 1024 for bits, 512 otherwise."""
+    return 1024 if nb_bits == 1 else 512
+
+
+def proportion_cutoff(h_claimed: float, window: int, alpha: float=ALPHA) -> int:
+    """The adaptive proportion cutoff for the claimed min-entropy per symbol."""
+    return 1 + int(binom.ppf(1 - alpha, window, 2.0**-h_claimed))
+
+
+class Alarm:
+    """A failed health test: the test, the stream, the sample position in the stream and the
+    run length (RCT) or symbol count in the window (APT) that reached the cutoff."""
+
+    def __init__(self, test: str, stream: int, position: int, value: int):
+        self.test = test
+        self.stream = stream
+        self.position = position
+        self.value = value
+
+    def __repr__(self) -> str:
+        return f'{self.test} alarm on stream {self.stream} at sample {self.position} ' \
+               f'({self.value})'
+
+
+def _as_streams(chunk: np.ndarray) -> np.ndarray:
+    chunk = np.asarray(chunk)
+    return chunk[None, :] if chunk.ndim == 1 else chunk
+
+
+class RepetitionCountTest:
+    """The repetition count test (4.4.1). Alarms once per run, when it reaches the cutoff."""
+
+    name = 'RCT'
+
+    def __init__(self, cutoff: int, nb_streams: int=1):
+        self.cutoff = cutoff
+        self.nb_samples = 0
+        # The last symbol of every stream (-1 before the first one) and the length of its run:
+        self._lasts = np.full(nb_streams, -1, dtype=np.int64)
+        self._run_lengths = np.zeros(nb_streams, dtype=np.int64)
+
+    def process(self, chunk: np.ndarray) -> List[Alarm]:
+        """Test the next samples of every stream, shape (nb_streams, chunk_length)."""
+        chunk = _as_streams(chunk)
+        if chunk.shape[1] == 0:
+            return []
+        ids = np.arange(chunk.shape[1])
+        previous = np.concatenate((self._lasts[:, None], chunk[:, :-1]), axis=1)
+        # The start of the run of every sample, -1 if the run continues from the last chunk:
+        starts = np.maximum.accumulate(np.where(chunk != previous, ids, -1), axis=1)
+        run_lengths = np.where(starts >= 0, ids - starts, ids + self._run_lengths[:, None]) + 1
+        streams, positions = np.nonzero(run_lengths == self.cutoff)
+        alarms = [Alarm(self.name, int(s), self.nb_samples + int(p), self.cutoff)
+                  for s, p in zip(streams, positions)]
+        self._lasts = chunk[:, -1].astype(np.int64)
+        self._run_lengths = run_lengths[:, -1]
+        self.nb_samples += chunk.shape[1]
+        return alarms
+
+
+class AdaptiveProportionTest:
+    """The adaptive proportion test (4.4.2) on consecutive windows from the first sample on.
+    Alarms once per window, when the count of its first symbol reaches the cutoff."""
+
+    name = 'APT'
+
+    def __init__(self, cutoff: int, window: int, nb_streams: int=1):
+        self.cutoff = cutoff
+        self.window = window
+        self.nb_samples = 0
+        # The first symbol of the current window of every stream and its count so far:
+        self._references = np.zeros(nb_streams, dtype=np.int64)
+        self._counts = np.zeros(nb_streams, dtype=np.int64)
+
+    def process(self, chunk: np.ndarray) -> List[Alarm]:
+        """Test the next samples of every stream, shape (nb_streams, chunk_length)."""
+        chunk = _as_streams(chunk)
+        chunk_length = chunk.shape[1]
+        if chunk_length == 0:
+            return []
+        offset = self.nb_samples % self.window
+        # The windows in the chunk, the first one may have started in an earlier chunk:
+        window_ids = (np.arange(chunk_length) + offset) // self.window
+        window_starts = np.maximum(np.arange(window_ids[-1] + 1) * self.window - offset, 0)
+        references = chunk[:, window_starts].astype(np.int64)
+        carried = np.zeros((chunk.shape[0], len(window_starts)), dtype=np.int64)
+        if offset > 0:
+            references[:, 0] = self._references
+            carried[:, 0] = self._counts
+        matches = chunk == references[:, window_ids]
+        cumulative = np.concatenate((np.zeros((chunk.shape[0], 1), dtype=np.int64),
+                                     np.cumsum(matches, axis=1)), axis=1)
+        counts = cumulative[:, 1:] - cumulative[:, window_starts[window_ids]] \
+            + carried[:, window_ids]
+        streams, positions = np.nonzero(matches & (counts == self.cutoff))
+        alarms = [Alarm(self.name, int(s), self.nb_samples + int(p), self.cutoff)
+                  for s, p in zip(streams, positions)]
+        self._references = references[:, -1]
+        self._counts = counts[:, -1]
+        self.nb_samples += chunk_length
+        return alarms
+
+
+class HealthTests:
+    """The RCT and APT on many streams of nb_bits-bit symbols, with the cutoffs derived from the
+    claimed min-entropy per symbol unless given. Every alarm is passed to on_alarm."""
+
+    def __init__(self, h_claimed: float, nb_bits: int=1, nb_streams: int=1,
+                 alpha: float=ALPHA, rct_cutoff: Optional[int]=None,
+                 apt_cutoff: Optional[int]=None, window: Optional[int]=None,
+                 on_alarm: Optional[Callable[[Alarm], None]]=None):
+        window = apt_window(nb_bits) if window is None else window
+        self.rct = RepetitionCountTest(
+            repetition_cutoff(h_claimed, alpha) if rct_cutoff is None else rct_cutoff,
+            nb_streams)
+        self.apt = AdaptiveProportionTest(
+            proportion_cutoff(h_claimed, window, alpha) if apt_cutoff is None else apt_cutoff,
+            window, nb_streams)
+        self.on_alarm = on_alarm
+        self.nb_alarms = {self.rct.name: 0, self.apt.name: 0}
+
+    def process(self, chunk: np.ndarray) -> List[Alarm]:
+        """Run both tests on the next samples of every stream, shape (nb_streams,
+        chunk_length), or (chunk_length,) for a single stream."""
+        alarms = self.rct.process(chunk) + self.apt.process(chunk)
+        alarms.sort(key=lambda a: (a.position, a.stream))
+        for alarm in alarms:
+            self.nb_alarms[alarm.test] += 1
+            if self.on_alarm is not None:
+                self.on_alarm(alarm)
+        return alarms
@@ -0,0 +1,151 @@
+"""Estimate the jitter strength of the oscillators from the measured variance of C.
+
+The model of math_model/generate_h_vs_csc.py draws the periods of both oscillators with the
+standard deviation sqrt(J * T) for a jitter strength J and period T. C then has the mean
+mu = T / dT and the variance 2 * J * mu^3 / T, such that every configuration of an all_configs
+measurement gives the estimate
+
+    J = var(C) * T / (2 * mu^3),
+
+with T the mean of both measured periods. The estimates of many files are computed at once and
+summarized per group (e.g., file or topology) by their median, with a bootstrap confidence
+interval, and quantiles:
+
+```
+rows = j_e.read_corpus(j_e.find_files('measurements'))
+for estimate in j_e.summarize(rows.jits, rows.topology_ids, rows.topologies, seed=0):
+    print(estimate)
+```
+"""
+from typing import Optional, List, Tuple
+import glob
+import os
+import re
+import numpy as np
+from scipy.stats import binom # type: ignore
+from lib import matching_model as m_m
+
+NO_PLACEMENT_PATTERN = 'no_placement_*/*/all_configs_*.csv'
+# Folder suffixes of the implementation variants, which share the topology:
+VARIANT_SUFFIXES = ('_np', '_ae', '_cg', '_mc')
+
+
+def find_files(root: str, pattern: str=NO_PLACEMENT_PATTERN) -> List[str]:
+    """The all_configs files below the root folder, sorted."""
+    return sorted(glob.glob(os.path.join(root, pattern)))
+
+
+def file_labels(file_name: str) -> Tuple[str, str]:
+    """The FPGA family (the suffix of the measurement folder, e.g., s7) and topology (the
+    configuration folder without variant suffixes, e.g., muxnetwork) of a file."""
+    folders = os.path.normpath(file_name).split(os.sep)
+    family = folders[-3].rsplit('_', 1)[-1]
+    topology = folders[-2]
+    while topology.endswith(VARIANT_SUFFIXES):
+        topology = topology[:-3]
+    stages = re.search(r'stages(\d+)', os.path.basename(file_name))
+    if stages is not None:
+        topology += f' stages{stages.group(1)}'
+    return family, f'{family} {topology}'
+
+
+def jitter_strengths(csc_means: np.ndarray, csc_vars: np.ndarray,
+                     periods: np.ndarray) -> np.ndarray:
+    """Invert the variance relation of the model: the jitter strength [s] per configuration."""
+    return csc_vars * periods / (2 * csc_means**3)
+
+
+class CorpusRows:
+    """The mean and variance of C, mean period and period difference [s] and jitter strength
+    estimate of all valid configurations of many files, with the index of their file, family
+    and topology."""
+
+    def __init__(self, file_names: List[str], csc_means: np.ndarray, csc_vars: np.ndarray,
+                 periods: np.ndarray, differences: np.ndarray, file_ids: np.ndarray,
+                 family_ids: np.ndarray, topology_ids: np.ndarray, families: List[str],
+                 topologies: List[str]):
+        self.file_names = file_names
+        self.csc_means = csc_means
+        self.csc_vars = csc_vars
+        self.periods = periods
+        self.differences = differences
+        self.jits = jitter_strengths(csc_means, csc_vars, periods)
+        self.file_ids = file_ids
+        self.family_ids = family_ids
+        self.topology_ids = topology_ids
+        self.families = families
+        self.topologies = topologies
+
+
+def read_corpus(file_names: List[str], csc_min: float=50, csc_max: float=1000) -> CorpusRows:
+    """Estimate the jitter strength of the configurations of the files with a mean C within
+    [csc_min, csc_max]. At small C, the rounding of the counts adds a variance of about 0.1 to
+    0.2, which the model lacks."""
+    tables = [m_m.ConfigTable.read(f) for f in file_names]
+    labels = [file_labels(f) for f in file_names]
+    families = sorted(set(label[0] for label in labels))
+    topologies = sorted(set(label[1] for label in labels))
+    lengths = [len(table) for table in tables]
+    csc_means = np.concatenate([table.csc_means for table in tables])
+    csc_vars = np.concatenate([table.csc_vars for table in tables])
+    periods = np.concatenate([(table.delay0s + table.delay1s) / 2 for table in tables])
+    differences = np.concatenate([table.delay1s - table.delay0s for table in tables])
+    file_ids = np.repeat(np.arange(len(tables)), lengths)
+    family_ids = np.repeat([families.index(label[0]) for label in labels], lengths)
+    topology_ids = np.repeat([topologies.index(label[1]) for label in labels], lengths)
+    valid = (csc_means >= csc_min) & (csc_means <= csc_max) & (csc_vars > 0) & (periods > 0)
+    return CorpusRows(file_names, csc_means[valid], csc_vars[valid], periods[valid],
+                      differences[valid], file_ids[valid], family_ids[valid], topology_ids[valid],
+                      families, topologies)
+
+
+class JitterEstimate:
+    """The jitter strength [s] estimate of a group: the median with its bootstrap confidence
+    interval and the quantiles of the configuration estimates."""
+
+    def __init__(self, name: str, nb_rows: int, median: float, ci_low: float, ci_high: float,
+                 q_low: float, q_high: float):
+        self.name = name
+        self.nb_rows = nb_rows
+        self.median = median
+        self.ci_low = ci_low
+        self.ci_high = ci_high
+        self.q_low = q_low
+        self.q_high = q_high
+
+    def __repr__(self) -> str:
+        return f'{self.name}: {self.median:.3g} s ({self.ci_low:.3g} .. {self.ci_high:.3g}), ' \
+               f'{self.nb_rows} configurations'
+
+
+def bootstrap_medians(values: np.ndarray, nb_boots: int,
+                      rng: np.random.Generator) -> np.ndarray:
+    """The (lower) medians of nb_boots resamples of the values. The median of a resample is the
+    k-th smallest value for the smallest k for which at least half of the draws are at most the
+    k-th smallest value, a binomial count, so the medians are drawn from that distribution
+    without resampling."""
+    nb_values = len(values)
+    ranks = np.arange(1, nb_values + 1)
+    median_cdf = binom.sf((nb_values - 1) // 2, nb_values, ranks / nb_values)
+    median_ids = np.searchsorted(median_cdf, rng.random(nb_boots), side='left')
+    return np.sort(values)[np.minimum(median_ids, nb_values - 1)]
+
+
+def summarize(jits: np.ndarray, group_ids: np.ndarray, names: List[str], nb_boots: int=1000,
+              confidence: float=0.95, quantiles: Tuple[float, float]=(0.1, 0.9),
+              seed: Optional[int]=None) -> List[JitterEstimate]:
+    """The estimate of every named group with configurations."""
+    rng = np.random.default_rng(seed)
+    tail = (1 - confidence) / 2
+    estimates = []
+    for group_id, name in enumerate(names):
+        group_jits = jits[group_ids == group_id]
+        if len(group_jits) == 0:
+            continue
+        medians = bootstrap_medians(group_jits, nb_boots, rng)
+        ci_low, ci_high = np.quantile(medians, (tail, 1 - tail))
+        q_low, q_high = np.quantile(group_jits, quantiles)
+        estimates.append(JitterEstimate(name, len(group_jits), float(np.median(group_jits)),
+                                        float(ci_low), float(ci_high), float(q_low),
+                                        float(q_high)))
+    return estimates
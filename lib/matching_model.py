@@ -0,0 +1,224 @@
+"""Behavioral model of the matching controller (hardware/verilog_code/*/matchingController.v).
+
+The controller walks ROSel = {RO1Sel, RO0Sel} through the configurations. For each configuration,
+it accumulates a window of 2^NBSamplesLog coherent sampler counts (CSCnt) and selects the
+configuration if at least samplesMin of them are within [CSCntThreshL, CSCntThreshH). When no
+count arrives for 2^MaxLockCntLog clock cycles, the oscillators might be locked and the controller
+skips to the next configuration, without resetting the window's sample counter.
+
+The model is driven by the measured mean and variance of the C values of each configuration
+(all_configs CSV files). It runs per window instead of per clock cycle: the number of good
+samples in a window is binomial, the number of counts before a lock time-out is geometric and
+the window time is the sum of the count times, each taking two beat periods of C sampling clock
+periods plus the handshake. All boards are simulated at once, such that thousands of boards
+take seconds.
+"""
+from typing import Optional, List, Tuple, Union
+import csv
+import numpy as np
+from scipy.special import ndtr # type: ignore
+
+
+class ConfigTable:
+    """The measured configurations of one board, in ROSel order."""
+
+    def __init__(self, sel0s: np.ndarray, sel1s: np.ndarray, delay0s: np.ndarray,
+                 delay1s: np.ndarray, csc_means: np.ndarray, csc_vars: np.ndarray):
+        order = np.lexsort((sel0s, sel1s))
+        self.sel0s = sel0s[order]
+        self.sel1s = sel1s[order]
+        self.delay0s = delay0s[order]
+        self.delay1s = delay1s[order]
+        self.csc_means = csc_means[order]
+        self.csc_vars = csc_vars[order]
+
+    def __len__(self) -> int:
+        return len(self.sel0s)
+
+    @staticmethod
+    def read(file_name: str) -> 'ConfigTable':
+        """Read an all_configs CSV file: RO1 and RO0 configuration, mean RO0 and RO1 period [ns],
+        mean and variance of C."""
+        rows: List[List[float]] = []
+        with open(file_name, encoding='utf-8') as csv_file:
+            csv_reader = csv.reader(csv_file, delimiter=',')
+            next(csv_reader)
+            for row in csv_reader:
+                rows.append([float(r) for r in row[:6]])
+        data = np.array(rows, dtype=np.float64).reshape(-1, 6)
+        return ConfigTable(data[:, 1].astype(np.int64), data[:, 0].astype(np.int64),
+                           data[:, 2] * 1e-9, data[:, 3] * 1e-9, data[:, 4], data[:, 5])
+
+
+class ControllerParams:
+    """The parameters of the matching controller, named after the Verilog parameters, and the
+    controller clock period. The defaults are the localparams of
+    hardware/verilog_code/spartan_6/controller.v."""
+
+    def __init__(self, csc_thresh_l: int=74, csc_thresh_h: int=192, nb_samples_log: int=7,
+                 samples_min: int=64, max_lock_cnt_log: int=8, csc_cnt_length: int=16,
+                 nb_check_bits: int=16, clk_period: float=10e-9, handshake_clks: float=2):
+        self.csc_thresh_l = csc_thresh_l
+        self.csc_thresh_h = csc_thresh_h
+        self.nb_samples_log = nb_samples_log
+        self.samples_min = samples_min
+        self.max_lock_cnt_log = max_lock_cnt_log
+        self.csc_cnt_length = csc_cnt_length
+        self.nb_check_bits = nb_check_bits
+        self.clk_period = clk_period
+        self.handshake_clks = handshake_clks
+
+    @property
+    def nb_window_samples(self) -> int:
+        """The number of samples in a window."""
+        return 1 << self.nb_samples_log
+
+    @property
+    def lock_time(self) -> float:
+        """The time without counts after which the controller skips a configuration [s]."""
+        return (1 << self.max_lock_cnt_log) * self.clk_period
+
+    def __repr__(self) -> str:
+        return (f'ControllerParams(csc_thresh_l={self.csc_thresh_l}, '
+                f'csc_thresh_h={self.csc_thresh_h}, nb_samples_log={self.nb_samples_log}, '
+                f'samples_min={self.samples_min}, max_lock_cnt_log={self.max_lock_cnt_log})')
+
+
+class ConfigStats:
+    """The per-configuration probabilities and times the model uses."""
+
+    def __init__(self, table: ConfigTable, params: ControllerParams):
+        shift = params.csc_cnt_length - params.nb_check_bits
+        cnt_l = params.csc_thresh_l << shift
+        cnt_h = params.csc_thresh_h << shift
+        valid = np.isfinite(table.csc_means) & (table.csc_means > 0)
+        means = np.where(valid, table.csc_means, 0)
+        sds = np.sqrt(np.maximum(np.nan_to_num(table.csc_vars), 0))
+        self.csc_means = means
+        self.csc_sds = sds
+        # Probability that a count, i.e., a rounded C value, is within the bounds:
+        self.p_goods = np.where(valid, _norm_cdf(cnt_h - 0.5, means, sds)
+                                - _norm_cdf(cnt_l - 0.5, means, sds), 0)
+        # A count takes two beats: the counted one and the one to restart counting:
+        self.sample_means = 2 * means * table.delay1s + params.handshake_clks * params.clk_period
+        self.sample_sds = np.sqrt(2) * sds * table.delay1s
+        # Probability that a count takes longer than the lock time-out:
+        self.q_locks = np.where(valid, 1 - _norm_cdf(params.lock_time, self.sample_means,
+                                                     self.sample_sds), 1)
+
+
+def _norm_cdf(x: float, means: np.ndarray, sds: np.ndarray) -> np.ndarray:
+    """The normal CDF, which is a step function for zero standard deviations."""
+    with np.errstate(divide='ignore', invalid='ignore'):
+        zs = np.where(sds > 0, (x - means) / sds, np.where(x >= means, np.inf, -np.inf))
+    return ndtr(zs)
+
+
+class MatchResult:
+    """The outcome of the simulated boards: lock-in latency [s], selected configuration (index
+    in the table) and number of visited configurations. Boards that did not match within the
+    simulated sweeps have an infinite latency and configuration -1."""
+
+    def __init__(self, latencies: np.ndarray, configs: np.ndarray, nb_visits: np.ndarray):
+        self.latencies = latencies
+        self.configs = configs
+        self.nb_visits = nb_visits
+
+    @property
+    def matched_ratio(self) -> float:
+        """The ratio of boards that matched."""
+        return float(np.mean(np.isfinite(self.latencies)))
+
+    def quantiles(self, qs: Tuple[float, ...]=(0.1, 0.5, 0.9)) -> np.ndarray:
+        """The latency quantiles over all boards; unmatched boards count as infinite."""
+        return np.quantile(self.latencies, qs, method='nearest')
+
+
+def _windows(stats: ConfigStats, params: ControllerParams, configs: Union[int, np.ndarray],
+             sample_cnts: np.ndarray, rng: np.random.Generator) \
+        -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Simulate the window of every board on the configuration, one for all boards or one per
+    board, starting from the boards' sample counters. Return the window times, whether the
+    boards matched, the new sample counters and the number of counts in the window (zero on a
+    lock time-out)."""
+    nb_boards = len(sample_cnts)
+    p_goods, q_locks = stats.p_goods[configs], stats.q_locks[configs]
+    nb_rem = params.nb_window_samples - sample_cnts
+    # Number of counts before a lock time-out, unless the counts never or always time out:
+    nb_counts = np.where(q_locks <= 0, nb_rem, 0)
+    timing_out = (q_locks > 0) & (q_locks < 1)
+    if np.any(timing_out):
+        nb_counts = np.where(timing_out, np.minimum(
+            rng.geometric(np.where(timing_out, q_locks, 1), nb_boards) - 1, nb_rem), nb_counts)
+    full = nb_counts >= nb_rem
+    count_times = nb_counts * stats.sample_means[configs] \
+        + np.sqrt(nb_counts) * stats.sample_sds[configs] * rng.standard_normal(nb_boards)
+    times = np.maximum(count_times, 0) + np.where(full, 0, params.lock_time)
+    # The window is evaluated on the last count, before its good sample is accumulated:
+    nb_goods = rng.binomial(np.maximum(nb_rem - 1, 0), p_goods) if np.any(p_goods > 0) \
+        else np.zeros(nb_boards, dtype=np.int64)
+    matched = full & (nb_goods >= params.samples_min)
+    return times, matched, np.where(full, 0, sample_cnts + nb_counts), nb_counts
+
+
+def simulate(table: ConfigTable, params: ControllerParams, nb_boards: int=1000,
+             order: Optional[np.ndarray]=None, max_nb_sweeps: float=2,
+             seed: Optional[int]=None) -> MatchResult:
+    """Simulate the lock-in of the boards. The controller visits the configurations in the given
+    order (indices in the table, default: the linear ROSel sweep) and wraps around, up to the
+    given number of sweeps."""
+    if order is None:
+        order = np.arange(len(table))
+    rng = np.random.default_rng(seed)
+    stats = ConfigStats(table, params)
+    latencies = np.full(nb_boards, np.inf)
+    configs = np.full(nb_boards, -1, dtype=np.int64)
+    nb_visits = np.zeros(nb_boards, dtype=np.int64)
+    times = np.zeros(nb_boards)
+    sample_cnts = np.zeros(nb_boards, dtype=np.int64)
+    active = np.arange(nb_boards)
+    for step in range(int(max_nb_sweeps * len(order))):
+        if len(active) == 0:
+            break
+        config = order[step % len(order)]
+        window_times, matched, sample_cnts[active], _ = _windows(stats, params, config,
+                                                                 sample_cnts[active], rng)
+        times[active] += window_times
+        nb_visits[active] += 1
+        done = active[matched]
+        latencies[done] = times[done]
+        configs[done] = config
+        active = active[~matched]
+    return MatchResult(latencies, configs, nb_visits)
+
+
+class Boards:
+    """Simulated boards, on which a search strategy probes configurations one window per board
+    at a time, on all boards at once. Next to the matches, a probe returns the mean counts of
+    the windows, which the controller could accumulate, or NaN where the oscillators locked
+    before the first count."""
+
+    def __init__(self, table: ConfigTable, params: ControllerParams, nb_boards: int=1,
+                 stats: Optional[ConfigStats]=None, seed: Optional[int]=None):
+        self.table = table
+        self.params = params
+        self.stats = ConfigStats(table, params) if stats is None else stats
+        self.times = np.zeros(nb_boards)
+        self.nb_probes = np.zeros(nb_boards, dtype=np.int64)
+        self._rng = np.random.default_rng(seed)
+        self._sample_cnts = np.zeros(nb_boards, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.times)
+
+    def probe(self, boards: np.ndarray, configs: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run a window on the configuration of each of the boards (distinct indices), return
+        whether they matched and the mean counts."""
+        window_times, matched, self._sample_cnts[boards], nb_counts = _windows(
+            self.stats, self.params, configs, self._sample_cnts[boards], self._rng)
+        self.times[boards] += window_times
+        self.nb_probes[boards] += 1
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_counts = self.stats.csc_means[configs] + self.stats.csc_sds[configs] \
+                / np.sqrt(nb_counts) * self._rng.standard_normal(len(boards))
+        return matched, np.where(nb_counts > 0, mean_counts, np.nan)
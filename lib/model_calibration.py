@@ -0,0 +1,100 @@
+"""Calibrate the Gaussian path of the math model (math_model/generate_h_vs_csc.py) on measured
+mean and variance of C.
+
+The model predicts the mean C = T / dT from the periods of both oscillators and the variance
+2 * J * mu^3 / T from the jitter strength J. The fit assumes log-normal errors, such that the
+maximum likelihood estimates are least squares fits of the logarithms, in closed form:
+- the period scale k of mean C = k * T / |dT|, which absorbs a systematic error of the measured
+  period differences,
+- the jitter strength J, or one per topology (the per-topology scaling of J).
+
+The residuals are the natural logarithms of measured over predicted values, e.g., a variance
+residual of 0.7 is a factor two:
+
+```
+rows = j_e.read_corpus(j_e.find_files('measurements'))
+calibration = m_c.fit(rows, per_topology=True)
+print(calibration.jit_strength, calibration.file_residuals[0])
+```
+"""
+from typing import Optional, List
+import os
+import numpy as np
+from lib import jitter_estimation as j_e
+
+
+def _group_means(values: np.ndarray, group_ids: np.ndarray, nb_groups: int) -> np.ndarray:
+    """The mean of the values of every group (NaN for empty groups)."""
+    with np.errstate(invalid='ignore'):
+        return np.bincount(group_ids, values, nb_groups) / np.bincount(group_ids,
+                                                                      minlength=nb_groups)
+
+
+class Residuals:
+    """The bias (mean) and RMS of the log residuals of the mean and variance of C of a group."""
+
+    def __init__(self, name: str, nb_rows: int, mean_bias: float, mean_rms: float,
+                 var_bias: float, var_rms: float):
+        self.name = name
+        self.nb_rows = nb_rows
+        self.mean_bias = mean_bias
+        self.mean_rms = mean_rms
+        self.var_bias = var_bias
+        self.var_rms = var_rms
+
+    def __repr__(self) -> str:
+        return f'{self.name}: mean {self.mean_bias:+.3f} (rms {self.mean_rms:.3f}), ' \
+               f'var {self.var_bias:+.3f} (rms {self.var_rms:.3f}), {self.nb_rows} configurations'
+
+
+def residuals(mean_residuals: np.ndarray, var_residuals: np.ndarray, group_ids: np.ndarray,
+              names: List[str]) -> List[Residuals]:
+    """The residual statistics of every named group with configurations."""
+    nb_groups = len(names)
+    counts = np.bincount(group_ids, minlength=nb_groups)
+    stats = [_group_means(r, group_ids, nb_groups) for r in
+             (mean_residuals, mean_residuals**2, var_residuals, var_residuals**2)]
+    return [Residuals(name, int(counts[g]), float(stats[0][g]), float(np.sqrt(stats[1][g])),
+                      float(stats[2][g]), float(np.sqrt(stats[3][g])))
+            for g, name in enumerate(names) if counts[g] > 0]
+
+
+class Calibration:
+    """The fitted period scale and jitter strength [s], the jitter strength per topology (NaN
+    for topologies without configurations) and the residuals per file and per topology."""
+
+    def __init__(self, period_scale: float, jit_strength: float, topology_jits: np.ndarray,
+                 file_residuals: List[Residuals], topology_residuals: List[Residuals]):
+        self.period_scale = period_scale
+        self.jit_strength = jit_strength
+        self.topology_jits = topology_jits
+        self.file_residuals = file_residuals
+        self.topology_residuals = topology_residuals
+
+
+def fit(rows: j_e.CorpusRows, per_topology: bool=False,
+        jit_strength: Optional[float]=None) -> Calibration:
+    """Fit the period scale and jitter strength, or one jitter strength per topology. With a
+    given jit_strength, only the period scale is fitted and the residuals show how well that
+    jitter strength matches. Configurations with equal measured periods are left out."""
+    keep = rows.differences != 0
+    csc_means, csc_vars = rows.csc_means[keep], rows.csc_vars[keep]
+    periods, differences = rows.periods[keep], rows.differences[keep]
+    file_ids, topology_ids = rows.file_ids[keep], rows.topology_ids[keep]
+    mean_residuals = np.log(csc_means) - np.log(periods / np.abs(differences))
+    log_period_scale = float(np.mean(mean_residuals))
+    mean_residuals -= log_period_scale
+    log_jits = np.log(csc_vars) - np.log(2 * csc_means**3 / periods)
+    nb_topologies = len(rows.topologies)
+    if jit_strength is not None:
+        log_jit = float(np.log(jit_strength))
+        log_topology_jits = np.full(nb_topologies, log_jit)
+    else:
+        log_jit = float(np.mean(log_jits))
+        log_topology_jits = _group_means(log_jits, topology_ids, nb_topologies)
+    var_residuals = log_jits - (log_topology_jits[topology_ids] if per_topology else log_jit)
+    file_names = [os.path.basename(f) for f in rows.file_names]
+    return Calibration(float(np.exp(log_period_scale)), float(np.exp(log_jit)),
+                       np.exp(log_topology_jits),
+                       residuals(mean_residuals, var_residuals, file_ids, file_names),
+                       residuals(mean_residuals, var_residuals, topology_ids, rows.topologies))
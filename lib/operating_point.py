@@ -0,0 +1,152 @@
+"""Choose the operating point C (equivalently the period difference dT = T / C) of a coherent
+sampler that maximizes the entropy throughput subject to a min-entropy floor.
+
+The deployed C is only known up to the tolerance of the matching controller, so the floor
+holds for the worst phase of C: the min-entropy per bit of the Gaussian path of the math model,
+minimized over C modulo 2^NBLSB, is a function g of std R = sqrt(2 * J * C^3 / T) alone, and
+increases with it. The entropy throughput (HTP)
+
+    NBLSB * g(std R) / (C * T)
+
+is, with C = (std R^2 * T / (2 * J))^(1/3), proportional to g(std R) / std R^(2/3) for every
+board. The floor, the HTP maximum and the C above it where the HTP drops to a ratio of the
+maximum are thus found once, by bisection over std R, and scaled to all boards (J, T) at once:
+
+```
+points = o_p.optimize(jit_strengths, periods, nb_bits=1, target=0.91, surrogate=surrogate)
+thresh_ls, thresh_hs = points.thresholds()
+```
+
+g is computed from the tables of an EntropySurrogate, or exactly on a grid of phases without
+one. The Gaussian path holds while C - 0.5 >= TAIL * std R, which is the case for the floors of
+the measured jitter strengths.
+"""
+from typing import Optional, Callable, Tuple
+import numpy as np
+from lib import entropy_surrogate as e_s
+
+# Bisection steps of log std R, down to a relative precision of 1e-13:
+NB_ITERATIONS = 50
+# Step of the numerical derivative of log HTP over log std R:
+LOG_STEP = 1e-4
+
+
+def worst_min_entropies(stds: np.ndarray, nb_bits: int=1,
+                        surrogate: Optional[e_s.EntropySurrogate]=None,
+                        phase_steps: int=64) -> np.ndarray:
+    """The min-entropy per bit of the Gaussian path at the worst phase of C, from the surrogate
+    tables or exactly over phase_steps phases per count."""
+    stds = np.asarray(stds, dtype=float)
+    if surrogate is not None:
+        if surrogate.nb_bits != nb_bits:
+            raise ValueError(f'The surrogate is built for NBLSB {surrogate.nb_bits}, '
+                             f'not {nb_bits}.')
+        worst = np.min(surrogate.min_hs, axis=0)
+        return np.interp((np.log(stds) - surrogate.log_std_min) / surrogate.log_std_step,
+                         np.arange(len(worst)), worst)
+    nb_bins = 1 << nb_bits
+    phases = np.arange(nb_bins * phase_steps) / phase_steps
+    offsets = nb_bins * np.ceil((e_s.TAIL * stds + 1) / nb_bins)
+    min_hs, _ = e_s.gaussian_entropies(phases + offsets[..., None], stds[..., None], nb_bits)
+    return np.min(min_hs, axis=-1)
+
+
+def _bisect(is_high: Callable[[np.ndarray], np.ndarray], lows: np.ndarray,
+            highs: np.ndarray) -> np.ndarray:
+    """The boundary between lows and highs of is_high, bisected in the logarithm."""
+    log_lows, log_highs = np.log(lows), np.log(highs)
+    for _ in range(NB_ITERATIONS):
+        log_mids = (log_lows + log_highs) / 2
+        high = is_high(np.exp(log_mids))
+        log_highs = np.where(high, log_mids, log_highs)
+        log_lows = np.where(high, log_lows, log_mids)
+    return np.exp(log_highs)
+
+
+def _std_bracket(nb_bits: int) -> Tuple[float, float]:
+    """The std R range of the search: g is zero within 1e-9 below it and one above it."""
+    return 1e-3, 16.0 * (1 << nb_bits)
+
+
+class StdPoints:
+    """The std R of the min-entropy floor, of the HTP maximum above it and of the HTP dropping
+    to htp_ratio of that maximum above it, with g at each."""
+
+    def __init__(self, floor_stds: np.ndarray, opt_stds: np.ndarray, high_stds: np.ndarray,
+                 opt_min_hs: np.ndarray, high_min_hs: np.ndarray):
+        self.floor_stds = floor_stds
+        self.opt_stds = opt_stds
+        self.high_stds = high_stds
+        self.opt_min_hs = opt_min_hs
+        self.high_min_hs = high_min_hs
+
+
+def std_points(targets: np.ndarray, nb_bits: int=1,
+               surrogate: Optional[e_s.EntropySurrogate]=None,
+               htp_ratio: float=0.5) -> StdPoints:
+    """Bisect the std R points of every min-entropy target, which must be below one. The HTP is
+    assumed unimodal in std R, as g / std R^(2/3) is for the Gaussian path."""
+    targets = np.asarray(targets, dtype=float)
+    low, high = _std_bracket(nb_bits)
+    lows, highs = np.full(targets.shape, low), np.full(targets.shape, high)
+
+    def g(stds: np.ndarray) -> np.ndarray:
+        return worst_min_entropies(stds, nb_bits, surrogate)
+
+    def log_htps(stds: np.ndarray) -> np.ndarray:
+        with np.errstate(divide='ignore'):
+            return np.log(g(stds)) - 2 / 3 * np.log(stds)
+
+    floor_stds = _bisect(lambda stds: g(stds) >= targets, lows, highs)
+    # The HTP decreases above its maximum:
+    peak_std = _bisect(lambda stds: log_htps(stds * np.exp(LOG_STEP)) < log_htps(stds),
+                       np.array(low), np.array(high))
+    opt_stds = np.maximum(floor_stds, peak_std)
+    opt_min_hs = g(opt_stds)
+    log_high_htps = log_htps(opt_stds) + np.log(htp_ratio)
+    high_stds = _bisect(lambda stds: log_htps(stds) <= log_high_htps, opt_stds,
+                        opt_stds * htp_ratio**-1.5 * np.maximum(opt_min_hs, 1e-9)**-1.5)
+    return StdPoints(floor_stds, opt_stds, high_stds, opt_min_hs, g(high_stds))
+
+
+def cscs_of_stds(stds: np.ndarray, jit_strengths: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """The C at which the Gaussian path has the std R, the inverse of e_s.std_rs."""
+    return np.cbrt(np.asarray(stds)**2 * periods / (2 * np.asarray(jit_strengths)))
+
+
+class OperatingPoints:
+    """The operating points of the boards: the C of the min-entropy floor, the C, period
+    difference dT [s], worst-phase min-entropy per bit and HTP [bit/s] of the HTP maximum, and
+    the C above it where the HTP drops to htp_ratio of the maximum."""
+
+    def __init__(self, floor_cscs: np.ndarray, cscs: np.ndarray, deltas: np.ndarray,
+                 min_hs: np.ndarray, htps: np.ndarray, high_cscs: np.ndarray):
+        self.floor_cscs = floor_cscs
+        self.cscs = cscs
+        self.deltas = deltas
+        self.min_hs = min_hs
+        self.htps = htps
+        self.high_cscs = high_cscs
+
+    def thresholds(self, nb_unchecked_bits: int=0) -> Tuple[np.ndarray, np.ndarray]:
+        """CSCntThreshL and CSCntThreshH of the matching controller, which compares the counts
+        without their nb_unchecked_bits (CSCntLength - NBCheckbits) least significant bits: the
+        accepted counts [L, H) hold the floor and keep at least htp_ratio of the maximum HTP."""
+        scale = float(1 << nb_unchecked_bits)
+        thresh_ls = np.ceil(self.floor_cscs / scale).astype(np.int64)
+        thresh_hs = np.maximum(np.floor(self.high_cscs / scale).astype(np.int64), thresh_ls + 1)
+        return thresh_ls, thresh_hs
+
+
+def optimize(jit_strengths: np.ndarray, periods: np.ndarray, nb_bits: int=1,
+             target: float=0.91, surrogate: Optional[e_s.EntropySurrogate]=None,
+             htp_ratio: float=0.5) -> OperatingPoints:
+    """The operating points of boards with the jitter strengths [s] and periods [s]."""
+    jit_strengths, periods = np.broadcast_arrays(np.asarray(jit_strengths, dtype=float),
+                                                 np.asarray(periods, dtype=float))
+    points = std_points(np.array(target), nb_bits, surrogate, htp_ratio)
+    cscs = cscs_of_stds(points.opt_stds, jit_strengths, periods)
+    return OperatingPoints(cscs_of_stds(points.floor_stds, jit_strengths, periods), cscs,
+                           periods / cscs, np.full(cscs.shape, points.opt_min_hs),
+                           nb_bits * points.opt_min_hs / (cscs * periods),
+                           cscs_of_stds(points.high_stds, jit_strengths, periods))
@@ -0,0 +1,82 @@
+"""Statistics of the measured RO configurations (all_configs files), shared by the figure
+scripts and the benchmarks: the averaging of repeated configurations, the range and resolution
+of the periods, and the C values of RO pairs."""
+from typing import List, Dict, Tuple
+import itertools as it
+import numpy as np
+
+# The feedback polynomials of the LFSR that draws RO pairs, per number of index bits:
+LFSR_POLYS: Dict[int, List[int]] = {40: [40, 37, 36, 35], 30: [30, 29, 26, 24]}
+
+
+def average_confs(confs: List[int], pers: List[float]) -> Tuple[List[int], List[float]]:
+    """Average the periods of identical configurations, in the order of their first
+    occurrence."""
+    indices: Dict[int, int] = {}
+    pers_avg: List[float] = []
+    nbs: List[int] = []
+    for conf, per in zip(confs, pers):
+        index = indices.get(conf)
+        if index is None:
+            indices[conf] = len(pers_avg)
+            pers_avg.append(per)
+            nbs.append(1)
+        else:
+            pers_avg[index] = (pers_avg[index] * nbs[index] + per) / (nbs[index] + 1)
+            nbs[index] += 1
+    return list(indices), pers_avg
+
+
+def period_range(pers: List[float]) -> float:
+    """The range of the periods: their interquartile range relative to the median."""
+    return float((np.quantile(pers, 0.75) - np.quantile(pers, 0.25)) # type: ignore
+                 / np.median(pers)) # type: ignore
+
+
+def period_resolution(sorted_pers: List[float]) -> float:
+    """The resolution of the sorted periods: the median of the non-zero steps."""
+    diffs: List[float] = [p1 - p0 for p0, p1 in zip(sorted_pers, sorted_pers[1:]) if p1 != p0]
+    return float(np.median(diffs)) # type: ignore
+
+
+def product_cscs(d_0s: List[float], d_1s: List[float]) -> List[float]:
+    """The C values of all pairs of an RO0 and an RO1 delay, except the equal ones."""
+    return [abs(d0 / (d1 - d0)) for d0, d1 in it.product(d_0s, d_1s) if d0 != d1]
+
+
+def _bits_to_int(bits: List[int]) -> int:
+    """Binary, least significant bit first, to decimal."""
+    result: int = 0
+    for i_, b in enumerate(bits):
+        result += b * 2**(i_)
+    return result
+
+
+def lfsr_cscs(d_0s: List[float], d_1s: List[float], nb_cscs: int) -> List[float]:
+    """The C values of nb_cscs pairs drawn by an LFSR over the RO0 and RO1 indices, which
+    must have 30 or 40 bits together. The draw ends at the first pair of equal delays."""
+    # pylfsr is only needed by the scripts that draw pairs:
+    from pylfsr import LFSR # type: ignore # pylint: disable=import-error,import-outside-toplevel
+    nb_db_0 = int(np.log2(len(d_0s)))
+    nb_db_1 = int(np.log2(len(d_1s)))
+    if nb_db_0 + nb_db_1 not in LFSR_POLYS:
+        raise ValueError(f'# bits is not 40 or 30: {nb_db_0 + nb_db_1}')
+    L = LFSR(fpoly=LFSR_POLYS[nb_db_0 + nb_db_1], # type: ignore
+             initstate=[0] * (nb_db_0 + nb_db_1 - 1) + [1], verbose=False)
+    cscs: List[float] = []
+    for _ in range(nb_cscs):
+        d0 = d_0s[_bits_to_int(L.state[0:nb_db_0])] # type: ignore
+        d1 = d_1s[_bits_to_int(L.state[nb_db_0:nb_db_0 + nb_db_1])] # type: ignore
+        if d0 == d1:
+            break
+        cscs.append(abs(d0 / (d1 - d0)))
+        L.next() # type: ignore
+    return cscs
+
+
+def pair_cscs(d_0s: List[float], d_1s: List[float], max_nb_cscs: int) -> List[float]:
+    """The C values of all RO pairs, or of max_nb_cscs pairs drawn by the LFSR if there are
+    more pairs."""
+    if len(d_0s) * len(d_1s) > max_nb_cscs:
+        return lfsr_cscs(d_0s, d_1s, max_nb_cscs)
+    return product_cscs(d_0s, d_1s)
@@ -0,0 +1,70 @@
+"""Command line arguments shared by the figure scripts, including the profiling hooks.
+
+Next to the `-v`, `-d`, `-q` (and `-l`) flags, every script accepts:
+- `--profile [FILE]`: profile the script with cProfile, dump the statistics to the file
+  (default: *[script name].prof*) and print the top functions by cumulative time.
+- `--mem`: trace the memory allocations with tracemalloc and print the peak usage and the top
+  allocating lines.
+- `--time-json FILE`: export the timing spans of *time_logger.py* to the JSON file.
+- `--top N`: the number of functions/lines the profiling summaries print (default: 20).
+
+The reports are generated when the script exits, also on `sys.exit()`.
+"""
+from typing import Optional
+import argparse
+import atexit
+import cProfile
+from os.path import basename, splitext
+import pstats
+import sys
+import tracemalloc
+from lib import time_logger as t_l
+
+
+def parse_args(description: Optional[str]=None, time_log: bool=False) -> argparse.Namespace:
+    """Parse the script arguments and start the requested profiling hooks."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument('-v', help='Print process', action='store_true')
+    if time_log:
+        parser.add_argument('-l', help='Time-log process', action='store_true')
+    parser.add_argument('-d', help='Store generated data', action='store_true')
+    parser.add_argument('-q', help='Quit after data collect', action='store_true')
+    parser.add_argument('--profile', help='Profile with cProfile and dump to the file',
+                        nargs='?', const='', default=None, metavar='FILE')
+    parser.add_argument('--mem', help='Trace the memory allocations', action='store_true')
+    parser.add_argument('--time-json', help='Export the timing spans to the JSON file',
+                        default=None, metavar='FILE')
+    parser.add_argument('--top', help='Number of entries in the profiling summaries',
+                        type=int, default=20, metavar='N')
+    args = parser.parse_args()
+    if args.mem:
+        atexit.register(_report_mem, args.top)
+        tracemalloc.start()
+    if args.time_json is not None:
+        atexit.register(t_l.write_json, args.time_json)
+    # The exit handlers run in reverse order, so the profiler stops first:
+    if args.profile is not None:
+        profile_path = args.profile
+        if not profile_path:
+            profile_path = splitext(basename(sys.argv[0]))[0] + '.prof'
+        profiler = cProfile.Profile()
+        atexit.register(_report_profile, profiler, profile_path, args.top)
+        profiler.enable()
+    return args
+
+
+def _report_profile(profiler: cProfile.Profile, profile_path: str, nb_top: int) -> None:
+    profiler.disable()
+    profiler.dump_stats(profile_path)
+    print(f'Profile stored at: {profile_path}')
+    pstats.Stats(profiler).sort_stats(pstats.SortKey.CUMULATIVE).print_stats(nb_top)
+
+
+def _report_mem(nb_top: int) -> None:
+    snapshot = tracemalloc.take_snapshot()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'Peak traced memory: {peak / 2**20:.1f} MiB')
+    print(f'Top {nb_top} allocating lines:')
+    for stat in snapshot.statistics('lineno')[:nb_top]:
+        print(stat)
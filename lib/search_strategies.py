@@ -0,0 +1,289 @@
+"""Configuration search strategies for the matching controller, compared on the controller model
+of matching_model.py.
+
+The controller in hardware/verilog_code/*/matchingController.v sweeps ROSel linearly. The other
+strategies use a reference table, i.e., the all_configs measurement of a reference board or
+placement, known at design time:
+- `RandomStartSweep`: the linear sweep from a random ROSel, e.g., an LFSR value.
+- `OrderedTable`: probe the configurations in the order of their match probability on the
+  reference board, which a ROM would store.
+- `DelayBisection`: for each RO0 configuration, bisect the RO1 configurations sorted by their
+  reference period towards the targeted count. The sign of the period difference is taken from
+  the reference, its size from the mean count of the probed window. With random restarts, the
+  RO0 configurations are tried in random order. When no bisection matches, the remaining probes
+  fall back to the ordered table, starting with the configurations not probed yet.
+
+The strategies search on a batch of boards at once (matching_model.Boards), one probe per board
+and step, so that the probes of all boards take one NumPy call per step.
+"""
+from typing import Optional, List, Dict, Union
+import abc
+import numpy as np
+from lib import matching_model as m_m
+
+# Boards simulated at once, which bounds the memory of their probe orders:
+BATCH_SIZE = 256
+
+
+class Strategy(abc.ABC):
+    """A configuration search strategy. The search probes configurations (indices in the table)
+    on the boards until each one matches or spends the probe budget. A strategy that falls back
+    to another search sets fell_back to the boards that did in the last search."""
+
+    name = 'strategy'
+    fell_back: Union[bool, np.ndarray] = False
+
+    @abc.abstractmethod
+    def search(self, boards: m_m.Boards, max_nb_probes: int,
+               rng: np.random.Generator) -> np.ndarray:
+        """Search a matching configuration on every board, return their indices or -1."""
+
+
+def _probe_all(boards: m_m.Boards, ids: np.ndarray, orders: np.ndarray,
+               budgets: Union[int, np.ndarray]) -> np.ndarray:
+    """Probe the configurations of the order of each of the boards (a row of orders, or a single
+    row for all) in turn, wrapping around, until it matches or spends its budget of probes.
+    Return the matched configurations or -1."""
+    configs = np.full(len(ids), -1, dtype=np.int64)
+    budgets = np.broadcast_to(budgets, len(ids))
+    active = np.arange(len(ids))
+    step = 0
+    while True:
+        active = active[budgets[active] > step]
+        if len(active) == 0:
+            return configs
+        rows = active if len(orders) > 1 else np.zeros(len(active), dtype=np.int64)
+        probes = orders[rows, step % orders.shape[1]]
+        matched, _ = boards.probe(ids[active], probes)
+        configs[active[matched]] = probes[matched]
+        active = active[~matched]
+        step += 1
+
+
+class LinearSweep(Strategy):
+    """The ROSel sweep of the matching controller, from ROSel = 0."""
+
+    name = 'linear sweep'
+
+    def search(self, boards: m_m.Boards, max_nb_probes: int,
+               rng: np.random.Generator) -> np.ndarray:
+        return _probe_all(boards, np.arange(len(boards)), np.arange(len(boards.table))[None, :],
+                          max_nb_probes)
+
+
+class RandomStartSweep(Strategy):
+    """The ROSel sweep from a random ROSel."""
+
+    name = 'random start sweep'
+
+    def search(self, boards: m_m.Boards, max_nb_probes: int,
+               rng: np.random.Generator) -> np.ndarray:
+        nb_configs = len(boards.table)
+        starts = rng.integers(nb_configs, size=len(boards))
+        orders = (np.arange(nb_configs)[None, :] + starts[:, None]) % nb_configs
+        return _probe_all(boards, np.arange(len(boards)), orders, max_nb_probes)
+
+
+class OrderedTable(Strategy):
+    """Probe the configurations from the most to the least likely match on the reference."""
+
+    name = 'ordered table'
+
+    def __init__(self, reference: m_m.ConfigTable, params: m_m.ControllerParams):
+        stats = m_m.ConfigStats(reference, params)
+        self._configs = _config_map(reference)
+        # Sort on the match probability of the reference, then on the window time:
+        self._order = np.lexsort((stats.sample_means, -np.round(stats.p_goods, 2)))
+
+    def order(self, table: m_m.ConfigTable) -> np.ndarray:
+        """The probe order on the table; its configurations the reference lacks come last."""
+        order = _map_order(self._configs, self._order, table)
+        return np.concatenate((order, np.setdiff1d(np.arange(len(table)), order)))
+
+    def search(self, boards: m_m.Boards, max_nb_probes: int,
+               rng: np.random.Generator) -> np.ndarray:
+        return _probe_all(boards, np.arange(len(boards)), self.order(boards.table)[None, :],
+                          max_nb_probes)
+
+
+class DelayBisection(Strategy):
+    """Bisect the configurations of one RO, for one configuration of the other RO at a time, on
+    their reference period difference, towards the geometric mean of the count bounds. The
+    bisected RO is the one along which the reference period difference varies most. After one
+    bisection per configuration and direction, the search falls back to the ordered table. The
+    boards bisect in lockstep, each with its own bounds."""
+
+    def __init__(self, reference: m_m.ConfigTable, params: m_m.ControllerParams,
+                 random_restarts: bool=False):
+        self.name = 'delay bisection' + (' (random restarts)' if random_restarts else '')
+        self._random_restarts = random_restarts
+        differences = reference.delay1s - reference.delay0s
+        self._fallback = OrderedTable(reference, params)
+        self._period = float(np.mean(reference.delay1s))
+        self._target = self._period / np.sqrt(params.csc_thresh_l * params.csc_thresh_h)
+        # The RO whose configuration changes the period difference most is bisected:
+        spread0 = _mean_group_std(differences, reference.sel1s)
+        spread1 = _mean_group_std(differences, reference.sel0s)
+        outer_sels, inner_sels = (reference.sel1s, reference.sel0s) if spread0 >= spread1 \
+            else (reference.sel0s, reference.sel1s)
+        self._bisect_ro0 = spread0 >= spread1
+        # Outer configurations with the most matching partners on the reference first:
+        p_goods = m_m.ConfigStats(reference, params).p_goods
+        sels = np.unique(outer_sels)
+        nb_goods = np.array([np.sum(p_goods[outer_sels == sel] > 0.5) for sel in sels])
+        self._outer_sels = sels[np.lexsort((sels, -nb_goods))]
+        # The inner configurations of each outer one, sorted on their period difference, padded
+        # to the most inner configurations:
+        groups = [np.flatnonzero(outer_sels == sel) for sel in self._outer_sels]
+        self._nb_inners = np.array([len(ids) for ids in groups])
+        self._inner_sels = np.full((len(groups), max(self._nb_inners)), -1, dtype=np.int64)
+        self._inner_differences = np.zeros(self._inner_sels.shape)
+        for outer_id, ids in enumerate(groups):
+            ids = ids[np.argsort(differences[ids], kind='stable')]
+            self._inner_sels[outer_id, :len(ids)] = inner_sels[ids]
+            self._inner_differences[outer_id, :len(ids)] = differences[ids]
+
+    def search(self, boards: m_m.Boards, max_nb_probes: int,
+               rng: np.random.Generator) -> np.ndarray:
+        nb_boards, nb_outers = len(boards), len(self._outer_sels)
+        board_configs = self._board_configs(boards.table)
+        outer_orders = np.array([rng.permutation(nb_outers) for _ in range(nb_boards)]) \
+            if self._random_restarts else np.tile(np.arange(nb_outers), (nb_boards, 1))
+        targets = np.array([self._target, -self._target])
+        # The bisection of every board: its outer configuration step, direction and bounds:
+        steps = np.zeros(nb_boards, dtype=np.int64)
+        directions = np.zeros(nb_boards, dtype=np.int64)
+        lows = np.zeros(nb_boards, dtype=np.int64)
+        highs = self._nb_inners[outer_orders[:, 0]] - 1
+        configs = np.full(nb_boards, -1, dtype=np.int64)
+        probed = np.zeros((nb_boards, len(boards.table)), dtype=bool)
+        active = np.arange(nb_boards)
+        while True:
+            active = active[(configs[active] < 0) & (steps[active] < nb_outers)
+                            & (boards.nb_probes[active] < max_nb_probes)]
+            if len(active) == 0:
+                break
+            outers = outer_orders[active, steps[active]]
+            mids = (lows[active] + highs[active]) // 2
+            probes = board_configs[outers, mids]
+            # Configurations a board lacks are skipped on their reference difference:
+            differences = self._inner_differences[outers, mids]
+            has = probes >= 0
+            probed[active[has], probes[has]] = True
+            matched, mean_counts = boards.probe(active[has], probes[has])
+            configs[active[has][matched]] = probes[has][matched]
+            # The periods of a locked pair are about equal:
+            with np.errstate(divide='ignore'):
+                sizes = np.where(np.isnan(mean_counts), 0,
+                                 self._period / np.maximum(mean_counts, 1))
+            differences[has] = np.copysign(sizes, differences[has])
+            up = differences < targets[directions[active]]
+            lows[active] = np.where(up, mids + 1, lows[active])
+            highs[active] = np.where(up, highs[active], mids - 1)
+            # A finished bisection continues in the other direction, then on the next outer
+            # configuration:
+            ended = active[lows[active] > highs[active]]
+            directions[ended] += 1
+            steps[ended] += directions[ended] // 2
+            directions[ended] %= 2
+            lows[ended] = 0
+            highs[ended] = self._nb_inners[outer_orders[ended, np.minimum(steps[ended],
+                                                                         nb_outers - 1)]] - 1
+        self.fell_back = (configs < 0) & (boards.nb_probes < max_nb_probes)
+        ids = np.flatnonzero(self.fell_back)
+        if len(ids) > 0:
+            order = self._fallback.order(boards.table)
+            # The configurations not probed yet first:
+            orders = order[np.argsort(probed[ids][:, order], axis=1, kind='stable')]
+            configs[ids] = _probe_all(boards, ids, orders,
+                                      max_nb_probes - boards.nb_probes[ids])
+        return configs
+
+    def _board_configs(self, table: m_m.ConfigTable) -> np.ndarray:
+        """The configuration (index in the table) of every outer and inner configuration, -1
+        for padding and the configurations the table lacks."""
+        table_configs = _config_map(table)
+        board_configs = np.full(self._inner_sels.shape, -1, dtype=np.int64)
+        for (outer_id, inner_id), inner_sel in np.ndenumerate(self._inner_sels):
+            if inner_sel >= 0:
+                outer_sel = int(self._outer_sels[outer_id])
+                key = _config_key(int(inner_sel), outer_sel) if self._bisect_ro0 \
+                    else _config_key(outer_sel, int(inner_sel))
+                board_configs[outer_id, inner_id] = table_configs.get(key, -1)
+        return board_configs
+
+
+def _mean_group_std(values: np.ndarray, groups: np.ndarray) -> float:
+    """The mean standard deviation of the values within each group."""
+    return float(np.mean([np.std(values[groups == group]) for group in np.unique(groups)]))
+
+
+def _config_key(sel0: int, sel1: int) -> int:
+    return (sel1 << 32) | sel0
+
+
+def _config_map(table: m_m.ConfigTable) -> Dict[int, int]:
+    """Map the (sel0, sel1) pairs of the table to their index."""
+    return {_config_key(int(s0), int(s1)): i
+            for i, (s0, s1) in enumerate(zip(table.sel0s, table.sel1s))}
+
+
+def _map_order(reference_configs: Dict[int, int], reference_order: np.ndarray,
+               table: m_m.ConfigTable) -> np.ndarray:
+    """Map an order of reference configurations to the table, dropping those it lacks."""
+    keys = {i: k for k, i in reference_configs.items()}
+    table_configs = _config_map(table)
+    order = [table_configs[keys[i]] for i in reference_order if keys[i] in table_configs]
+    return np.array(order, dtype=np.int64)
+
+
+class StrategyResult:
+    """The latencies [s], number of probes and fallbacks of the runs of a strategy."""
+
+    def __init__(self, name: str, latencies: np.ndarray, nb_probes: np.ndarray,
+                 fallbacks: np.ndarray):
+        self.name = name
+        self.latencies = latencies
+        self.nb_probes = nb_probes
+        self.fallbacks = fallbacks
+
+    @property
+    def matched_ratio(self) -> float:
+        """The ratio of runs that found a match."""
+        return float(np.mean(np.isfinite(self.latencies)))
+
+    @property
+    def fallback_matched_ratio(self) -> float:
+        """The ratio of runs that found a match after falling back."""
+        return float(np.mean(self.fallbacks & np.isfinite(self.latencies)))
+
+    @property
+    def expected_latency(self) -> float:
+        """The mean latency, infinite if any run failed."""
+        return float(np.mean(self.latencies))
+
+
+def evaluate(strategies: List[Strategy], table: m_m.ConfigTable, params: m_m.ControllerParams,
+             nb_runs: int=100, max_nb_sweeps: float=2,
+             seed: Optional[int]=None) -> List[StrategyResult]:
+    """Run every strategy on the board and rank them on their expected latency, then on their
+    median latency. Every strategy gets the same probe budget of a number of sweeps. The runs
+    are simulated in batches of BATCH_SIZE boards."""
+    stats = m_m.ConfigStats(table, params)
+    max_nb_probes = int(max_nb_sweeps * len(table))
+    seeds = np.random.SeedSequence(seed).spawn(len(strategies))
+    results = []
+    for strategy, strategy_seed in zip(strategies, seeds):
+        rng = np.random.default_rng(strategy_seed)
+        latencies, nb_probes, fallbacks = [], [], []
+        for start in range(0, nb_runs, BATCH_SIZE):
+            boards = m_m.Boards(table, params, min(BATCH_SIZE, nb_runs - start), stats,
+                                seed=int(rng.integers(1 << 32)))
+            configs = strategy.search(boards, max_nb_probes, rng)
+            latencies.append(np.where(configs >= 0, boards.times, np.inf))
+            nb_probes.append(boards.nb_probes)
+            fallbacks.append(np.broadcast_to(strategy.fell_back, len(boards)))
+        results.append(StrategyResult(strategy.name, np.concatenate(latencies),
+                                      np.concatenate(nb_probes), np.concatenate(fallbacks)))
+    results.sort(key=lambda r: (r.expected_latency, float(np.median(r.latencies))))
+    return results
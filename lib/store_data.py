@@ -2,6 +2,7 @@
 from typing import List, Optional
 import csv
 import os
+from lib import time_logger as t_l
 
 class StoreData:
     """This class has data storage functionality."""
@@ -24,6 +25,7 @@ class StoreData:
         """Does this file exist?"""
         return os.path.isfile(self.file_path)
 
+    @t_l.span('write data')
     def write_data(self, data: List[List[float]], over_write: bool=False) -> bool:
         """Write the given data to the file. Return True if write was successfull.
         Return False if file already exists and over_write is unset."""
@@ -36,6 +38,7 @@ class StoreData:
                 writer.writerow(row)
         return True
 
+    @t_l.span('read data')
     def read_data(self) -> Optional[List[List[float]]]:
         """Read the data from the file. Returns None if the file does not exist."""
         if not self.file_exist:
@@ -0,0 +1,94 @@
+"""Persistent cache of the LaTeX renderings of the graph maker's text.
+
+Matplotlib compiles every text string with LaTeX into a DVI file and keeps it in a cache folder,
+under the hash of the LaTeX source, i.e., of the preamble, the font size and the string.
+This module moves the cache folder into the repository, such that it persists across processes
+and matplotlib upgrades, and pre-compiles the common tick labels in parallel.
+Warm the cache with:
+
+```
+python3 lib/tex_cache.py
+```
+"""
+from typing import Optional, List, Tuple, Dict, Any
+import argparse
+import multiprocessing as mp
+from os import getcwd, makedirs
+from pathlib import Path
+import sys
+from matplotlib import rcParams # type: ignore
+from matplotlib.texmanager import TexManager # type: ignore
+from matplotlib.textpath import TextToPath # type: ignore
+sys.path.append(getcwd())
+from lib import graph_maker as g_m # pylint: disable=wrong-import-position
+from lib import graph_scales as g_s # pylint: disable=wrong-import-position
+
+# The figure widths (GraphMaker figure_size[0]) and the legend font scales (leg_font_size) that
+# the figure scripts use:
+FIGURE_WIDTHS = (1,)
+LEGEND_FONT_SCALES = (1, 0.75)
+
+
+def configure(cache_dir: str) -> None:
+    """Store the LaTeX renderings in the given folder."""
+    makedirs(cache_dir, exist_ok=True)
+    # pylint: disable=protected-access
+    if hasattr(TexManager, '_cache_dir'):
+        TexManager._cache_dir = Path(cache_dir)
+    else:
+        TexManager.texcache = cache_dir
+
+
+def tick_labels() -> List[str]:
+    """The tick labels most figures share: small numbers and powers of 10."""
+    labels = [f'{i:d}' for i in range(-100, 101)]
+    labels += [f'{i / 10:.1f}' for i in range(-100, 101) if i % 10 != 0]
+    log_formatter = g_s.LogFormatter('10')
+    labels += [log_formatter.format_data(10.0**exp) for exp in range(-24, 25)]
+    return labels
+
+
+def font_sizes(graph_params: Dict[str, Any], fig_dpi: float) -> List[float]:
+    """The font sizes [pt] that GraphMaker lays the text out at, computed as it does for the
+    figure widths and legend font scales of the figure scripts, and the font size of drawing
+    the text as paths. TexManager hashes the exact size, so the computations must match."""
+    sizes = {float(TextToPath.FONT_SCALE)}
+    for width in FIGURE_WIDTHS:
+        sizes.add(graph_params['label']['font_size'] / fig_dpi * 72 * width)
+        sizes.add(graph_params['axes']['font_size'] / fig_dpi * 72 * width)
+        sizes.update(graph_params['legend']['font_size'] / fig_dpi * 72 * width * scale
+                     for scale in LEGEND_FONT_SCALES)
+    return sorted(sizes)
+
+
+def _init_worker(param_file: Optional[str]) -> None:
+    """Apply the LaTeX settings of the graph maker in a worker process."""
+    g_m.GraphMaker('tex_cache', param_file=param_file, draft=False)
+
+
+def _compile(job: Tuple[str, float]) -> None:
+    TexManager.make_dvi(*job)
+
+
+def warm(texts: Optional[List[str]]=None, param_file: Optional[str]=None,
+         nb_workers: Optional[int]=None) -> None:
+    """Compile the texts (default: the tick labels) at all font sizes, in parallel.
+    The texts that are already cached are skipped."""
+    graph_maker = g_m.GraphMaker('tex_cache', param_file=param_file, draft=False)
+    if texts is None:
+        texts = tick_labels()
+    fig_dpi = float(rcParams['figure.dpi'])
+    jobs = [(text, size) for size in font_sizes(graph_maker.graph_params, fig_dpi)
+            for text in texts]
+    with mp.Pool(nb_workers, initializer=_init_worker, initargs=(param_file,)) as pool:
+        pool.map(_compile, jobs, chunksize=16)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-j', type=int, default=None,
+                        help='number of worker processes (default: number of CPUs)')
+    args = parser.parse_args()
+    # Draft figures do not use LaTeX:
+    if not g_m.GraphMaker.default_draft():
+        warm(nb_workers=args.j)
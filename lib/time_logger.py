@@ -1,47 +1,297 @@
 """A module for time logging functionality."""
+from typing import Optional, List, Dict, Any, Tuple, Type, TYPE_CHECKING
+from types import TracebackType
+import contextlib
+import json
+import threading
 import time
+if TYPE_CHECKING:
+    import multiprocessing.sharedctypes as mps
+
+
+def _progress_str(nb_done: int, nb_total: int, time_done: float) -> str:
+    """The progress bar, with the estimated remaining time."""
+    ratio_done = min(int(nb_done / nb_total * 100 + 0.5), 100)
+    prnt_str = f' {ratio_done:03d} % |{"#" * ratio_done}{" " * (100 - ratio_done)}| '
+    time_per_it = time_done / nb_done if nb_done > 0 else 0
+    time_remaining = max(nb_total - nb_done, 0) * time_per_it
+    hours = f'{int(time_remaining / 3600):02d}'
+    mins = f'{int(time_remaining/60)%60:02d}'
+    secs = f'{int(time_remaining%60):02d}'
+    return prnt_str + f'{hours}:{mins}:{secs} remaining'
+
 
 class TimeLogger:
     """A class containing time logging functionality."""
 
-    def __init__(self, _nb_iterations: int, refresh_rate_sec: float=1):
+    def __init__(self, _nb_iterations: int, refresh_rate_sec: float=1, unit: str='its'):
         self._nb_iterations = _nb_iterations
         self._refresh_rate = refresh_rate_sec
+        self._unit = unit
         self._prnt_str = ''
         self._start_time: float = 0
         self._time_prev: float = 0
         self._nb_its_done: int = 0
+        self._nb_its_counted: int = 0
+        self._next_check: int = 0
+        self._check_step: int = 1
 
     def start(self) -> None:
         """Initialize the timer."""
         self._start_time = time.time()
         self._time_prev = self._start_time-1
         self._nb_its_done = 0
+        self._nb_its_counted = 0
+        self._next_check = 0
+        self._check_step = 1
 
     def iterate(self) -> None:
-        """Proceed the timer with one iteration."""
+        """Proceed the timer with one iteration. The time is only read about ten times per
+        refresh, and the iterations are counted in the current span per refresh."""
         self._nb_its_done += 1
+        if self._nb_its_done < self._next_check:
+            return
         time_now = time.time()
+        # Space the checks by the iteration rate so far, growing at most twofold per check:
+        its_per_check = self._nb_its_done / max(time_now - self._start_time, 1e-9) \
+            * self._refresh_rate / 10
+        self._check_step = max(min(int(its_per_check), 2 * self._check_step), 1)
+        self._next_check = self._nb_its_done + self._check_step
         if time_now - self._time_prev > self._refresh_rate:
             self._time_prev = time_now
-            ratio_done = int(self._nb_its_done / self._nb_iterations * 100 + 0.5)
-            time_done = time_now - self._start_time
+            self._count()
             print(' ' * len(self._prnt_str), end='\r')
-            self._prnt_str = f' {ratio_done:03d} % |{"#" * ratio_done}{" " * (100 - ratio_done)}| '
-            time_per_it = time_done / self._nb_its_done
-            time_remaining = (self._nb_iterations - self._nb_its_done) * time_per_it
-            hours = f'{int(time_remaining / 3600):02d}'
-            mins = f'{int(time_remaining/60)%60:02d}'
-            secs = f'{int(time_remaining%60):02d}'
-            self._prnt_str += f'{hours}:{mins}:{secs} remaining'
+            self._prnt_str = _progress_str(self._nb_its_done, self._nb_iterations,
+                                           time_now - self._start_time)
             print(self._prnt_str, end='\r')
 
+    def _count(self) -> None:
+        count(self._nb_its_done - self._nb_its_counted, self._unit)
+        self._nb_its_counted = self._nb_its_done
+
     def log(self, message: str) -> None:
         """Log the given message."""
         self.clear()
         print(message)
 
     def clear(self) -> None:
-        """Clear the terminal after the iteration has finished."""
+        """Clear the terminal after the iteration has finished, and count the remaining
+        iterations in the current span."""
+        self._count()
         print(' ' * len(self._prnt_str), end='\r')
-        self._prnt_str = ''
\ No newline at end of file
+        self._prnt_str = ''
+
+
+class ProgressCounter:
+    """A worker-side handle on a shared progress count, for threads and pool processes.
+    Increments are batched locally and only added to the shared count per batch."""
+
+    def __init__(self, shared_count: 'mps.Synchronized[int]', batch_size: int=100):
+        self._shared_count = shared_count
+        self._batch_size = batch_size
+        self._nb_pending = 0
+
+    def add(self, nb_items: int=1) -> None:
+        """Count processed items."""
+        self._nb_pending += nb_items
+        if self._nb_pending >= self._batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Add the pending items to the shared count. Call this when the worker is done."""
+        if self._nb_pending:
+            with self._shared_count.get_lock():
+                self._shared_count.value += self._nb_pending
+            self._nb_pending = 0
+
+    def __enter__(self) -> 'ProgressCounter':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.flush()
+
+
+class Progress:
+    """Progress bar of a multi-worker job, rendered by a single reporter thread.
+    The workers count through ProgressCounters on the shared count, which must be passed to
+    pool processes at their creation, e.g., as initializer argument:
+
+    ```
+    with t_l.Progress(nb_items) as progress:
+        with mp.Pool(initializer=init_worker, initargs=(progress.shared_count,)) as pool:
+            ...
+    ```
+    """
+
+    def __init__(self, nb_items: int, refresh_rate_sec: float=1, unit: str='its'):
+        self._nb_items = nb_items
+        self._refresh_rate = refresh_rate_sec
+        self._unit = unit
+        # Import multiprocessing here, as it adds to the import time of every figure script:
+        import multiprocessing as mp # pylint: disable=import-outside-toplevel
+        self.shared_count: 'mps.Synchronized[int]' = mp.Value('q', 0)
+        self._prnt_str = ''
+        self._start_time: float = 0
+        self._stop_event = threading.Event()
+        self._reporter: Optional[threading.Thread] = None
+
+    def counter(self, batch_size: int=100) -> ProgressCounter:
+        """Get a counter on the shared count, for a worker thread in this process."""
+        return ProgressCounter(self.shared_count, batch_size)
+
+    @property
+    def nb_done(self) -> int:
+        """The number of items the workers have flushed so far."""
+        return int(self.shared_count.value)
+
+    def start(self) -> None:
+        """Start the reporter thread."""
+        self._start_time = time.time()
+        self._stop_event.clear()
+        self._reporter = threading.Thread(target=self._report, daemon=True)
+        self._reporter.start()
+
+    def stop(self) -> None:
+        """Stop the reporter thread, clear the progress bar and count the items in the current
+        span."""
+        self._stop_event.set()
+        if self._reporter is not None:
+            self._reporter.join()
+            self._reporter = None
+        print(' ' * len(self._prnt_str), end='\r')
+        self._prnt_str = ''
+        count(self.nb_done, self._unit)
+
+    def _report(self) -> None:
+        while not self._stop_event.wait(self._refresh_rate):
+            prnt_str = _progress_str(self.nb_done, self._nb_items, time.time() - self._start_time)
+            print(' ' * len(self._prnt_str), end='\r')
+            self._prnt_str = prnt_str
+            print(self._prnt_str, end='\r', flush=True)
+
+    def __enter__(self) -> 'Progress':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        self.stop()
+
+
+class SpanStats:
+    """The accumulated time, number of calls and item counts of a named span."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.time: float = 0
+        self.nb_calls: int = 0
+        self.counts: Dict[str, float] = {}
+        self.children: Dict[str, 'SpanStats'] = {}
+
+    def child(self, name: str) -> 'SpanStats':
+        """Get the child span with the given name, creating it on first use."""
+        if name not in self.children:
+            self.children[name] = SpanStats(name)
+        return self.children[name]
+
+    def rates(self) -> Dict[str, float]:
+        """The throughput of each item counter, per second."""
+        if self.time <= 0:
+            return {}
+        return {f'{unit}/s': nb / self.time for unit, nb in self.counts.items()}
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert the span and its children to a JSON serializable dictionary."""
+        return {'name': self.name, 'time_s': self.time, 'calls': self.nb_calls,
+                'counts': self.counts, 'rates': self.rates(),
+                'children': [c.to_dict() for c in self.children.values()]}
+
+
+class Span(contextlib.ContextDecorator):
+    """A named timing span, used as context manager or as function decorator.
+    Spans entered within another span of the same thread are nested in it; re-entering a span
+    accumulates."""
+
+    def __init__(self, name: str):
+        self._name = name
+
+    def __enter__(self) -> 'Span':
+        stack = _stack()
+        stats = stack[-1][0].child(self._name)
+        stack.append((stats, time.perf_counter()))
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]],
+                 exc_value: Optional[BaseException],
+                 traceback: Optional[TracebackType]) -> None:
+        stats, start_time = _stack().pop()
+        stats.time += time.perf_counter() - start_time
+        stats.nb_calls += 1
+
+
+_root = SpanStats('total')
+_root_start: float = time.perf_counter()
+# The open spans of every thread:
+_local = threading.local()
+
+
+def _stack() -> List[Tuple[SpanStats, float]]:
+    """The open spans of the calling thread, rooted in the total span since the last reset."""
+    stack: Optional[List[Tuple[SpanStats, float]]] = getattr(_local, 'stack', None)
+    if stack is None or stack[0][0] is not _root:
+        stack = [(_root, _root_start)]
+        _local.stack = stack
+    return stack
+
+
+def span(name: str) -> Span:
+    """Time the enclosed code, or the decorated function, as a span with the given name."""
+    return Span(name)
+
+
+def count(nb_items: float, unit: str='items') -> None:
+    """Count processed items in the current span, e.g., rows, files or trials."""
+    counts = _stack()[-1][0].counts
+    counts[unit] = counts.get(unit, 0) + nb_items
+
+
+def reset() -> None:
+    """Discard all spans and restart the total time."""
+    global _root, _root_start # pylint: disable=global-statement
+    _root = SpanStats('total')
+    _root_start = time.perf_counter()
+
+
+def stats() -> SpanStats:
+    """The span statistics of the run so far, rooted in the total span."""
+    _root.time = time.perf_counter() - _root_start
+    _root.nb_calls = 1
+    return _root
+
+
+def report(min_share: float=0) -> str:
+    """Generate the end-of-run report: the time, share of the total time, number of calls
+    and throughput of all spans that take at least the given share of the total time."""
+    root = stats()
+    lines = [f'{"span":<40}{"time [s]":>10}{"share":>9}{"calls":>8}  throughput']
+    def add_lines(span_stats: SpanStats, depth: int) -> None:
+        share = span_stats.time / root.time * 100 if root.time > 0 else 0
+        if share < min_share:
+            return
+        rates = ', '.join(f'{rate:.4g} {unit}' for unit, rate in span_stats.rates().items())
+        name = '  ' * depth + span_stats.name
+        lines.append(f'{name:<40}{span_stats.time:>10.3f}{share:>7.1f} %'
+                     f'{span_stats.nb_calls:>8d}  {rates}'.rstrip())
+        for child in span_stats.children.values():
+            add_lines(child, depth + 1)
+    add_lines(root, 0)
+    return '\n'.join(lines)
+
+
+def write_json(file_path: str) -> None:
+    """Export the span statistics of the run so far to a JSON file."""
+    with open(file_path, 'w', encoding='utf-8') as json_file:
+        json.dump(stats().to_dict(), json_file, indent=2)
@@ -0,0 +1,141 @@
+"""Check coherent sampler output for dependence between its samples, chunk by chunk
+(lib/dependence.py): the autocorrelation up to --max-lag by FFT, the mutual information of the
+NBLSB-bit symbols at --lags with the p-values of independence, and the power spectral density by
+Welch's method.
+
+The input is a CSV file of counts (CSCnt), one stream per column, of which --column is analyzed,
+a binary capture of the transmitted bytes of sampleToTransmitPerf.v (--raw) or a capture file
+of convert_capture.py (--capture). The autocorrelation and the spectral density are of the
+counts, or of the symbols with --symbols or when only the bytes are captured:
+
+```
+python3 math_model/analyze_dependence.py math_model/results/cscnt_per369_csc60.csv --lsb 1
+python3 math_model/analyze_dependence.py capture.csc --capture --max-lag 65536 --csv dep_s7
+```
+"""
+import argparse
+import csv
+import itertools
+import sys
+from os import getcwd
+from typing import Iterator, Tuple
+import numpy as np
+sys.path.append(getcwd())
+from lib import capture_file as c_f # pylint: disable=wrong-import-position
+from lib import dependence as d_p # pylint: disable=wrong-import-position
+from lib import entropy as e_n # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+# Largest autocorrelations printed:
+NB_PRINTED = 10
+
+
+def stream_chunks(args: argparse.Namespace) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """The analyzed values and the symbols of the input, chunk by chunk."""
+    if args.capture:
+        with c_f.CaptureReader(args.file) as reader:
+            for chunk in reader.chunks():
+                if reader.header.nb_lsbs == c_f.CNT_WIDTH:
+                    symbols = e_n.symbols_from_counts(chunk.astype(np.int64), args.lsb)
+                    yield (symbols if args.symbols else chunk), symbols
+                else:
+                    symbols = e_n.symbols_from_bytes(chunk, reader.header.nb_lsbs)
+                    yield symbols, symbols
+    elif args.raw:
+        data = np.memmap(args.file, dtype=np.uint8, mode='r')
+        for start in range(0, len(data), args.chunk):
+            symbols = e_n.symbols_from_bytes(data[start:start + args.chunk], args.lsb)
+            yield symbols, symbols
+    else:
+        with open(args.file, 'r', newline='', encoding='utf-8') as csv_file:
+            csv_reader = csv.reader(csv_file)
+            next(csv_reader)
+            while True:
+                rows = [row[args.column] for row in itertools.islice(csv_reader, args.chunk)]
+                if not rows:
+                    return
+                counts = np.array(rows, dtype=np.int64)
+                symbols = e_n.symbols_from_counts(counts, args.lsb)
+                yield (symbols if args.symbols else counts), symbols
+
+
+def write_csv(file_name: str, header: list, columns: list) -> None:
+    """Store the columns in the CSV file."""
+    with open(file_name, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow(header)
+        csv_writer.writerows(zip(*columns))
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', help='CSV file of counts, binary capture (--raw) or capture file '
+                        '(--capture)')
+    parser.add_argument('--raw', action='store_true', help='the file holds transmitted bytes')
+    parser.add_argument('--capture', action='store_true', help='the file is a capture file')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4, 8),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--column', type=int, default=0, help='CSV column of the counts')
+    parser.add_argument('--symbols', action='store_true',
+                        help='correlate the symbols instead of the counts')
+    parser.add_argument('--max-lag', type=int, default=1024, help='largest autocorrelation lag')
+    parser.add_argument('--lags', type=int, nargs='+', default=list(range(1, 17)),
+                        help='mutual information lags')
+    parser.add_argument('--segment', type=int, default=1 << 12,
+                        help='samples per spectral density segment')
+    parser.add_argument('--z', type=float, default=4.0,
+                        help='z-score of the printed autocorrelation bound')
+    parser.add_argument('--chunk', type=int, default=1 << 22, help='rows or bytes per chunk')
+    parser.add_argument('--csv', default=None, help='store the results in <CSV>_acf.csv, '
+                        '<CSV>_mi.csv and <CSV>_psd.csv')
+    args = parser.parse_args()
+
+    if args.capture:
+        with c_f.CaptureReader(args.file) as capture:
+            if capture.header.nb_lsbs != c_f.CNT_WIDTH:
+                args.lsb = capture.header.nb_lsbs
+    acf = d_p.Autocorrelation(args.max_lag)
+    mi = d_p.LagMutualInformation(args.lags, args.lsb)
+    psd = d_p.SpectralDensity(args.segment)
+    for values, symbols in stream_chunks(args):
+        with t_l.span('autocorrelation'):
+            acf.process(values)
+            t_l.count(len(values), 'samples')
+        with t_l.span('mutual information'):
+            mi.process(symbols)
+            t_l.count(len(symbols), 'samples')
+        with t_l.span('spectral density'):
+            psd.process(values)
+            t_l.count(len(values), 'samples')
+
+    correlations = acf.autocorrelations()
+    bound = acf.bound(args.z)
+    print(f'{acf.nb_samples} samples, autocorrelation bound {bound:.3g} (z = {args.z}), '
+          f'{np.sum(np.abs(correlations[1:]) > bound)} of {args.max_lag} lags above')
+    largest = 1 + np.argsort(-np.abs(np.nan_to_num(correlations[1:])))[:NB_PRINTED]
+    print(f'{"lag":>8}{"autocorrelation":>18}')
+    for lag in largest:
+        print(f'{lag:>8}{correlations[lag]:>18.4g}')
+
+    informations, biases, p_values = mi.mutual_informations(), mi.biases(), mi.p_values()
+    print(f'{"lag":>8}{"MI [bit]":>14}{"bias [bit]":>14}{"p-value":>14}')
+    for row in zip(mi.lags, informations, biases, p_values):
+        print(f'{row[0]:>8}' + ''.join(f'{v:>14.4g}' for v in row[1:]))
+
+    frequencies, densities = psd.density()
+    if psd.nb_segments > 0:
+        # An independent stream has a flat density, of the variance per unit bandwidth:
+        flat = 2 * acf.autocovariances()[0]
+        print(f'{psd.nb_segments} segments, density / flat density: min '
+              f'{np.min(densities[1:-1]) / flat:.4g}, max {np.max(densities[1:-1]) / flat:.4g} '
+              f'(at {frequencies[1 + np.argmax(densities[1:-1])]:.4g} cycles/sample)')
+
+    if args.csv is not None:
+        write_csv(f'{args.csv}_acf.csv', ['lag', 'autocorrelation'],
+                  [np.arange(args.max_lag + 1), correlations])
+        write_csv(f'{args.csv}_mi.csv', ['lag', 'MI [bit]', 'bias [bit]', 'p-value'],
+                  [mi.lags, informations, biases, p_values])
+        write_csv(f'{args.csv}_psd.csv', ['frequency [cycles/sample]', 'density'],
+                  [frequencies, densities])
+    print(t_l.report())
@@ -0,0 +1,78 @@
+"""Build the entropy table of the Gaussian path of the math model (lib/entropy_surrogate.py) for
+NBLSB bits per count, store it and print its estimated largest interpolation errors. Queries of
+C values for a jitter strength and period, and a comparison with the Gaussian columns of a
+generate_h_vs_csc.py result file, are optional:
+
+```
+python3 math_model/build_entropy_surrogate.py --lsb 1 --query 50 100.5 200
+python3 math_model/build_entropy_surrogate.py --check math_model/results/csc_jit46_per369.csv
+```
+"""
+import argparse
+import csv
+import os
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import entropy_surrogate as e_s # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-o', '--output', default=None, help='table file, default '
+                        'math_model/results/entropy_surrogate_lsb<NBLSB>.npz')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--phase-steps', type=int, default=256, help='table points per count')
+    parser.add_argument('--std-min', type=float, default=0.05, help='smallest tabulated std R')
+    parser.add_argument('--stds-per-decade', type=int, default=64,
+                        help='table points per decade of std R')
+    parser.add_argument('--load', action='store_true', help='load the table instead of building')
+    parser.add_argument('--jit', type=float, default=4.6e-15, help='jitter strength [s]')
+    parser.add_argument('--per', type=float, default=3.69e-9, help='RO period [s]')
+    parser.add_argument('--query', type=float, nargs='*', default=[], help='C values to query')
+    parser.add_argument('--check', default=None,
+                        help='generate_h_vs_csc.py result file of the same --jit and --per')
+    args = parser.parse_args()
+
+    file_name = args.output if args.output \
+        else f'math_model/results/entropy_surrogate_lsb{args.lsb}.npz'
+    if args.load:
+        surrogate = e_s.EntropySurrogate.load(file_name)
+    else:
+        with t_l.span('build'):
+            surrogate = e_s.EntropySurrogate.build(args.lsb, args.phase_steps, args.std_min,
+                                                   args.stds_per_decade)
+        surrogate.save(file_name)
+    print(f'{file_name}: {os.path.getsize(file_name)} bytes, NBLSB {surrogate.nb_bits}, '
+          f'tables {surrogate.min_hs.shape} and {surrogate.tail_min_hs.shape}')
+    print(f'estimated max. errors: min-entropy {surrogate.max_errors[0]:.2e} bit, '
+          f'Shannon entropy {surrogate.max_errors[1]:.2e} bit')
+
+    if args.query:
+        min_hs, hs, mean_rs, std_rs = surrogate.query(args.jit, args.per, np.array(args.query))
+        print(f'{"C":>10}{"minH":>12}{"H":>12}{"mean R":>12}{"std R":>12}')
+        for row in zip(args.query, min_hs, hs, mean_rs, std_rs):
+            print(''.join(f'{v:>12.6g}' if i else f'{v:>10.6g}' for i, v in enumerate(row)))
+    if args.check:
+        with open(args.check, 'r', newline='', encoding='utf-8') as csv_file:
+            csv_reader = csv.reader(csv_file)
+            next(csv_reader)
+            rows = np.array(list(csv_reader), dtype=float)
+        min_hs, hs, _, _ = surrogate.query(args.jit, args.per, rows[:, 0])
+        print(f'{args.check}: max. deviation from the Gaussian path: '
+              f'min-entropy {np.max(np.abs(min_hs - rows[:, 5])):.2e} bit, '
+              f'Shannon entropy {np.max(np.abs(hs - rows[:, 6])):.2e} bit')
+
+    cscs = np.linspace(1, 1000, 1 << 20)
+    for _ in range(100):
+        with t_l.span('query one'):
+            surrogate.query(args.jit, args.per, 150.0)
+            t_l.count(1, 'queries')
+    with t_l.span('query batch'):
+        surrogate.query(args.jit, args.per, cscs)
+        t_l.count(len(cscs), 'queries')
+    print(t_l.report())
@@ -0,0 +1,63 @@
+"""Calibrate the Gaussian path of the math model on the measured mean and variance of C of all
+no-placement measurements: fit the period scale and the jitter strength, optionally one per
+topology, and report the log residuals per topology and per file:
+
+```
+python3 math_model/calibrate_model.py --per-topology
+python3 math_model/calibrate_model.py --jit 4.6e-15 --csv math_model/results/residuals.csv
+```
+
+With --jit, the jitter strength is not fitted and the residuals show how well it matches.
+"""
+import argparse
+import csv
+import sys
+from os import getcwd
+sys.path.append(getcwd())
+from lib import jitter_estimation as j_e # pylint: disable=wrong-import-position
+from lib import model_calibration as m_c # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', help='all_configs files, all no-placement ones if none')
+    parser.add_argument('--root', default='measurements', help='measurement folder')
+    parser.add_argument('--csc-min', type=float, default=50, help='minimum mean C of a config')
+    parser.add_argument('--csc-max', type=float, default=1000, help='maximum mean C of a config')
+    parser.add_argument('--per-topology', action='store_true',
+                        help='fit a jitter strength per topology')
+    parser.add_argument('--jit', type=float, default=None,
+                        help='evaluate this jitter strength [s] instead of fitting it')
+    parser.add_argument('--csv', default=None, help='store the residuals per file in the CSV')
+    args = parser.parse_args()
+
+    files = args.files if args.files else j_e.find_files(args.root)
+    with t_l.span('read'):
+        rows = j_e.read_corpus(files, args.csc_min, args.csc_max)
+        t_l.count(len(rows.csc_means), 'configurations')
+    with t_l.span('fit'):
+        calibration = m_c.fit(rows, args.per_topology, args.jit)
+    print(f'period scale: {calibration.period_scale:.4f}, '
+          f'jitter strength: {calibration.jit_strength:.3e} s')
+    header = ['group', 'configs', 'J [s]', 'mean bias', 'mean rms', 'var bias', 'var rms']
+    print(f'{header[0]:<64}{header[1]:>8}' + ''.join(f'{h:>11}' for h in header[2:]))
+    for residuals in calibration.topology_residuals:
+        jit = calibration.topology_jits[rows.topologies.index(residuals.name)] \
+            if args.per_topology else calibration.jit_strength
+        print(f'{residuals.name:<64}{residuals.nb_rows:>8}{jit:>11.3e}' + ''.join(
+            f'{v:>11.3f}' for v in (residuals.mean_bias, residuals.mean_rms,
+                                    residuals.var_bias, residuals.var_rms)))
+    for residuals in calibration.file_residuals:
+        print(f'{residuals.name:<64}{residuals.nb_rows:>8}{"":>11}' + ''.join(
+            f'{v:>11.3f}' for v in (residuals.mean_bias, residuals.mean_rms,
+                                    residuals.var_bias, residuals.var_rms)))
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(['file', 'configs', 'mean bias', 'mean rms', 'var bias',
+                                 'var rms'])
+            csv_writer.writerows([r.name, r.nb_rows, r.mean_bias, r.mean_rms, r.var_bias,
+                                  r.var_rms] for r in calibration.file_residuals)
+    print(t_l.report())
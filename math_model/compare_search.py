@@ -0,0 +1,66 @@
+"""Compare configuration search strategies of the matching controller on a board, ranked on
+their expected lock-in latency.
+
+The strategies that use design-time knowledge take it from the reference all_configs file,
+by default the board itself, e.g., for a placement that differs from the reference:
+
+```
+python3 math_model/compare_search.py \
+    measurements/no_placement_s7/muxnetwork_np/all_configs_muxnetwork_np_coso_x0y0_stages3.csv \
+    --reference measurements/no_placement_area_explore_s7/muxnetwork_np_ae/all_configs_muxnetwork_np_area_explore_coso_x0y0_stages3.csv
+```
+"""
+import argparse
+import csv
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import matching_model as m_m # pylint: disable=wrong-import-position
+from lib import search_strategies as s_s # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config_file', help='all_configs CSV file of the board')
+    parser.add_argument('--reference', default=None, help='all_configs CSV file of the reference')
+    parser.add_argument('--thresh-l', type=int, default=74, help='CSCntThreshL')
+    parser.add_argument('--thresh-h', type=int, default=192, help='CSCntThreshH')
+    parser.add_argument('-n', type=int, default=100, help='number of runs per strategy')
+    parser.add_argument('--sweeps', type=float, default=2,
+                        help='probe budget, in number of configuration sweeps')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--csv', default=None, help='store the ranking in the CSV file')
+    args = parser.parse_args()
+
+    params = m_m.ControllerParams(csc_thresh_l=args.thresh_l, csc_thresh_h=args.thresh_h)
+    table = m_m.ConfigTable.read(args.config_file)
+    reference = table if args.reference is None else m_m.ConfigTable.read(args.reference)
+    strategies = [s_s.LinearSweep(), s_s.RandomStartSweep(), s_s.OrderedTable(reference, params),
+                  s_s.DelayBisection(reference, params),
+                  s_s.DelayBisection(reference, params, random_restarts=True)]
+    with t_l.span('evaluate'):
+        results = s_s.evaluate(strategies, table, params, args.n, args.sweeps, args.seed)
+        t_l.count(args.n * len(strategies), 'runs')
+
+    header = ['rank', 'strategy', 'matched ratio', 'fallback matched ratio',
+              'mean latency [clks]', 'median latency [clks]', 'p90 latency [clks]',
+              'mean nb probes']
+    rows = []
+    for rank, result in enumerate(results):
+        latencies = result.latencies / params.clk_period
+        p90 = float(np.quantile(latencies, 0.9, method='nearest'))
+        rows.append([rank + 1, result.name, result.matched_ratio, result.fallback_matched_ratio,
+                     float(np.mean(latencies)),
+                     float(np.median(latencies)), p90, float(np.mean(result.nb_probes))])
+    print(f'{header[0]:>4} {header[1]:<34}' + ' '.join(f'{h:>22}' for h in header[2:]))
+    for row in rows:
+        print(f'{row[0]:>4} {row[1]:<34}' + ' '.join(f'{v:>22.6g}' for v in row[2:]))
+    if args.csv is not None:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            csv_writer.writerows(rows)
+    print(t_l.report())
@@ -0,0 +1,73 @@
+"""Condition the raw bits of the coherent sampler in software (lib/conditioning.py) and print the
+min-entropy accounting and the throughput of every stage.
+
+The input is a binary capture of the transmitted bytes of sampleToTransmitPerf.v with the
+claimed min-entropy per NBLSB-bit symbol (--h), or, with --benchmark, the given number of MB of
+pseudo-random bytes. The stages are applied in the given order: parity:<order>, vn,
+xor:<factor>, sha256[:<block bytes>] and drbg[:<block bytes>[:<output bytes>]]:
+
+```
+python3 math_model/condition_bits.py bytes.bin --lsb 1 --h 0.8 --stages parity:2 sha256 -o out.bin
+python3 math_model/condition_bits.py --benchmark 256 --stages vn sha256:64
+```
+"""
+import argparse
+import contextlib
+import sys
+from os import getcwd
+from typing import Iterator
+import numpy as np
+sys.path.append(getcwd())
+from lib import conditioning as c_d # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+def benchmark_chunks(nb_bytes: int, chunk_size: int, seed: int=0) -> Iterator[np.ndarray]:
+    """Pseudo-random bytes, chunk_size bytes at a time."""
+    rng = np.random.default_rng(seed)
+    for start in range(0, nb_bytes, chunk_size):
+        yield rng.integers(0, 256, min(chunk_size, nb_bytes - start), dtype=np.uint8)
+
+
+def file_chunks(file_name: str, chunk_size: int) -> Iterator[np.ndarray]:
+    """The bytes of the file, chunk_size bytes at a time."""
+    data = np.memmap(file_name, dtype=np.uint8, mode='r')
+    for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', nargs='?', default=None, help='binary capture of bytes')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4, 8),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--h', type=float, default=1.0,
+                        help='claimed min-entropy per symbol')
+    parser.add_argument('--stages', nargs='+', default=['sha256'], help='conditioning stages')
+    parser.add_argument('-o', '--output', default=None, help='file of the conditioned bytes')
+    parser.add_argument('--benchmark', type=int, default=None,
+                        help='condition this many MB of pseudo-random bytes instead of a file')
+    parser.add_argument('--chunk', type=int, default=1 << 22, help='bytes per chunk')
+    args = parser.parse_args()
+
+    if (args.file is None) == (args.benchmark is None):
+        parser.error('either a file or --benchmark is required')
+    try:
+        stages = [c_d.stage_from_spec(spec) for spec in args.stages]
+    except ValueError as error:
+        parser.error(str(error))
+    pipeline = c_d.Pipeline(stages, args.h / args.lsb)
+    chunks = benchmark_chunks(args.benchmark * 10**6, args.chunk) if args.benchmark \
+        else file_chunks(args.file, args.chunk)
+    with open(args.output, 'wb') if args.output else contextlib.nullcontext() as output_file:
+        for chunk in chunks:
+            with t_l.span('condition'):
+                output = pipeline.process(chunk)
+                t_l.count(len(chunk) / 1e6, 'MB in')
+                t_l.count(len(output) / 1e6, 'MB out')
+            if output_file is not None:
+                with t_l.span('write'):
+                    output_file.write(output.tobytes())
+    print(pipeline.report())
+    print(t_l.report())
@@ -0,0 +1,73 @@
+"""Convert coherent sampler output into a chunked capture file (lib/capture_file.py), or print
+the header and chunk statistics of a capture file (--info).
+
+The input is either a CSV file of counts (CSCnt), e.g., of simulate_sampler.py, or a binary
+file of transmitted bytes of sampleToTransmitPerf.v (--raw, with --lsb set to its NBLSB):
+
+```
+python3 math_model/convert_capture.py math_model/results/cscnt_per369_csc60.csv capture.csc \
+    --board s7_x0y0 --topology muxnetwork --stages 3 --ro0-sel 5 --ro1-sel 9
+python3 math_model/convert_capture.py capture.csc --info
+```
+"""
+import argparse
+import csv
+import itertools
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import capture_file as c_f # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', help='CSV file of counts, binary file (--raw) or capture (--info)')
+    parser.add_argument('out_file', nargs='?', default=None, help='capture file to write')
+    parser.add_argument('--info', action='store_true', help='describe the capture file')
+    parser.add_argument('--raw', action='store_true', help='the file holds transmitted bytes')
+    parser.add_argument('--lsb', type=int, default=c_f.CNT_WIDTH, choices=(1, 2, 4, 8, 16),
+                        help='NBLSB of the transmitted bytes, 16 for full counts')
+    parser.add_argument('--column', type=int, default=0, help='CSV column of the counts')
+    parser.add_argument('--board', default='', help='board name')
+    parser.add_argument('--topology', default='', help='oscillator topology')
+    parser.add_argument('--stages', type=int, default=0, help='number of oscillator stages')
+    parser.add_argument('--ro0-sel', type=int, default=0, help='RO0Sel configuration')
+    parser.add_argument('--ro1-sel', type=int, default=0, help='RO1Sel configuration')
+    parser.add_argument('--chunk', type=int, default=1 << 20, help='samples per chunk')
+    parser.add_argument('--level', type=int, default=1, help='zlib level, 0 to store raw')
+    args = parser.parse_args()
+
+    if args.info:
+        with c_f.CaptureReader(args.file) as reader:
+            print(reader.header)
+            print(f'{len(reader)} samples in {len(reader.index)} chunks, '
+                  f'{np.sum(reader.index["compressed"])} compressed, '
+                  f'{np.sum(reader.index["size"])} bytes of chunks')
+        sys.exit()
+    if args.out_file is None:
+        parser.error('the capture file to write is required')
+    if args.raw == (args.lsb == c_f.CNT_WIDTH):
+        parser.error('--raw needs the NBLSB of the bytes (--lsb), counts need --lsb 16')
+    header = c_f.CaptureHeader(args.board, args.topology, args.stages, args.ro0_sel,
+                               args.ro1_sel, args.lsb, args.chunk)
+    with c_f.CaptureWriter(args.out_file, header, args.level) as writer, \
+            t_l.span('convert'):
+        if args.raw:
+            data = np.memmap(args.file, dtype=np.uint8, mode='r')
+            for start in range(0, len(data), args.chunk):
+                writer.write(data[start:start + args.chunk])
+                t_l.count(len(data[start:start + args.chunk]), 'samples')
+        else:
+            with open(args.file, 'r', newline='', encoding='utf-8') as csv_file:
+                csv_reader = csv.reader(csv_file)
+                next(csv_reader)
+                while True:
+                    rows = [row[args.column] for row in itertools.islice(csv_reader, args.chunk)]
+                    if not rows:
+                        break
+                    writer.write(np.array(rows, dtype=np.int64) & ((1 << c_f.CNT_WIDTH) - 1))
+                    t_l.count(len(rows), 'samples')
+    print(t_l.report())
@@ -0,0 +1,38 @@
+"""Decode a logic analyzer capture of the serial link of sendController.v into the sent bytes.
+
+The capture holds one byte per sample, with dataClk, data and sync on the given bits. The
+decoded bytes are written to a binary file, e.g., for estimate_entropy.py --raw:
+
+```
+python3 math_model/decode_capture.py capture.sr.bin -o bytes.bin --clk 0 --data 1 --sync 2
+python3 math_model/estimate_entropy.py bytes.bin --raw --lsb 2
+```
+"""
+import argparse
+import sys
+from os import devnull, getcwd
+sys.path.append(getcwd())
+from lib import capture_decoder as c_d # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', help='raw capture, one byte per sample')
+    parser.add_argument('-o', default=None, help='store the decoded bytes in the file')
+    parser.add_argument('--clk', type=int, default=0, help='bit of the dataClk channel')
+    parser.add_argument('--data', type=int, default=1, help='bit of the data channel')
+    parser.add_argument('--sync', type=int, default=2, help='bit of the sync channel')
+    parser.add_argument('--chunk', type=int, default=1 << 20, help='samples per chunk')
+    args = parser.parse_args()
+
+    decoder = c_d.CaptureDecoder(args.file, args.clk, args.data, args.sync, args.chunk)
+    nb_bytes = 0
+    with open(args.o if args.o else devnull, 'wb') as out_file:
+        for data in decoder.chunks():
+            data.tofile(out_file)
+            nb_bytes += len(data)
+    print(f'{nb_bytes} bytes in {decoder.nb_frames} frames, {decoder.nb_frame_errors} frame '
+          f'errors, {decoder.nb_dropped_bits} dropped bits')
+    print(t_l.report())
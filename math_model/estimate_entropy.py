@@ -0,0 +1,44 @@
+"""Estimate the min-entropy of coherent sampler output with the NIST SP 800-90B estimators.
+
+The input is either a CSV file of counts (CSCnt), e.g., of simulate_sampler.py, of which the
+NBLSB least significant bits of one column are assessed, or a binary capture of the transmitted
+bytes of sampleToTransmitPerf.v (--raw):
+
+```
+python3 math_model/estimate_entropy.py math_model/results/cscnt_per369_csc60.csv --lsb 1
+python3 math_model/estimate_entropy.py capture.bin --raw --lsb 2 -n 1000000
+```
+"""
+import argparse
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import entropy as e_n # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', help='CSV file of counts or binary capture (--raw)')
+    parser.add_argument('--raw', action='store_true', help='the file holds transmitted bytes')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4, 8),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--column', type=int, default=0, help='CSV column of the counts')
+    parser.add_argument('-n', type=int, default=None, help='number of symbols to assess')
+    args = parser.parse_args()
+
+    with t_l.span('read'):
+        if args.raw:
+            symbols = e_n.symbols_from_bytes(np.fromfile(args.file, dtype=np.uint8), args.lsb)
+        else:
+            counts = np.loadtxt(args.file, delimiter=',', skiprows=1, usecols=args.column,
+                                dtype=np.int64, ndmin=1)
+            symbols = e_n.symbols_from_counts(counts, args.lsb)
+        symbols = symbols[:args.n]
+    results = e_n.assess(symbols, args.lsb)
+    print(f'{len(symbols)} symbols of {args.lsb} bit(s)')
+    for name, value in results.items():
+        print(f'{name:<28}{value:8.4f}')
+    print(t_l.report())
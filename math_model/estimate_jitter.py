@@ -0,0 +1,62 @@
+"""Estimate the jitter strength of the oscillators from the var(CSC) column of all_configs
+measurements, per file, per topology and per FPGA family, with bootstrap confidence intervals of
+the medians. By default, all no-placement measurements are used:
+
+```
+python3 math_model/estimate_jitter.py --csv math_model/results/jitter_strengths.csv
+```
+
+The family medians are the JIT_STRENGTH values of the model scripts.
+"""
+import argparse
+import csv
+import os
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import jitter_estimation as j_e # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('files', nargs='*', help='all_configs files, all no-placement ones if none')
+    parser.add_argument('--root', default='measurements', help='measurement folder')
+    parser.add_argument('--csc-min', type=float, default=50, help='minimum mean C of a config')
+    parser.add_argument('--csc-max', type=float, default=1000, help='maximum mean C of a config')
+    parser.add_argument('--boot', type=int, default=1000, help='number of bootstrap resamples')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--csv', default=None, help='store the estimates in the CSV file')
+    args = parser.parse_args()
+
+    files = args.files if args.files else j_e.find_files(args.root)
+    with t_l.span('read'):
+        rows = j_e.read_corpus(files, args.csc_min, args.csc_max)
+        t_l.count(len(rows.jits), 'configurations')
+    with t_l.span('bootstrap'):
+        levels = [('file', j_e.summarize(rows.jits, rows.file_ids,
+                                         [os.path.basename(f) for f in files], args.boot,
+                                         seed=args.seed)),
+                  ('topology', j_e.summarize(rows.jits, rows.topology_ids, rows.topologies,
+                                             args.boot, seed=args.seed)),
+                  ('family', j_e.summarize(rows.jits, rows.family_ids, rows.families, args.boot,
+                                           seed=args.seed))]
+    header = ['level', 'group', 'configs', 'median [s]', 'CI low [s]', 'CI high [s]',
+              'q10 [s]', 'q90 [s]']
+    print(f'{header[0]:<10}{header[1]:<64}{header[2]:>8}' + ''.join(f'{h:>13}' for h in header[3:]))
+    for level, estimates in levels:
+        for e in estimates:
+            print(f'{level:<10}{e.name:<64}{e.nb_rows:>8}' + ''.join(
+                f'{v:>13.3e}' for v in (e.median, e.ci_low, e.ci_high, e.q_low, e.q_high)))
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            for level, estimates in levels:
+                csv_writer.writerows([level, e.name, e.nb_rows, e.median, e.ci_low, e.ci_high,
+                                      e.q_low, e.q_high] for e in estimates)
+    print(f'{len(files)} files, {len(rows.jits)} configurations, '
+          f'{np.sum(np.isin(np.arange(len(files)), rows.file_ids))} files with valid ones')
+    print(t_l.report())
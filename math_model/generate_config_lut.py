@@ -0,0 +1,81 @@
+"""Generate the ranked configuration table of a board for the matching controller, as memh file
+and/or Verilog ROM, and simulate its latency saving against the linear ROSel sweep.
+
+```
+python3 math_model/generate_config_lut.py \
+    measurements/no_placement_s7/muxnetwork_np/all_configs_muxnetwork_np_coso_x0y0_stages3.csv \
+    --memh config_lut.memh --rom configROM.v
+```
+
+The saving is simulated on the board's measurement itself, or on another measurement of the same
+board and placement (`--eval`), to check that the table is stable.
+"""
+import argparse
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import config_lut as c_l # pylint: disable=wrong-import-position
+from lib import matching_model as m_m # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config_file', help='all_configs CSV file of the board')
+    parser.add_argument('--thresh-l', type=int, default=74, help='CSCntThreshL')
+    parser.add_argument('--thresh-h', type=int, default=192, help='CSCntThreshH')
+    parser.add_argument('--ro-length', type=int, default=3, help='ROLength')
+    parser.add_argument('--entries', type=int, default=16, help='maximal number of table entries')
+    parser.add_argument('--p-min', type=float, default=0.5,
+                        help='minimal match probability of a table entry')
+    parser.add_argument('--memh', default=None, help='store the table in the memh file')
+    parser.add_argument('--rom', default=None, help='store the table as Verilog ROM module')
+    parser.add_argument('--eval', default=None,
+                        help='all_configs CSV file to simulate the latency on (default: board)')
+    parser.add_argument('-n', type=int, default=1000, help='number of simulated boots')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    args = parser.parse_args()
+
+    params = m_m.ControllerParams(csc_thresh_l=args.thresh_l, csc_thresh_h=args.thresh_h)
+    table = m_m.ConfigTable.read(args.config_file)
+    configs = c_l.rank(table, params, args.entries, args.p_min)
+    try:
+        words = c_l.rosels(table, configs, args.ro_length)
+    except ValueError as error:
+        parser.error(f'{error} The topology of {args.config_file} does not fit the 2-bit-per-stage '
+                     f'ROSel of matchingController.v with ROLength {args.ro_length}.')
+    p_matches = c_l.match_probabilities(table, params)
+    print(f'{"RO0Sel":>8}{"RO1Sel":>8}{"ROSel":>8}{"mean C":>10}{"P(match)":>10}')
+    for config, word in zip(configs, words):
+        print(f'{table.sel0s[config]:>8d}{table.sel1s[config]:>8d}{word:>8x}'
+              f'{table.csc_means[config]:>10.1f}{p_matches[config]:>10.3f}')
+    if len(words) == 0:
+        sys.exit('No configuration matches with the minimal probability.')
+    if args.memh is not None:
+        c_l.write_memh(args.memh, words, args.ro_length)
+    if args.rom is not None:
+        c_l.write_rom(args.rom, words, args.ro_length)
+
+    eval_table = table if args.eval is None else m_m.ConfigTable.read(args.eval)
+    eval_configs = configs
+    if eval_table is not table:
+        # Map the table entries onto the evaluated measurement:
+        eval_ids = {(s0, s1): i for i, (s0, s1) in enumerate(zip(eval_table.sel0s,
+                                                                  eval_table.sel1s))}
+        eval_configs = np.array([eval_ids[(table.sel0s[c], table.sel1s[c])] for c in configs
+                                 if (table.sel0s[c], table.sel1s[c]) in eval_ids], dtype=np.int64)
+    results = {'linear sweep': m_m.simulate(eval_table, params, args.n, seed=args.seed),
+               'table + sweep': m_m.simulate(eval_table, params, args.n,
+                                             order=c_l.lut_order(eval_table, eval_configs),
+                                             seed=args.seed)}
+    print(f'{"controller":<16}{"matched":>9}{"mean [clks]":>14}{"p50 [clks]":>14}'
+          f'{"p90 [clks]":>14}{"mean probes":>13}')
+    for name, result in results.items():
+        latencies = result.latencies / params.clk_period
+        p50, p90 = result.quantiles((0.5, 0.9)) / params.clk_period
+        print(f'{name:<16}{result.matched_ratio:>9.3f}{np.mean(latencies):>14.6g}{p50:>14.6g}'
+              f'{p90:>14.6g}{np.mean(result.nb_visits):>13.2f}')
+    saving = np.mean(results['linear sweep'].latencies) \
+        / np.mean(results['table + sweep'].latencies)
+    print(f'Mean latency saving: {saving:.1f}x')
@@ -1,10 +1,14 @@
 """Generate math model data."""
 import random
 import csv
+import sys
+from os import getcwd
 from typing import List, Tuple, cast
 import numpy as np
 import matplotlib.pyplot as plt
 from scipy.stats import norm # type: ignore
+sys.path.append(getcwd())
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
 
 JIT_STRENGTH = 4.6e-15
 RO_PER = 3.69e-9
@@ -21,12 +25,14 @@ def norm_pdf(x: List[float], mu: float, s: float) -> List[float]:
         result_pdf.append(1.0 / (s * np.sqrt(2 * np.pi)) * np.exp(-0.5 * ((x_i - mu) / s)**2))
     return result_pdf
 
-def h_vs_cs(dt_: float, st_: float, per: float) \
+@t_l.span('h_vs_cs')
+def h_vs_cs(dt_: float, st_: float, per: float,
+            nb_samples: int=100000, nb_wt_points: int=1000) \
     -> Tuple[float, float, float, float, float, float, float, float]:
     """Generate entropy values."""
     varss = [per, per + dt_, st_, st_]
-    pdf_w = dist_wt(varss, 1000)
-    a = dist_r(varss, 100000, pdf_w)
+    pdf_w = dist_wt(varss, nb_wt_points)
+    a = dist_r(varss, nb_samples, pdf_w)
     r = a[0]
     mu_r = a[1]
     s_r = a[2]
@@ -81,6 +87,7 @@ def norm_cdf_list(x: List[float], mu: float, s: float) -> List[float]:
         result_.append(norm_cdf(x_i, mu, s))
     return result_
 
+@t_l.span('dist_r')
 def dist_r(varss: List[float], nb_samples: int, dist_pdf_w: List[float]) \
     -> Tuple[List[float], float, int]:
     """Get R distribution."""
@@ -89,6 +96,7 @@ def dist_r(varss: List[float], nb_samples: int, dist_pdf_w: List[float]) \
     s_t1 = varss[2]
     s_t2 = varss[3]
     samples = [0] * nb_samples
+    t_l.count(nb_samples, 'trials')
     for ii in range(nb_samples):
         r = (get_random_cdf(dist_pdf_w) - 1) / len(dist_pdf_w) * mu_t1 / 2
         t1 = mu_t1 + np.random.normal() * s_t1
@@ -106,6 +114,7 @@ def dist_r(varss: List[float], nb_samples: int, dist_pdf_w: List[float]) \
         rs[ii] = r_i / nb_samples
     return rs, cast(float, np.mean(samples)), cast(int, np.std(samples))
 
+@t_l.span('dist_wt')
 def dist_wt(varss: List[float], length: int) -> List[float]:
     """Get WT distribution."""
     mu = abs(varss[1] - varss[0])
@@ -138,44 +147,47 @@ def get_random_cdf(pdf: List[float]) -> int:
             return ra
     return 0
 
-n = [0.0] * NB_SAMPLES
-for i in range(NB_SAMPLES):
-    n[i] = CSCMM[0] + i * (CSCMM[1] - CSCMM[0]) / (NB_SAMPLES - 1)
-st = np.sqrt(JIT_STRENGTH * RO_PER)
-dt = [0.0] * NB_SAMPLES
-for i in range(NB_SAMPLES):
-    dt[i] = RO_PER / n[i]
-
-min_hs = [0.0] * NB_SAMPLES
-h_s = [0.0] * NB_SAMPLES
-mu_rs = [0.0] * NB_SAMPLES
-s_rs = [0.0] * NB_SAMPLES
-min_h_1s = [0.0] * NB_SAMPLES
-h_1s = [0.0] * NB_SAMPLES
-mu_r_1s = [0.0] * NB_SAMPLES
-s_r_1s = [0.0] * NB_SAMPLES
-
-with open(file_name, 'w', encoding='utf-8') as csv_file:
-    csv_writer = csv.writer(csv_file, delimiter=',')
-    csv_writer.writerow(['CSC', 'minH (sim)', 'H (sim)', 'mean R (sim)', 'std R (sim)',
-                         'minH (norm)', 'H (norm)', 'mean R (norm)', 'std R (norm)'])
-
-for i in range(NB_SAMPLES):
-    print(i)
-    result = h_vs_cs(dt[i], st, RO_PER)
-    min_hs[i] = result[0]
-    h_s[i] = result[1]
-    mu_rs[i] = result[2]
-    s_rs[i] = result[3]
-    min_h_1s[i] = result[4]
-    h_1s[i] = result[5]
-    mu_r_1s[i] = result[6]
-    s_r_1s[i] = result[7]
-    with open(file_name, 'a', encoding='utf-8') as csv_file:
+if __name__ == '__main__':
+    n = [0.0] * NB_SAMPLES
+    for i in range(NB_SAMPLES):
+        n[i] = CSCMM[0] + i * (CSCMM[1] - CSCMM[0]) / (NB_SAMPLES - 1)
+    st = np.sqrt(JIT_STRENGTH * RO_PER)
+    dt = [0.0] * NB_SAMPLES
+    for i in range(NB_SAMPLES):
+        dt[i] = RO_PER / n[i]
+
+    min_hs = [0.0] * NB_SAMPLES
+    h_s = [0.0] * NB_SAMPLES
+    mu_rs = [0.0] * NB_SAMPLES
+    s_rs = [0.0] * NB_SAMPLES
+    min_h_1s = [0.0] * NB_SAMPLES
+    h_1s = [0.0] * NB_SAMPLES
+    mu_r_1s = [0.0] * NB_SAMPLES
+    s_r_1s = [0.0] * NB_SAMPLES
+
+    with open(file_name, 'w', encoding='utf-8') as csv_file:
         csv_writer = csv.writer(csv_file, delimiter=',')
-        csv_writer.writerow([n[i], min_hs[i], h_s[i], mu_rs[i], s_rs[i],
-                             min_h_1s[i], h_1s[i], mu_r_1s[i], s_r_1s[i]])
-
-plt.plot(n, min_hs) # type: ignore
-plt.plot(n, min_h_1s) # type: ignore
-plt.show() # type: ignore
+        csv_writer.writerow(['CSC', 'minH (sim)', 'H (sim)', 'mean R (sim)', 'std R (sim)',
+                             'minH (norm)', 'H (norm)', 'mean R (norm)', 'std R (norm)'])
+
+    for i in range(NB_SAMPLES):
+        print(i)
+        result = h_vs_cs(dt[i], st, RO_PER)
+        min_hs[i] = result[0]
+        h_s[i] = result[1]
+        mu_rs[i] = result[2]
+        s_rs[i] = result[3]
+        min_h_1s[i] = result[4]
+        h_1s[i] = result[5]
+        mu_r_1s[i] = result[6]
+        s_r_1s[i] = result[7]
+        with open(file_name, 'a', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file, delimiter=',')
+            csv_writer.writerow([n[i], min_hs[i], h_s[i], mu_rs[i], s_rs[i],
+                                 min_h_1s[i], h_1s[i], mu_r_1s[i], s_r_1s[i]])
+
+    print(t_l.report())
+
+    plt.plot(n, min_hs) # type: ignore
+    plt.plot(n, min_h_1s) # type: ignore
+    plt.show() # type: ignore
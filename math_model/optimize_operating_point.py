@@ -0,0 +1,83 @@
+"""Find the operating point of coherent samplers that maximizes the entropy throughput (HTP)
+subject to a min-entropy floor at the worst phase of C (lib/operating_point.py), and the
+CSCntThreshL and CSCntThreshH of the matching controller that accept it.
+
+The boards are given by their jitter strengths and periods, or, with --boards, are the
+no-placement all_configs files, each with the median jitter strength estimate and median period
+of its configurations:
+
+```
+python3 math_model/optimize_operating_point.py --jit 4.6e-15 1.6e-15 --per 3.69e-9 6.25e-9
+python3 math_model/optimize_operating_point.py --boards --target 0.91 --csv math_model/results/operating_points.csv
+```
+"""
+import argparse
+import csv
+import os
+import sys
+from os import getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import entropy_surrogate as e_s # pylint: disable=wrong-import-position
+from lib import jitter_estimation as j_e # pylint: disable=wrong-import-position
+from lib import operating_point as o_p # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--jit', type=float, nargs='+', default=[4.6e-15],
+                        help='jitter strength [s] per board')
+    parser.add_argument('--per', type=float, nargs='+', default=[3.69e-9],
+                        help='RO period [s] per board')
+    parser.add_argument('--boards', action='store_true',
+                        help='optimize the boards of the no-placement measurements instead')
+    parser.add_argument('--root', default='measurements', help='measurement folder')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--target', type=float, default=0.91, help='min-entropy floor per bit')
+    parser.add_argument('--ratio', type=float, default=0.5,
+                        help='smallest accepted ratio of the maximum HTP')
+    parser.add_argument('--unchecked-bits', type=int, default=0,
+                        help='CSCntLength - NBCheckbits of the matching controller')
+    parser.add_argument('--surrogate', default=None,
+                        help='table of build_entropy_surrogate.py, exact model if none')
+    parser.add_argument('--csv', default=None, help='store the operating points in the CSV file')
+    args = parser.parse_args()
+
+    if args.boards:
+        files = j_e.find_files(args.root)
+        with t_l.span('read'):
+            rows = j_e.read_corpus(files)
+            t_l.count(len(rows.jits), 'configurations')
+        boards = np.unique(rows.file_ids)
+        names = [os.path.basename(files[b]) for b in boards]
+        jits = np.array([np.median(rows.jits[rows.file_ids == b]) for b in boards])
+        periods = np.array([np.median(rows.periods[rows.file_ids == b]) for b in boards])
+    else:
+        jits, periods = np.broadcast_arrays(np.array(args.jit), np.array(args.per))
+        names = [f'board {i}' for i in range(len(jits))]
+    surrogate = e_s.EntropySurrogate.load(args.surrogate) if args.surrogate else None
+    with t_l.span('optimize'):
+        points = o_p.optimize(jits, periods, args.lsb, args.target, surrogate, args.ratio)
+        thresh_ls, thresh_hs = points.thresholds(args.unchecked_bits)
+        t_l.count(len(jits), 'boards')
+
+    header = ['board', 'jitter strength [s]', 'period [s]', 'C floor', 'C', 'dT [s]', 'minH',
+              'HTP [bit/s]', 'C high', 'CSCntThreshL', 'CSCntThreshH']
+    table = [[name, jit, per, floor, csc, delta, min_h, htp, high, int(low), int(up)]
+             for name, jit, per, floor, csc, delta, min_h, htp, high, low, up in
+             zip(names, jits, periods, points.floor_cscs, points.cscs, points.deltas,
+                 points.min_hs, points.htps, points.high_cscs, thresh_ls, thresh_hs)]
+    width = max(len(name) for name in names) + 2
+    print(f'{header[0]:<{width}}' + ''.join(f'{h:>14}' for h in header[1:]))
+    for row in table:
+        print(f'{row[0]:<{width}}' + ''.join(f'{v:>14.4g}' for v in row[1:9])
+              + ''.join(f'{v:>14}' for v in row[9:]))
+    if args.csv:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            csv_writer.writerows(table)
+    print(t_l.report())
@@ -0,0 +1,74 @@
+"""Run the SP 800-90B health tests (repetition count and adaptive proportion) on coherent
+sampler output, chunk by chunk.
+
+The input is either a CSV file of counts (CSCnt), one stream per column, e.g., of
+simulate_sampler.py, or a binary capture of the transmitted bytes of sampleToTransmitPerf.v
+(--raw). The NBLSB least significant bits of every count are tested against the cutoffs of the
+claimed min-entropy per symbol:
+
+```
+python3 math_model/run_health_tests.py math_model/results/cscnt_per369_csc60.csv --lsb 1 --h 0.8
+```
+"""
+import argparse
+import csv
+import itertools
+import sys
+from os import getcwd
+from typing import Iterator
+import numpy as np
+sys.path.append(getcwd())
+from lib import entropy as e_n # pylint: disable=wrong-import-position
+from lib import health_tests as h_t # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+
+def csv_chunks(file_name: str, nb_lsbs: int, chunk_size: int) -> Iterator[np.ndarray]:
+    """The symbols of every column of the CSV file, shape (nb_columns, chunk_size)."""
+    with open(file_name, 'r', newline='', encoding='utf-8') as csv_file:
+        csv_reader = csv.reader(csv_file)
+        next(csv_reader)
+        while True:
+            rows = list(itertools.islice(csv_reader, chunk_size))
+            if not rows:
+                return
+            yield e_n.symbols_from_counts(np.array(rows, dtype=np.int64).T, nb_lsbs)
+
+
+def raw_chunks(file_name: str, nb_lsbs: int, chunk_size: int) -> Iterator[np.ndarray]:
+    """The symbols of the captured bytes, chunk_size bytes at a time."""
+    data = np.memmap(file_name, dtype=np.uint8, mode='r')
+    for start in range(0, len(data), chunk_size):
+        yield e_n.symbols_from_bytes(data[start:start + chunk_size], nb_lsbs)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('file', help='CSV file of counts or binary capture (--raw)')
+    parser.add_argument('--raw', action='store_true', help='the file holds transmitted bytes')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4, 8),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--h', type=float, required=True,
+                        help='claimed min-entropy per symbol')
+    parser.add_argument('--alpha', type=float, default=h_t.ALPHA, help='false alarm rate')
+    parser.add_argument('--chunk', type=int, default=1 << 16, help='rows or bytes per chunk')
+    parser.add_argument('--quiet', action='store_true', help='only print the alarm totals')
+    args = parser.parse_args()
+
+    chunks = raw_chunks(args.file, args.lsb, args.chunk) if args.raw \
+        else csv_chunks(args.file, args.lsb, args.chunk)
+    tests = None
+    for chunk in chunks:
+        chunk = chunk.reshape(-1, chunk.shape[-1])
+        if tests is None:
+            tests = h_t.HealthTests(args.h, args.lsb, chunk.shape[0], args.alpha,
+                                    on_alarm=None if args.quiet else print)
+            print(f'RCT cutoff: {tests.rct.cutoff}, APT cutoff: {tests.apt.cutoff} '
+                  f'(window {tests.apt.window})')
+        with t_l.span('health tests'):
+            tests.process(chunk)
+            t_l.count(chunk.size, 'samples')
+    if tests is not None:
+        print(f'{tests.rct.nb_samples} samples per stream, alarms: {tests.nb_alarms}')
+    print(t_l.report())
@@ -0,0 +1,149 @@
+"""Serve conditioned random bytes over a local socket (lib/entropy_server.py), from a capture
+file of convert_capture.py (--capture) or from the coherent sampler simulation of
+simulate_sampler.py. The health tests run on the NBLSB-bit symbols with the claimed min-entropy
+per symbol (--h) and stop the output on an alarm; the conditioning stages are those of
+condition_bits.py. The server listens once it holds --prefill-bytes, one ring slot by default.
+
+The server prints its counters every --interval seconds. With --self-test, it serves the given
+number of concurrent local clients, each fetching --requests times --request-bytes bytes, and
+prints the counters when they are done:
+
+```
+python3 math_model/serve_entropy.py --capture capture.csc --h 0.8 --port 8642
+python3 math_model/serve_entropy.py --per 3.69 --csc 60 --pairs 16 --unix /tmp/entropy.sock
+python3 math_model/serve_entropy.py --capture capture.csc --self-test 256 --requests 100
+```
+"""
+import argparse
+import asyncio
+import json
+import sys
+from os import getcwd
+from typing import Iterator, List
+import numpy as np
+sys.path.append(getcwd())
+from lib import capture_file as c_f # pylint: disable=wrong-import-position
+from lib import coherent_sampler as c_s # pylint: disable=wrong-import-position
+from lib import conditioning as c_d # pylint: disable=wrong-import-position
+from lib import entropy as e_n # pylint: disable=wrong-import-position
+from lib import entropy_server as e_v # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+JIT_STRENGTH = 4.6e-15
+# False alarm rate of the health tests: the smallest of SP 800-90B, as an alarm stops the
+# output for good and the server tests millions of symbols per second:
+ALPHA = 2.0**-40
+
+
+def capture_symbols(file_name: str, nb_lsbs: int) -> Iterator[np.ndarray]:
+    """The symbols of the capture file, chunk by chunk. Captured bytes hold the NBLSB of the
+    header."""
+    with c_f.CaptureReader(file_name) as reader:
+        for chunk in reader.chunks():
+            if reader.header.nb_lsbs == c_f.CNT_WIDTH:
+                yield e_n.symbols_from_counts(chunk, nb_lsbs)
+            else:
+                yield e_n.symbols_from_bytes(chunk, reader.header.nb_lsbs)
+
+
+def simulated_symbols(args: argparse.Namespace) -> Iterator[np.ndarray]:
+    """The symbols of the simulated oscillator pairs, shape (pairs, chunk), endlessly."""
+    per1 = args.per * 1e-9
+    per0 = per1 * (1 + 1 / (args.csc - 1))
+    jit = c_s.period_sd(args.jit, per1)
+    sampler = c_s.CoherentSampler(per0, per1, jit, jit, nb_pairs=args.pairs, seed=args.seed)
+    for counts in sampler.stream(args.chunk):
+        yield e_n.symbols_from_counts(counts, args.lsb)
+
+
+async def run_client(address: List, nb_requests: int, nb_bytes: int) -> List[int]:
+    """Fetch nb_requests times nb_bytes bytes and return the statuses."""
+    if isinstance(address, str):
+        reader, writer = await asyncio.open_unix_connection(address)
+    else:
+        reader, writer = await asyncio.open_connection(*address[:2])
+    statuses = []
+    for _ in range(nb_requests):
+        status, _ = await e_v.fetch(reader, writer, nb_bytes)
+        statuses.append(status)
+        if status in (e_v.STATUS_FAILED, e_v.STATUS_EXHAUSTED):
+            break
+    writer.close()
+    await writer.wait_closed()
+    return statuses
+
+
+async def print_stats(server: e_v.EntropyServer, interval: float) -> None:
+    """Print the counters every interval seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        print(json.dumps(server.stats.to_dict()), e_v.STATUS_NAMES[server.ring.status])
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Serve until interrupted, or run the self-test."""
+    source = capture_symbols(args.capture, args.lsb) if args.capture \
+        else simulated_symbols(args)
+    server = e_v.EntropyServer(source, args.lsb, args.h,
+                               [c_d.stage_from_spec(spec) for spec in args.stages],
+                               args.slots, args.slot_bytes, args.max_request, args.max_clients,
+                               args.alpha)
+    listener = await server.start(args.host, args.port, args.unix, args.prefill_bytes)
+    address = args.unix if args.unix else listener.sockets[0].getsockname()
+    print(f'serving on {address}, ring of {server.ring.capacity} bytes, min-entropy per '
+          f'output bit {server.pipeline.min_entropies[-1]:.6f}')
+    if args.self_test is None:
+        async with listener:
+            await asyncio.gather(listener.serve_forever(), print_stats(server, args.interval))
+        return
+    results = await asyncio.gather(*[run_client(address, args.requests, args.request_bytes)
+                                     for _ in range(args.self_test)])
+    statuses = np.concatenate([np.array(r, dtype=np.int64) for r in results])
+    for status, name in e_v.STATUS_NAMES.items():
+        print(f'{name}: {np.sum(statuses == status)} requests')
+    print(json.dumps(server.stats.to_dict(), indent=1))
+    print(server.pipeline.report())
+    listener.close()
+    assert server.producer is not None
+    server.producer.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--capture', default=None, help='capture file, default: simulation')
+    parser.add_argument('--per', type=float, default=3.69, help='simulated RO1 period [ns]')
+    parser.add_argument('--csc', type=float, default=60, help='simulated mean count')
+    parser.add_argument('--jit', type=float, default=JIT_STRENGTH, help='jitter strength [s]')
+    parser.add_argument('--pairs', type=int, default=16, help='simulated oscillator pairs')
+    parser.add_argument('--chunk', type=int, default=10000, help='simulated counts per chunk')
+    parser.add_argument('--seed', type=int, default=None, help='simulation random seed')
+    parser.add_argument('--lsb', type=int, default=1, choices=(1, 2, 4, 8),
+                        help='number of least significant bits per count (NBLSB)')
+    parser.add_argument('--h', type=float, default=0.8, help='claimed min-entropy per symbol')
+    parser.add_argument('--alpha', type=float, default=ALPHA, help='false alarm rate')
+    parser.add_argument('--stages', nargs='+', default=['sha256'], help='conditioning stages')
+    parser.add_argument('--host', default='127.0.0.1', help='TCP host')
+    parser.add_argument('--port', type=int, default=0, help='TCP port, 0 for any free one')
+    parser.add_argument('--unix', default=None, help='Unix socket path instead of TCP')
+    parser.add_argument('--slots', type=int, default=64, help='ring slots')
+    parser.add_argument('--slot-bytes', type=int, default=1 << 16, help='bytes per ring slot')
+    parser.add_argument('--prefill-bytes', type=int, default=None,
+                        help='bytes buffered before listening, default: one slot')
+    parser.add_argument('--max-request', type=int, default=1 << 16, help='bytes per request')
+    parser.add_argument('--max-clients', type=int, default=1024, help='concurrent clients')
+    parser.add_argument('--interval', type=float, default=10, help='seconds between counters')
+    parser.add_argument('--self-test', type=int, default=None, help='number of local clients')
+    parser.add_argument('--requests', type=int, default=100, help='requests per client')
+    parser.add_argument('--request-bytes', type=int, default=4096, help='bytes per request')
+    args = parser.parse_args()
+
+    if args.capture:
+        with c_f.CaptureReader(args.capture) as capture:
+            if capture.header.nb_lsbs != c_f.CNT_WIDTH:
+                args.lsb = capture.header.nb_lsbs
+    try:
+        asyncio.run(main(args))
+    except KeyboardInterrupt:
+        pass
+    print(t_l.report())
@@ -0,0 +1,96 @@
+"""Simulate the lock-in latency of the matching controller for a grid of controller parameters.
+
+Every argument that takes a list is swept, one parameter set per worker process (-j), e.g., to predict the latency versus the upper bound on C
+of the no_placement_matched_control_s7 measurements:
+
+```
+python3 math_model/simulate_matching.py \
+    measurements/no_placement_s7/muxnetwork_np/all_configs_muxnetwork_np_coso_x0y0_stages3.csv \
+    --thresh-h 100 110 120 130 140 150 --csv math_model/results/matching_muxnetwork_s3.csv
+```
+"""
+import argparse
+import csv
+import itertools
+import multiprocessing as mp
+import sys
+from os import getcwd
+from typing import Optional, Tuple, TYPE_CHECKING
+sys.path.append(getcwd())
+from lib import matching_model as m_m # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+if TYPE_CHECKING:
+    import multiprocessing.sharedctypes as mps
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+_table: Optional[m_m.ConfigTable] = None
+_counter: Optional[t_l.ProgressCounter] = None
+
+
+def _init_worker(config_file: str, shared_count: 'mps.Synchronized[int]') -> None:
+    """Read the board in a worker process and count its parameter sets on the progress."""
+    global _table, _counter # pylint: disable=global-statement
+    _table = m_m.ConfigTable.read(config_file)
+    _counter = t_l.ProgressCounter(shared_count, batch_size=1)
+
+
+def _simulate(job: Tuple[m_m.ControllerParams, int, float, Optional[int]]) -> m_m.MatchResult:
+    params, nb_boards, nb_sweeps, seed = job
+    assert _table is not None and _counter is not None
+    result = m_m.simulate(_table, params, nb_boards, max_nb_sweeps=nb_sweeps, seed=seed)
+    _counter.add()
+    return result
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('config_file', help='all_configs CSV file of the board')
+    parser.add_argument('--thresh-l', type=int, nargs='+', default=[74], help='CSCntThreshL')
+    parser.add_argument('--thresh-h', type=int, nargs='+', default=[192], help='CSCntThreshH')
+    parser.add_argument('--samples-log', type=int, nargs='+', default=[7], help='NBSamplesLog')
+    parser.add_argument('--samples-min', type=int, nargs='+', default=[64], help='samplesMin')
+    parser.add_argument('--lock-log', type=int, nargs='+', default=[8], help='MaxLockCntLog')
+    parser.add_argument('-n', type=int, default=1000, help='number of simulated boards')
+    parser.add_argument('--sweeps', type=float, default=2,
+                        help='number of configuration sweeps before a board is considered failed')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--csv', default=None, help='store the results in the CSV file')
+    parser.add_argument('-j', type=int, default=None,
+                        help='number of worker processes (default: number of CPUs)')
+    args = parser.parse_args()
+
+    header = ['CSCntThreshL', 'CSCntThreshH', 'NBSamplesLog', 'samplesMin', 'MaxLockCntLog',
+              'matched ratio', 'mean latency [clks]'] \
+        + [f'p{int(q * 100)} latency [clks]' for q in QUANTILES] + ['median nb visited configs']
+    grid = list(itertools.product(args.thresh_l, args.thresh_h, args.samples_log,
+                                  args.samples_min, args.lock_log))
+    all_params = [m_m.ControllerParams(csc_thresh_l=thresh_l, csc_thresh_h=thresh_h,
+                                       nb_samples_log=samples_log, samples_min=samples_min,
+                                       max_lock_cnt_log=lock_log)
+                  for thresh_l, thresh_h, samples_log, samples_min, lock_log in grid]
+    with t_l.span('simulate'):
+        with t_l.Progress(len(grid), unit='parameter sets') as progress:
+            with mp.Pool(args.j, initializer=_init_worker,
+                         initargs=(args.config_file, progress.shared_count)) as pool:
+                results = pool.map(_simulate, [(params, args.n, args.sweeps, args.seed)
+                                               for params in all_params])
+        t_l.count(args.n * len(grid), 'boards')
+    rows = []
+    print(' '.join(f'{h:>14.14}' for h in header))
+    for point, params, result in zip(grid, all_params, results):
+        latencies = result.latencies / params.clk_period
+        matched = latencies[result.configs >= 0]
+        mean = float(matched.mean()) if len(matched) > 0 else float('inf')
+        row = list(point) + [result.matched_ratio, mean] \
+            + list(result.quantiles(QUANTILES) / params.clk_period) \
+            + [float(sorted(result.nb_visits)[len(result.nb_visits) // 2])]
+        rows.append(row)
+        print(' '.join(f'{v:>14.6g}' for v in row))
+    if args.csv is not None:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            csv_writer.writerows(rows)
+    print(t_l.report())
@@ -0,0 +1,59 @@
+"""Generate synthetic coherent sampler counts (CSCnt) of independent oscillator pairs.
+
+The counts are written chunk by chunk to a CSV file, one column per oscillator pair, e.g.,
+1e6 counts of 10 pairs with C around 60:
+
+```
+python3 math_model/simulate_sampler.py --per 3.69 --csc 60 -n 1000000 --pairs 10 \
+    -o math_model/results/cscnt_per369_csc60.csv
+```
+"""
+import argparse
+import csv
+import sys
+from os import devnull, getcwd
+import numpy as np
+sys.path.append(getcwd())
+from lib import coherent_sampler as c_s # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+JIT_STRENGTH = 4.6e-15
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--per', type=float, default=3.69, help='RO1 period [ns]')
+    parser.add_argument('--csc', type=float, default=60,
+                        help='mean count, sets the RO0 period to per * (1 + 1 / (csc - 1))')
+    parser.add_argument('--jit', type=float, default=JIT_STRENGTH, help='jitter strength [s]')
+    parser.add_argument('-n', type=int, default=100000, help='number of counts per pair')
+    parser.add_argument('--pairs', type=int, default=1, help='number of oscillator pairs')
+    parser.add_argument('--chunk', type=int, default=10000, help='counts per pair per chunk')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('-o', default=None, help='store the counts in the CSV file')
+    args = parser.parse_args()
+
+    per1 = args.per * 1e-9
+    per0 = per1 * (1 + 1 / (args.csc - 1))
+    jit = c_s.period_sd(args.jit, per1)
+    sampler = c_s.CoherentSampler(per0, per1, jit, jit, nb_pairs=args.pairs, seed=args.seed)
+    nb_chunks = -(-args.n // args.chunk)
+    total, total_sq = np.zeros(args.pairs), np.zeros(args.pairs)
+    time_logger = t_l.TimeLogger(nb_chunks, unit='chunks')
+    with open(args.o if args.o else devnull, 'w', newline='', encoding='utf-8') as csv_file:
+        csv_writer = csv.writer(csv_file)
+        csv_writer.writerow([f'CSCnt {pair}' for pair in range(args.pairs)])
+        time_logger.start()
+        for chunk_id, counts in enumerate(sampler.stream(args.chunk, nb_chunks)):
+            counts = counts[:, :args.n - chunk_id * args.chunk]
+            total += counts.sum(axis=1)
+            total_sq += (counts.astype(np.float64)**2).sum(axis=1)
+            if args.o:
+                csv_writer.writerows(counts.T.tolist())
+            time_logger.iterate()
+        time_logger.clear()
+    means = total / args.n
+    print(f'mean CSCnt: {np.mean(means):.3f}, '
+          f'var CSCnt: {np.mean(total_sq / args.n - means**2):.3f}')
+    print(t_l.report())
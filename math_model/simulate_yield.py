@@ -0,0 +1,84 @@
+"""Estimate the production yield of a topology from the global placement sweep on Spartan 7: the
+ratio of virtual boards, with RO0 and RO1 at random locations of the sweep, that have at least
+one configuration pair within the C window of the matching controller, the expected number of
+such candidates and the expected matching latency (lib/board_yield.py).
+
+RO1 is taken from the shifted variant of the topology (e.g., muxnetwork_s), as in the placement
+sweep figures, if it has been measured with the given stages, and from the topology itself
+otherwise, without placing both oscillators at the same location. Every argument that takes a
+list is swept:
+
+```
+python3 math_model/simulate_yield.py muxnetwork --stages 3 --thresh-h 100 150 192 -n 1000000
+python3 math_model/simulate_yield.py intralut5 --csv math_model/results/yield_intralut5_s3.csv
+```
+"""
+import argparse
+import csv
+import itertools
+import os
+import sys
+from os import getcwd
+sys.path.append(getcwd())
+from lib import board_yield as b_y # pylint: disable=wrong-import-position
+from lib import matching_model as m_m # pylint: disable=wrong-import-position
+from lib import time_logger as t_l # pylint: disable=wrong-import-position
+
+QUANTILES = (0.1, 0.5, 0.9)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('topology', help='topology folder of RO0, e.g., muxnetwork')
+    parser.add_argument('--ro1', default=None, help='topology folder of RO1, default: shifted')
+    parser.add_argument('--stages', type=int, default=3, help='number of stages')
+    parser.add_argument('--root', default=os.path.join('measurements', 'lp_variable_gp_s7'),
+                        help='placement sweep folder')
+    parser.add_argument('--thresh-l', type=int, nargs='+', default=[74], help='CSCntThreshL')
+    parser.add_argument('--thresh-h', type=int, nargs='+', default=[192], help='CSCntThreshH')
+    parser.add_argument('--samples-log', type=int, nargs='+', default=[7], help='NBSamplesLog')
+    parser.add_argument('--lock-log', type=int, nargs='+', default=[8], help='MaxLockCntLog')
+    parser.add_argument('-n', type=int, default=100000, help='number of virtual boards')
+    parser.add_argument('--seed', type=int, default=None, help='random seed')
+    parser.add_argument('--csv', default=None, help='store the results in the CSV file')
+    args = parser.parse_args()
+
+    with t_l.span('read'):
+        ro0s = b_y.read_placements(args.root, args.topology, args.stages)
+        ro1_topology = args.ro1 if args.ro1 is not None else args.topology + '_s'
+        try:
+            ro1s = b_y.read_placements(args.root, ro1_topology, args.stages)
+        except ValueError:
+            if args.ro1 is not None:
+                raise
+            ro1_topology, ro1s = args.topology, ro0s
+    print(f'RO0: {args.topology}, {len(ro0s)} locations, {ro0s.delays.shape[1]} configurations; '
+          f'RO1: {ro1_topology}, {len(ro1s)} locations, {ro1s.delays.shape[1]} configurations')
+
+    header = ['CSCntThreshL', 'CSCntThreshH', 'NBSamplesLog', 'MaxLockCntLog', 'yield',
+              'mean candidates', 'mean latency [clks]'] \
+        + [f'p{int(q * 100)} latency [clks]' for q in QUANTILES]
+    rows = []
+    print(' '.join(f'{h:>15.15}' for h in header))
+    for thresh_l, thresh_h, samples_log, lock_log in itertools.product(
+            args.thresh_l, args.thresh_h, args.samples_log, args.lock_log):
+        params = m_m.ControllerParams(csc_thresh_l=thresh_l, csc_thresh_h=thresh_h,
+                                      nb_samples_log=samples_log, max_lock_cnt_log=lock_log)
+        with t_l.span('pair stats'):
+            stats = b_y.PairStats(ro0s, ro1s, params, seed=args.seed)
+            t_l.count(stats.nb_candidates.size * stats.nb_pairs, 'configuration pairs')
+        with t_l.span('simulate'):
+            result = b_y.simulate(stats, args.n, seed=args.seed)
+            t_l.count(args.n, 'boards')
+        row = [thresh_l, thresh_h, samples_log, lock_log, result.yield_ratio,
+               result.mean_candidates, result.mean_latency / params.clk_period] \
+            + list(result.quantiles(QUANTILES) / params.clk_period)
+        rows.append(row)
+        print(' '.join(f'{v:>15.6g}' for v in row))
+    if args.csv is not None:
+        with open(args.csv, 'w', newline='', encoding='utf-8') as csv_file:
+            csv_writer = csv.writer(csv_file)
+            csv_writer.writerow(header)
+            csv_writer.writerows(rows)
+    print(t_l.report())